@@ -13,12 +13,30 @@ ASSISTANT_NAME = "Jarvis"
 WAKE_WORD = "jarvis"
 VOICE_RATE = 145  # Speech rate for text-to-speech
 VOICE_MALE = True  # Use male voice if True
+STREAMING_MODEL_PATH = os.getenv("JARVIS_VOSK_MODEL", "")  # Vosk model directory for streaming recognition
+
+# Voice activity detection on captured audio (needs numpy)
+VAD_ENABLED = True
+VAD_FRAME_MS = 20  # Audio is classified as speech or silence in frames this long
+VAD_END_SILENCE_MS = 500  # Silence that ends an utterance (speech_recognition waits 800ms)
+VAD_MIN_SPEECH_MS = 100  # Shorter bursts of sound are ignored as noise
+VAD_PADDING_MS = 150  # Audio kept either side of speech so word edges aren't clipped
+VAD_BUFFER_SECONDS = 20  # Length of the capture ring buffer
+VAD_NOISE_RATIO = 3.0  # Without a calibrated threshold, speech is this many times the noise floor
+VAD_MIN_RMS = 50  # Lowest threshold ever used
 
 # API Keys (set these in .env file or configure here)
 WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "")
 WOLFRAM_API_KEY = os.getenv("WOLFRAM_API_KEY", "")
 NEWS_API_KEY = os.getenv("NEWS_API_KEY", "")
 
+# Weather settings
+WEATHER_API_URL = os.getenv("WEATHER_API_URL", "http://api.openweathermap.org/data/2.5")
+HOME_CITY = os.getenv("HOME_CITY", "")  # Used when a weather question names no city
+WEATHER_CACHE_TTL = 600  # Seconds current conditions are reused (OpenWeatherMap updates about every 10 minutes)
+FORECAST_CACHE_TTL = 1800  # Seconds a fetched forecast series is reused
+WEATHER_MAX_WORKERS = 4  # Cities fetched concurrently for multi-city questions
+
 # Common Windows Applications (example paths - adjust as needed)
 DEFAULT_APPLICATIONS = {
     "chrome": "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe",
@@ -34,6 +52,9 @@ DEFAULT_APPLICATIONS = {
     "settings": "ms-settings:",
 }
 
+# Seconds between checks of the PATH and .desktop directories for installed or removed applications
+APP_INDEX_RECHECK_INTERVAL = 5
+
 # Web Search settings
 DEFAULT_SEARCH_ENGINE = "google"  # Options: google, bing, duckduckgo
 SEARCH_ENGINES = {
@@ -42,6 +63,48 @@ SEARCH_ENGINES = {
     "duckduckgo": "https://duckduckgo.com/?q=",
 }
 
+# Calendar settings
+CALENDAR_FILE = os.getenv("JARVIS_CALENDAR_FILE", "")  # Defaults to jarvis/data/calendar_events.json
+DEFAULT_EVENT_DURATION = 60  # Minutes, for events added without a duration
+WORKDAY_START = "09:00"  # Free-slot search window
+WORKDAY_END = "18:00"
+
+# News settings
+NEWS_COUNTRY = "us"
+NEWS_PREFETCH_CATEGORIES = ["general"]  # Kept warm in the background
+NEWS_PREFETCH_SIZE = 20  # Headlines kept per category
+NEWS_REFRESH_INTERVAL = 900  # Seconds between background refreshes
+NEWS_MAX_AGE = 3600  # Older headlines are refetched before answering
+
+# Daily briefing: seconds from its start by which each source must answer, or be left out
+BRIEFING_DEADLINES = {"calendar": 0.5, "reminders": 0.5, "weather": 2.0, "news": 2.5}
+BRIEFING_HEADLINES = 3
+
+# Local knowledge store of fetched answers
+KNOWLEDGE_FRESH_AGE = 7 * 24 * 3600  # Seconds an answer is reused without asking upstream
+KNOWLEDGE_MAX_AGE = 90 * 24 * 3600  # Older answers are evicted; in between they are an offline fallback
+KNOWLEDGE_MAX_ENTRIES = 5000  # Least recently used answers are evicted beyond this
+KNOWLEDGE_MIN_SIMILARITY = 0.75  # Word overlap needed to reuse an answer to a similar question
+# Sources whose answers go out of date quickly ("time in tokyo", "price of bitcoin"): seconds they are used at all
+KNOWLEDGE_SOURCE_MAX_AGE = {"wolfram": 600}
+
+# Upstream API resilience
+CIRCUIT_FAILURE_THRESHOLD = 3  # Consecutive failures before an upstream is skipped
+CIRCUIT_RESET_TIMEOUT = 30  # Seconds before a skipped upstream is probed again
+UPSTREAM_TIMEOUT_MIN = 0.5  # Seconds; lower bound of the adaptive timeout
+UPSTREAM_TIMEOUT_MAX = 10.0  # Seconds; used until enough latencies are known, and for probes
+UPSTREAM_TIMEOUT_PERCENTILE = 95  # Timeout is a multiple of this recent latency percentile
+UPSTREAM_TIMEOUT_MULTIPLIER = 3
+
+# HTTP transport for upstream APIs: "live", "record" (live, saving responses
+# as fixtures) or "replay" (serve saved fixtures, no network)
+HTTP_TRANSPORT = os.getenv("JARVIS_TRANSPORT", "live")
+HTTP_FIXTURES_DIR = os.getenv("JARVIS_FIXTURES_DIR", "")  # Defaults to jarvis/data/fixtures
+REPLAY_LATENCY = os.getenv("JARVIS_REPLAY_LATENCY", "0")  # Milliseconds added per replayed call, or "recorded"
+REPLAY_JITTER = float(os.getenv("JARVIS_REPLAY_JITTER", "0"))  # Up to this many extra milliseconds
+REPLAY_FAILURE_RATE = float(os.getenv("JARVIS_REPLAY_FAILURE_RATE", "0"))  # Fraction of calls that fail to connect
+REPLAY_SEED = int(os.getenv("JARVIS_REPLAY_SEED", "0"))  # Makes injected latency and failures repeatable
+
 # Responses
 GREETING_RESPONSES = [
     "Hello sir, how may I assist you today?",
@@ -57,5 +120,59 @@ FAREWELL_RESPONSES = [
     "Jarvis going offline.",
 ]
 
+# Seconds between checks of app_paths.json and responses.json for edits
+CONFIG_RELOAD_INTERVAL = 0.5
+
+# Daemon mode: text commands from other programs over a Unix socket and/or local HTTP
+# The socket lives in the per-user runtime directory (or ~/.jarvis), not a shared one like /tmp
+# where anyone could create that path first
+DAEMON_SOCKET = os.getenv("JARVIS_SOCKET", os.path.join(
+    os.getenv("XDG_RUNTIME_DIR") or os.path.join(os.path.expanduser("~"), ".jarvis"), "jarvis.sock"))
+DAEMON_HTTP_HOST = "127.0.0.1"  # Only reachable from this machine
+DAEMON_HTTP_PORT = int(os.getenv("JARVIS_HTTP_PORT", "0"))  # 0 disables the HTTP endpoint
+DAEMON_SESSION_TTL = 1800  # Seconds before an idle HTTP session is forgotten
+# Secret HTTP clients must send, created on first use and only readable by its owner
+DAEMON_TOKEN_FILE = os.getenv("JARVIS_TOKEN_FILE", os.path.join(os.path.expanduser("~"), ".jarvis", "daemon_token"))
+
+# Components built at once while Jarvis starts
+STARTUP_MAX_WORKERS = 4
+
+# Commands of one compound utterance ("open chrome and what's the weather") run at once
+PLAN_MAX_WORKERS = 4
+
+# Seconds a command may run before Jarvis gives up on it and says so; 0 for no limit
+COMMAND_TIMEOUT = float(os.getenv("JARVIS_COMMAND_TIMEOUT", "15"))
+COMMAND_TIMEOUTS = {"play_youtube": 30}  # Per action, overriding COMMAND_TIMEOUT
+COMMAND_MAX_ABANDONED = 2  # An action is refused while this many of its timed-out runs are still going
+
+# Per-command profiling (also toggled with --profile or "start profiling")
+PROFILE_COMMANDS = os.getenv("JARVIS_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_THRESHOLD_MS = 500  # Only commands slower than this are written out
+PROFILE_DIR = os.getenv("JARVIS_PROFILE_DIR", "")  # Defaults to jarvis/data/profiles
+PROFILE_MEMORY = True  # Also snapshot allocations with tracemalloc; commands then run one at a time
+PROFILE_MEMORY_FRAMES = 25  # Stack depth kept per allocation
+
+# Reminders
+REMINDERS_FILE = os.getenv("JARVIS_REMINDERS_FILE", "")  # Defaults to jarvis/data/reminders.json
+
+# Command history (data/command_log.jsonl by default) and prefetching of habitual lookups
+COMMAND_LOG_FILE = os.getenv("JARVIS_COMMAND_LOG", "")
+PREFETCH_ENABLED = os.getenv("JARVIS_PREFETCH", "1").lower() not in ("0", "false", "no")
+PREFETCH_HISTORY_DAYS = 28  # Only this much history counts towards habits
+PREFETCH_MIN_DAYS = 3  # A habit needs the same lookup on at least this many days...
+PREFETCH_MIN_SHARE = 0.5  # ...and on this share of the weekdays (or weekend days) logged
+PREFETCH_WINDOW = 30  # Minutes either side of the usual time that count as the same habit
+PREFETCH_LEAD = 60  # Seconds to fetch ahead of the earliest usual ask
+PREFETCH_CHECK_INTERVAL = 60  # Seconds between checks for due habits
+
+# Speculative lookups from interim transcripts (streaming recognition only)
+SPECULATION_ENABLED = True
+SPECULATION_MIN_STABLE = 2  # Interim transcripts in a row that must agree before a lookup starts
+SPECULATION_MAX_WORKERS = 2
+
+# Similarity fallback for commands no pattern matches (needs numpy)
+INTENT_MIN_SIMILARITY = 0.6  # Cosine similarity below which the command stays unknown
+INTENT_NGRAM_RANGE = (2, 4)  # Character n-gram sizes used to compare phrases
+
 # Debug mode
 DEBUG = False
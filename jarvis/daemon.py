@@ -0,0 +1,380 @@
+"""
+Jarvis daemon: serves text commands to other programs from one warm Jarvis.
+
+Start it with `python jarvis/main.py --daemon`, then send commands with
+`python -m jarvis.daemon "what's the weather in London"` or any client that
+speaks the protocols below.
+
+Unix socket: one JSON object (or plain text line) per line, e.g.
+    {"command": "what time is it"}
+answered by one JSON line per command; a connection may send many.
+
+HTTP (localhost only): POST /command with a JSON body {"command": "..."}
+and GET /health. Commands need the per-install token from DAEMON_TOKEN_FILE
+in an "Authorization: Bearer <token>" header; requests from web pages
+(a foreign Origin or Host) are refused, so a site the user visits can't
+run commands. Pass the "session" from a reply back as {"session": ...} or
+an X-Jarvis-Session header to continue the same conversation.
+
+Every reply is {"action", "success", "response", "elapsed_ms", "session"},
+or {"error"}. Each socket connection is its own session.
+"""
+
+import os
+import sys
+import hmac
+import json
+import time
+import socket
+import secrets
+import argparse
+import threading
+import socketserver
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+# Allow `python jarvis/daemon.py` as well as `python -m jarvis.daemon`
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from jarvis.config import DAEMON_SOCKET, DAEMON_HTTP_HOST, DAEMON_HTTP_PORT, DAEMON_SESSION_TTL, DAEMON_TOKEN_FILE
+from jarvis.utils.session import Session
+
+MAX_COMMAND_LENGTH = 4096
+LISTEN_BACKLOG = 128  # Pending connections before clients are refused
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "::1"}  # Host and Origin names accepted over HTTP
+
+def load_token(path=DAEMON_TOKEN_FILE):
+    """
+    Get the HTTP token, creating it (readable only by its owner) on first use.
+    
+    Returns:
+        str: The token
+    """
+    try:
+        with open(path) as f:
+            token = f.read().strip()
+        if token:
+            return token
+    except FileNotFoundError:
+        pass
+    
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    token = secrets.token_urlsafe(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token + "\n")
+    return token
+
+def parse_request(body):
+    """
+    Get the command text and session ID from a request body.
+    
+    Returns:
+        tuple: (command or None if the body has none, session ID or None)
+    """
+    body = body.strip()
+    session_id = None
+    if body.startswith("{"):
+        try:
+            request = json.loads(body)
+            body, session_id = request.get("command", ""), request.get("session")
+        except (ValueError, AttributeError):
+            return None, None
+    if not isinstance(body, str) or not body.strip() or len(body) > MAX_COMMAND_LENGTH:
+        return None, session_id
+    return body.strip(), session_id
+
+class JarvisDaemon:
+    """
+    Serves commands to a single warm Jarvis instance.
+    
+    Each client connection is handled on its own thread and commands from
+    different sessions run concurrently, so a slow command (a web lookup,
+    say) doesn't hold up other clients. Commands within one session run in
+    order.
+    """
+    
+    def __init__(self, jarvis, socket_path=DAEMON_SOCKET, http_port=DAEMON_HTTP_PORT, http_host=DAEMON_HTTP_HOST,
+                 token_file=DAEMON_TOKEN_FILE):
+        self.jarvis = jarvis
+        self.socket_path = socket_path
+        self.http_port = http_port
+        self.http_host = http_host
+        self.token_file = token_file
+        self.token = None
+        self.commands = 0
+        self._servers = []
+        self._stopped = threading.Event()
+        
+        # HTTP sessions by ID; socket sessions live as long as their connection
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+    
+    def execute(self, command_text, session):
+        """
+        Run one command in a session.
+        
+        Returns:
+            dict: {"action", "success", "response", "elapsed_ms", "session"}
+        """
+        start = time.perf_counter()
+        with session.lock:
+            session.touch()
+            with self._sessions_lock:
+                self.commands += 1
+            try:
+                action, success, response = self.jarvis.execute_command(command_text, session)
+            except Exception as e:
+                print(f"Error executing '{command_text}': {e}")
+                action, success, response = "error", False, f"Error: {e}"
+        
+        return {
+            "action": action,
+            "success": success,
+            "response": response,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3),
+            "session": session.id
+        }
+    
+    def session(self, session_id=None):
+        """
+        Get the HTTP session with this ID, or start a new one.
+        
+        Sessions idle for longer than DAEMON_SESSION_TTL are forgotten, as
+        are sessions that said goodbye.
+        """
+        now = time.time()
+        with self._sessions_lock:
+            for stale_id, stale in list(self._sessions.items()):
+                if not stale.running or now - stale.last_active > DAEMON_SESSION_TTL:
+                    del self._sessions[stale_id]
+            
+            session = self._sessions.get(session_id) if session_id else None
+            if session is None:
+                session = Session(str(session_id) if session_id else None)
+                self._sessions[session.id] = session
+            return session
+    
+    def start(self):
+        """Start the configured servers in background threads."""
+        if self.socket_path and _UnixServer is not None:
+            self._start_socket_server()
+        if self.http_port:
+            self._start_http_server()
+        
+        if not self._servers:
+            raise RuntimeError("No daemon endpoint configured; set a socket path or an HTTP port")
+    
+    def _start_socket_server(self):
+        # Its directory is made owner-only if Jarvis creates it
+        os.makedirs(os.path.dirname(self.socket_path) or ".", mode=0o700, exist_ok=True)
+        
+        # A socket file left behind by a crashed daemon would block the bind
+        if os.path.exists(self.socket_path):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(self.socket_path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    os.unlink(self.socket_path)
+                else:
+                    raise RuntimeError(f"Another Jarvis daemon is listening on {self.socket_path}")
+        
+        # Created owner-only; changing the mode after bind would leave a window where others could connect
+        old_umask = os.umask(0o177)
+        try:
+            server = _UnixServer(self.socket_path, _SocketHandler)
+        finally:
+            os.umask(old_umask)
+        server.jarvis_daemon = self
+        self._serve(server, "jarvis-socket")
+        print(f"Listening on {self.socket_path}")
+    
+    def _start_http_server(self):
+        self.token = load_token(self.token_file)
+        server = _HTTPServer((self.http_host, self.http_port), _HTTPHandler)
+        server.jarvis_daemon = self
+        self.http_port = server.server_address[1]
+        self._serve(server, "jarvis-http")
+        print(f"Listening on http://{self.http_host}:{self.http_port} (token in {self.token_file})")
+    
+    def _serve(self, server, name):
+        self._servers.append(server)
+        threading.Thread(target=server.serve_forever, name=name, daemon=True).start()
+    
+    def serve_forever(self):
+        """Start the servers and block until stop() or Ctrl+C."""
+        try:
+            self.start()
+            while not self._stopped.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            print("\nShutting down...")
+        finally:
+            self.stop()
+    
+    def stop(self):
+        """Stop the servers and remove the socket file."""
+        self._stopped.set()
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+        
+        if self.socket_path and os.path.exists(self.socket_path):
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+        request_queue_size = LISTEN_BACKLOG
+else:
+    _UnixServer = None
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+class _SocketHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        session = Session()
+        for line in self.rfile:
+            command, _ = parse_request(line.decode("utf-8", errors="replace"))
+            if command is None:
+                reply = {"error": "Expected a command"}
+            else:
+                reply = self.server.jarvis_daemon.execute(command, session)
+            
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            
+            # "Goodbye" ends this client's session, not the daemon
+            if not session.running:
+                break
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+    
+    def do_GET(self):
+        # GET never runs commands; browsers send it for any <img> or link
+        url = urllib.parse.urlparse(self.path)
+        if not self._local():
+            self._reply(403, {"error": "Forbidden"})
+        elif url.path == "/health":
+            daemon = self.server.jarvis_daemon
+            self._reply(200, {"status": "ok", "commands": daemon.commands, "prefetch": daemon.jarvis.prefetcher.stats(),
+                              "startup_ms": daemon.jarvis.startup.timings_ms(),
+                              "timeouts": daemon.jarvis.deadlines.stats()})
+        elif url.path == "/command":
+            self._reply(405, {"error": "Use POST to send commands"})
+        else:
+            self._reply(404, {"error": "Not found"})
+    
+    def do_POST(self):
+        if urllib.parse.urlparse(self.path).path != "/command":
+            self._reply(404, {"error": "Not found"})
+            return
+        
+        # Forms and other cross-site "simple requests" can't send a JSON content type or the token
+        if not self._local():
+            self._reply(403, {"error": "Forbidden"})
+            return
+        if not self._authorized():
+            self._reply(401, {"error": "Missing or wrong token"})
+            return
+        if self.headers.get_content_type() != "application/json":
+            self._reply(415, {"error": "Expected a JSON body"})
+            return
+        
+        # A missing or negative length would leave rfile.read() waiting for the client to hang up
+        try:
+            length = int(self.headers["Content-Length"])
+        except TypeError:
+            self._reply(411, {"error": "Content-Length required"})
+            return
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._reply(400, {"error": "Bad Content-Length"})
+            return
+        if length > MAX_COMMAND_LENGTH * 2:
+            self._reply(413, {"error": "Command too long"})
+            return
+        self._run(self.rfile.read(length).decode("utf-8", errors="replace"))
+    
+    def _local(self):
+        # Host guards against DNS rebinding, Origin against pages on other sites
+        host = urllib.parse.urlsplit(f"//{self.headers.get('Host', '')}").hostname
+        origin = self.headers.get("Origin")
+        if host not in LOCAL_HOSTS:
+            return False
+        return origin is None or urllib.parse.urlsplit(origin).hostname in LOCAL_HOSTS
+    
+    def _authorized(self):
+        token = self.server.jarvis_daemon.token
+        header = self.headers.get("Authorization", "")
+        return bool(token) and hmac.compare_digest(header.encode(), f"Bearer {token}".encode())
+    
+    def _run(self, body):
+        command, session_id = parse_request(body)
+        if command is None:
+            self._reply(400, {"error": "Expected a command"})
+            return
+        
+        daemon = self.server.jarvis_daemon
+        session = daemon.session(session_id or self.headers.get("X-Jarvis-Session"))
+        self._reply(200, daemon.execute(command, session))
+    
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+def send_command(command, socket_path=DAEMON_SOCKET, timeout=30):
+    """
+    Send one command to a running daemon over its Unix socket.
+    
+    Returns:
+        dict: The daemon's reply
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall(json.dumps({"command": command}).encode("utf-8") + b"\n")
+        
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data)
+
+def main():
+    parser = argparse.ArgumentParser(description="Send a command to a running Jarvis daemon.")
+    parser.add_argument("command", nargs="+", help="The command, e.g. what time is it")
+    parser.add_argument("--socket", default=DAEMON_SOCKET, help="The daemon's Unix socket")
+    parser.add_argument("--json", action="store_true", help="Print the full JSON reply")
+    args = parser.parse_args()
+    
+    try:
+        reply = send_command(" ".join(args.command), args.socket)
+    except OSError as e:
+        print(f"Error: can't reach the Jarvis daemon at {args.socket}: {e}")
+        return 1
+    
+    if args.json:
+        print(json.dumps(reply, indent=2))
+    else:
+        print(reply.get("response") or reply.get("error", ""))
+    return 0 if reply.get("success") else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,8 +6,10 @@ import os
 import sys
 import time
 import random
+import argparse
 import datetime
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # Add the parent directory to sys.path to allow imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -15,37 +17,230 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 # Import Jarvis modules
 from jarvis.utils.speech import Speech
 from jarvis.utils.nlp import CommandProcessor
-from jarvis.utils.system import SystemOperations
+from jarvis.utils.services import get_services
+from jarvis.utils.session import Session
+from jarvis.utils.profiling import CommandProfiler
+from jarvis.utils.plan import CommandPlan, WEATHER_ACTIONS
+from jarvis.utils.speculation import Speculator
+from jarvis.utils.startup import Startup
+from jarvis.utils.deadline import DeadlineExecutor, CommandTimeout
 from jarvis.skills.app_control import AppController
 from jarvis.skills.web_search import WebSearchSkill
-from jarvis.config import ASSISTANT_NAME, DEBUG
+from jarvis.skills.weather import WeatherSkill
+from jarvis.skills.calendar import CalendarSkill
+from jarvis.skills.reminder import ReminderSkill
+from jarvis.skills.briefing import BriefingSkill
+from jarvis.utils.recurrence import RecurrenceRule
+from jarvis.config import (ASSISTANT_NAME, DEBUG, GREETING_RESPONSES, FAREWELL_RESPONSES,
+                           DAEMON_SOCKET, DAEMON_HTTP_PORT, PROFILE_COMMANDS, PROFILE_THRESHOLD_MS,
+                           PLAN_MAX_WORKERS, HOME_CITY)
 
 class Jarvis:
-    def __init__(self):
+    def __init__(self, voice=True, profile=PROFILE_COMMANDS):
         print(f"Initializing {ASSISTANT_NAME}...")
         
-        # Initialize components
-        self.speech = Speech()
-        self.nlp = CommandProcessor()
-        self.system = SystemOperations()
-        self.app_controller = AppController()
-        self.web_search = WebSearchSkill()
+        # Reminders can fire before speech is ready; until then they are printed
+        self.speech = None
         
-        # Set running flag
-        self.running = True
+        # Build independent components at once; speech (and its microphone
+        # calibration) on this thread, everything else on a small pool
+        startup = Startup()
+        startup.add("speech", lambda: Speech() if voice else None)
+        startup.add("nlp", CommandProcessor)
+        startup.add("services", self._start_services)
+        startup.add("system", lambda services: services.get("system"), after=["services"])
+        startup.add("app_controller", AppController, after=["services"])
+        startup.add("web_search", WebSearchSkill, after=["services"])
+        startup.add("weather", WeatherSkill, after=["services"])
+        startup.add("calendar", CalendarSkill)
+        startup.add("reminders", lambda: ReminderSkill(speech_callback=self.say))
+        startup.add("briefing", BriefingSkill, after=["calendar", "reminders", "services"])
         
-        print(f"{ASSISTANT_NAME} initialized and ready.")
+        # Starts lookups from interim transcripts while the user is still speaking
+        startup.add("speculator", Speculator, after=["nlp", "web_search"])
+        
+        # Fill caches and open upstream connections while the microphone calibrates
+        startup.add("warm_web", lambda services: services.get("web_tools").warm_up(HOME_CITY),
+                    after=["services"], background=True)
+        startup.add("warm_apps", lambda system: system.app_index, after=["system"], background=True)
+        startup.add("warm_knowledge", lambda services: services.get("knowledge"), after=["services"], background=True)
+        
+        components = startup.run(on_main_thread=["speech"])
+        for name, component in components.items():
+            setattr(self, name, component)
+        self.startup = startup
+        
+        # Every command is logged; habits found in the log are fetched before they are asked for
+        self.command_log = self.services.get("command_log")
+        self.prefetcher = self.services.get("prefetcher")
+        
+        # Pick up edits to the JSON config files without a restart
+        watcher = self.services.get("config_watcher")
+        watcher.watch(self.system.app_paths_file, self.system.reload_custom_app_paths)
+        watcher.watch(self.nlp.responses_file, self.nlp.reload_responses)
+        
+        # Conversation state of the local voice or text loop; daemon clients get their own
+        self.session = Session()
+        
+        # Keeps cProfile and tracemalloc output for slow commands when enabled
+        self.profiler = CommandProfiler(enabled=profile)
+        
+        # Bounds how long one command may take, so a hung lookup can't freeze the listening loop
+        self.deadlines = DeadlineExecutor()
+        
+        # Runs the commands of compound utterances ("open chrome and what's the weather") concurrently
+        self.plan_executor = ThreadPoolExecutor(max_workers=PLAN_MAX_WORKERS, thread_name_prefix="plan")
+        
+        print(f"{ASSISTANT_NAME} initialized and ready in {startup.report()}.")
+    
+    def _start_services(self):
+        # Shared services, built once and handed to every skill
+        self.services = get_services()
+        self.services.start()
+        return self.services
+    
+    @property
+    def running(self):
+        """Whether the local session is still running."""
+        return self.session.running
+    
+    @running.setter
+    def running(self, value):
+        self.session.running = value
+    
+    def say(self, text):
+        """Speak a response, or print it when running without voice."""
+        if not text:
+            return
+        
+        if self.speech:
+            self.speech.speak(text)
+        else:
+            print(f"{ASSISTANT_NAME}: {text}")
+    
+    def listen(self):
+        """Get the next command, spoken or typed."""
+        if self.speech:
+            self.speculator.begin()
+            return self.speech.listen(on_partial=self.speculator.partial)
+        
+        try:
+            return input("> ").strip().lower()
+        except EOFError:
+            self.running = False
+            return ""
     
     def handle_command(self, command_text):
-        """Process and execute a command."""
-        # Process the command
-        action, params = self.nlp.process_command(command_text)
+        """Process and execute a command, then speak the response."""
+        streamed = []
+        def stream(text):
+            streamed.append(text)
+            self.say(text)
+        
+        action, success, response = self.execute_command(command_text, stream=stream)
+        
+        # Parts of long responses (the briefing) were spoken as they became ready
+        for part in streamed:
+            response = response.replace(part, "", 1)
+        
+        # Speak the response
+        if response.strip():
+            self.say(response.strip())
+    
+    def execute_command(self, command_text, session=None, stream=None):
+        """
+        Process and execute a command without speaking.
+        
+        Safe to call from several threads; the skills lock their own state.
+        An utterance that asks for several things is split into its commands,
+        which run concurrently where they don't depend on each other; their
+        responses are joined in the order they were asked for.
         
+        Args:
+            command_text (str): The command
+            session (Session, optional): The conversation it belongs to; defaults to the local one
+            stream (callable, optional): Called with parts of a long response as soon as they are ready;
+                                         they are also part of the returned response
+        
+        Returns:
+            tuple: (action, success, response), with the actions joined by "+" for compound commands
+        """
+        return self.profiler.run(self._execute_utterance, command_text, session or self.session, stream,
+                                 label=lambda result: result[0])
+    
+    def _execute_utterance(self, command_text, session, stream=None):
+        intents = self.nlp.process_compound(command_text)
+        if len(intents) == 1:
+            return self._execute_command(*intents[0], session, stream)
+        
+        # Only a lone command streams; the steps of a plan finish out of order, off this thread
+        plan = CommandPlan(intents)
+        results = plan.run(lambda action, params: self._execute_command(action, params, session),
+                           self.plan_executor)
+        
+        # Independent weather questions finish in any order; follow-ups are about the last city asked
+        for (action, params), (_, success, _) in reversed(list(zip(intents, results))):
+            if success and action in WEATHER_ACTIONS and len(self.nlp.split_list(params.get("city", ""))) == 1:
+                session.last_city = params["city"]
+                break
+        
+        action = "+".join(result[0] for result in results)
+        success = all(result[1] for result in results)
+        response = " ".join(result[2].strip() for result in results if result[2].strip())
+        return action, success, response
+    
+    def _execute_command(self, action, params, session, stream=None):
         # Debug output
         if DEBUG:
             print(f"Action: {action}")
             print(f"Params: {params}")
         
+        # Follow-up weather questions and the briefing are about the session's last city; resolve it
+        # here so the command log records the city that was actually looked up
+        if action in ("get_forecast", "get_forecast_for", "weather_condition", "briefing") and not params.get("city"):
+            params["city"] = session.last_city
+        
+        # Run the skill, giving up on it if it hangs
+        try:
+            if self.profiler.enabled:
+                # cProfile only sees this thread, so profiled commands run on it, without a deadline
+                success, response = self._run_command(action, params, session, stream)
+            else:
+                success, response = self.deadlines.run(
+                    action, lambda relay: self._run_command(action, params, session, relay), relay=stream
+                )
+        except CommandTimeout as e:
+            print(f"Error running {action}: {e}")
+            response = self.nlp.get_response("timeout", "Sorry, that's taking too long.")
+            if isinstance(response, list):
+                response = random.choice(response)
+            success = False
+        
+        # Provide a response
+        if success:
+            # Use success response if available
+            success_responses = self.nlp.get_response("success")
+            if not response.strip() and success_responses:
+                if isinstance(success_responses, list):
+                    response = random.choice(success_responses)
+                else:
+                    response = success_responses
+        else:
+            # Use error response if available and no specific error message
+            if not response.strip():
+                error_responses = self.nlp.get_response("error")
+                if error_responses:
+                    if isinstance(error_responses, list):
+                        response = random.choice(error_responses)
+                    else:
+                        response = error_responses
+        
+        self.command_log.append(action, params, success)
+        self.prefetcher.observe(action, params, success)
+        
+        return action, success, response
+    
+    def _run_command(self, action, params, session, stream=None):
         # Execute the appropriate action
         if action == "open_app":
             app_name = params.get("app_name", "")
@@ -69,13 +264,80 @@ class Jarvis:
             success, response = self.web_search.open_website(url)
         
         elif action == "get_weather":
-            city = params.get("city", "")
-            success, response = self.web_search.get_weather(city)
+            cities = self.nlp.split_list(params.get("city", ""))
+            success, response = self.web_search.get_weather_many(cities)
+            if success and len(cities) == 1:
+                session.last_city = cities[0]
+        
+        elif action == "get_forecast":
+            city = params.get("city") or session.last_city
+            success, response = self.weather.get_forecast(city)
+            if success:
+                session.last_city = city
+        
+        elif action == "get_forecast_for":
+            city = params.get("city") or session.last_city
+            success, response = self.weather.get_forecast_for(city, params.get("when", "tomorrow"))
+            if success:
+                session.last_city = city
+        
+        elif action == "weather_condition":
+            city = params.get("city") or session.last_city
+            success, response = self.weather.will_it(city, params.get("condition", "rain"), params.get("when", "tomorrow"))
+            if success:
+                session.last_city = city
         
         elif action == "get_news":
             category = params.get("category", "general")
             success, response = self.web_search.get_news(category)
         
+        elif action == "get_calendar":
+            period = params.get("period", "today")
+            success, result = self.calendar.get_period_events(period)
+            response = self.calendar.format_events(result) if success else result
+        
+        elif action == "get_next_events":
+            try:
+                count = int(params.get("count", 3))
+            except ValueError:
+                count = 3
+            success, result = self.calendar.get_next_events(count)
+            response = self.calendar.format_events(result) if success else result
+        
+        elif action == "check_free":
+            time_str = self.nlp.parse_time(params.get("time", ""))
+            day = datetime.date.today()
+            if params.get("period") == "tomorrow":
+                day += datetime.timedelta(days=1)
+            if time_str:
+                success, response = self.calendar.is_free(day.strftime("%Y-%m-%d"), time_str)
+            else:
+                success, response = False, "I didn't catch the time."
+        
+        elif action == "find_free_slot":
+            duration = self.nlp.parse_duration(params.get("duration", ""))
+            period = params.get("period", "today")
+            success, result = self.calendar.find_free_slots_in_period(period, duration, count=1)
+            response = self.calendar.format_slots(result) if success else result
+        
+        elif action == "set_reminder":
+            title = params.get("title", "")
+            time_str = self.nlp.parse_time(params.get("time", ""))
+            recurrence = RecurrenceRule.parse(params["recurrence"]) if params.get("recurrence") else None
+            if not time_str:
+                success, response = False, "I didn't catch the time for that reminder."
+            elif params.get("recurrence") and not recurrence:
+                success, response = False, f"I don't know how to repeat a reminder {params['recurrence']}."
+            else:
+                success, response = self.reminders.add_reminder(title, time_str, recurrence=recurrence)
+        
+        elif action == "get_reminders":
+            success, result = self.reminders.get_reminders()
+            response = self.reminders.format_reminders(result) if success else result
+        
+        elif action == "briefing":
+            success, response = self.briefing.brief(params.get("city"), on_part=stream)
+        
         elif action == "get_time":
             now = datetime.datetime.now()
             time_str = now.strftime("%I:%M %p")
@@ -110,13 +372,45 @@ class Jarvis:
         elif action == "cancel_shutdown":
             success, response = self.system.cancel_shutdown()
         
+        elif action == "profiling":
+            if params.get("state") == "off":
+                self.profiler.disable()
+                response = f"Profiling off. {self.profiler.slow} slow commands were saved to {self.profiler.output_dir}."
+            else:
+                self.profiler.enable()
+                response = f"Profiling commands that take longer than {self.profiler.threshold_ms:g} milliseconds."
+            success = True
+        
+        elif action == "prefetch_stats":
+            stats = self.prefetcher.stats()
+            if not stats["prefetches"]:
+                response = f"I haven't prefetched anything yet. I know {stats['habits']} habits."
+            else:
+                response = (f"I prefetched {stats['prefetches']} times for {stats['habits']} habits. "
+                            f"{stats['hits']} were used and {stats['wasted']} were wasted")
+                if stats["hit_rate"] is not None:
+                    response += f", a hit rate of {stats['hit_rate']:.0%}"
+                response += "."
+            if stats["failed"]:
+                response += f" {stats['failed']} prefetch{'es' if stats['failed'] != 1 else ''} failed."
+            success = True
+        
+        elif action == "speculation_stats":
+            stats = self.speculator.stats()
+            if not stats["started"]:
+                response = "I haven't started any lookups early yet."
+            else:
+                response = (f"I started {stats['started']} lookups while you were speaking. "
+                            f"{stats['committed']} were used, saving {stats['saved_ms'] / 1000:.1f} seconds, "
+                            f"and {stats['discarded']} were discarded, wasting {stats['wasted_ms'] / 1000:.1f} seconds of work.")
+            success = True
+        
         elif action == "exit":
             success, response = True, "Goodbye!"
-            self.running = False
+            session.running = False
         
         elif action == "greet":
-            self.speech.greet()
-            return
+            success, response = True, random.choice(GREETING_RESPONSES)
         
         elif action == "thanks":
             response = self.nlp.get_response("thanks", "You're welcome!")
@@ -138,49 +432,31 @@ class Jarvis:
             response = "I'm not sure how to help with that."
             success = False
         
-        # Provide a response
-        if success:
-            # Use success response if available
-            success_responses = self.nlp.get_response("success")
-            if not response.strip() and success_responses:
-                if isinstance(success_responses, list):
-                    response = random.choice(success_responses)
-                else:
-                    response = success_responses
-        else:
-            # Use error response if available and no specific error message
-            if not response.strip():
-                error_responses = self.nlp.get_response("error")
-                if error_responses:
-                    if isinstance(error_responses, list):
-                        response = random.choice(error_responses)
-                    else:
-                        response = error_responses
-        
-        # Speak the response
-        if response.strip():
-            self.speech.speak(response)
+        return success, response
     
     def run(self):
         """Run the main Jarvis loop."""
-        self.speech.greet()
+        self.say(random.choice(GREETING_RESPONSES))
         
         while self.running:
             try:
                 # Listen for commands
-                command_text = self.speech.listen()
+                command_text = self.listen()
+                
+                # Keep the lookups started while listening that this command needs
+                self.speculator.resolve(command_text)
                 
                 # Check if we heard anything
                 if not command_text:
                     continue
                 
-                # Check for wake word if not in continuous mode
-                if not self.nlp.is_wake_word(command_text):
+                # Check for wake word if not in continuous mode; typed commands don't need it
+                if self.speech and not self.nlp.is_wake_word(command_text):
                     continue
                 
                 # Process and execute the command
                 self.handle_command(command_text)
-                
+            
             except KeyboardInterrupt:
                 self.running = False
                 print("\nShutting down...")
@@ -191,8 +467,45 @@ class Jarvis:
                     traceback.print_exc()
         
         # Say goodbye
-        self.speech.farewell()
+        self.say(random.choice(FAREWELL_RESPONSES))
+        self.speculator.close()
+        self.briefing.close()
+        self.plan_executor.shutdown(wait=False)
+        self.services.shutdown()
+    
+    def serve(self, socket_path=DAEMON_SOCKET, http_port=DAEMON_HTTP_PORT):
+        """Run as a daemon, answering text commands from other programs."""
+        from jarvis.daemon import JarvisDaemon
+        
+        daemon = JarvisDaemon(self, socket_path=socket_path, http_port=http_port)
+        try:
+            daemon.serve_forever()
+        finally:
+            self.briefing.close()
+            self.plan_executor.shutdown(wait=False)
+            self.services.shutdown()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=f"{ASSISTANT_NAME} AI Assistant")
+    parser.add_argument("--no-voice", action="store_true",
+                        help="Type commands and print responses instead of using the microphone and speakers")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep running without voice and accept commands over a socket or HTTP")
+    parser.add_argument("--socket", default=DAEMON_SOCKET,
+                        help="Unix socket path for daemon mode; empty to disable")
+    parser.add_argument("--http-port", type=int, default=DAEMON_HTTP_PORT,
+                        help="Localhost HTTP port for daemon mode; 0 to disable")
+    parser.add_argument("--profile", action="store_true", default=PROFILE_COMMANDS,
+                        help="Write CPU and memory profiles of slow commands")
+    parser.add_argument("--profile-threshold", type=float, default=PROFILE_THRESHOLD_MS,
+                        help="Milliseconds a command must take to be written out when profiling")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    jarvis = Jarvis()
-    jarvis.run()
+    args = parse_args()
+    jarvis = Jarvis(voice=not (args.no_voice or args.daemon), profile=args.profile)
+    jarvis.profiler.threshold_ms = args.profile_threshold
+    if args.daemon:
+        jarvis.serve(socket_path=args.socket, http_port=args.http_port)
+    else:
+        jarvis.run()
@@ -2,11 +2,16 @@
 App control functionality for Jarvis.
 """
 
-from ..utils.system import SystemOperations
+from ..utils.services import get_services
 
 class AppController:
-    def __init__(self):
-        self.system = SystemOperations()
+    def __init__(self, services=None):
+        self.services = services or get_services()
+    
+    @property
+    def system(self):
+        """The shared SystemOperations instance."""
+        return self.services.get("system")
     
     def open_app(self, app_name):
         """Open an application by name."""
@@ -0,0 +1,139 @@
+"""
+Daily briefing functionality for Jarvis.
+"""
+
+import time
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from ..utils.services import get_services
+from ..config import BRIEFING_DEADLINES, BRIEFING_HEADLINES
+
+class BriefingSkill:
+    """
+    The date, today's events and reminders, the weather and the news in one reply.
+    
+    All sources are asked at once. Each has a deadline, counted from the
+    start of the briefing (BRIEFING_DEADLINES); one that hasn't answered by
+    then is left out and named at the end, so a slow news API never holds
+    up the rest. Parts are handed to on_part in a fixed order as soon as
+    they and the parts before them are ready, so the date can be spoken
+    while the weather is still being fetched.
+    """
+    
+    SOURCES = ["calendar", "reminders", "weather", "news"]
+    
+    def __init__(self, calendar, reminders, services=None, deadlines=None):
+        self.calendar = calendar
+        self.reminders = reminders
+        self.services = services or get_services()
+        self.deadlines = dict(BRIEFING_DEADLINES, **(deadlines or {}))
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def brief(self, city=None, on_part=None):
+        """
+        Give the daily briefing.
+        
+        Args:
+            city (str, optional): The city to give the weather for; no weather without one
+            on_part (callable, optional): Called with each part of the briefing as soon as it is ready
+        
+        Returns:
+            tuple: (success, briefing)
+        """
+        start = time.monotonic()
+        fetchers = {
+            "calendar": self._calendar,
+            "reminders": self._reminders,
+            "weather": lambda: self._weather(city),
+            "news": self._news
+        }
+        executor = self._get_executor()
+        futures = [(source, executor.submit(fetchers[source])) for source in self.SOURCES]
+        
+        parts = []
+        def add(text):
+            if text:
+                parts.append(text)
+                if on_part:
+                    on_part(text)
+        
+        add(self._date())
+        
+        late = []
+        for source, future in futures:
+            # A part that arrived after its deadline while earlier parts were being spoken is still used
+            remaining = start + self.deadlines[source] - time.monotonic()
+            try:
+                add(future.result(timeout=max(0, remaining)))
+            except TimeoutError:
+                future.cancel()
+                late.append(source)
+            except Exception as e:
+                print(f"Error getting {source} for the briefing: {e}")
+                late.append(source)
+        
+        if late:
+            add(f"I couldn't get the {' or the '.join(late)} in time.")
+        return True, " ".join(parts)
+    
+    def close(self):
+        """Stop the briefing workers."""
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+    
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=len(self.SOURCES), thread_name_prefix="briefing")
+            return self._executor
+    
+    def _date(self):
+        now = datetime.datetime.now()
+        greeting = "Good morning" if now.hour < 12 else "Good afternoon" if now.hour < 18 else "Good evening"
+        return f"{greeting}. Today is {now.strftime('%A, %B %d')}."
+    
+    def _calendar(self):
+        success, events = self.calendar.get_events()
+        if not success:
+            return "Your calendar is clear today."
+        
+        lines = []
+        for event in events:
+            line = event["title"]
+            if event.get("time"):
+                line += f" at {datetime.datetime.strptime(event['time'], '%H:%M').strftime('%I:%M %p')}"
+            lines.append(line)
+        count = f"{len(events)} event{'s' if len(events) != 1 else ''}"
+        return f"You have {count} today: " + "; ".join(lines) + "."
+    
+    def _reminders(self):
+        success, reminders = self.reminders.get_reminders()
+        if not success:
+            return ""
+        
+        today = datetime.date.today().strftime("%Y-%m-%d")
+        lines = []
+        for reminder in reminders:
+            if reminder["datetime"].startswith(today):
+                reminder_time = datetime.datetime.strptime(reminder["datetime"], "%Y-%m-%d %H:%M:%S")
+                lines.append(f"{reminder['title']} at {reminder_time.strftime('%I:%M %p')}")
+        if not lines:
+            return ""
+        return "I'll remind you to " + "; ".join(lines) + "."
+    
+    def _weather(self, city):
+        if not city:
+            return ""
+        success, result = self.services.get("web_tools").get_weather(city)
+        if not success:
+            return f"I couldn't get the weather for {city.title()}."
+        return f"In {result['city']} it's {result['description']} and {round(result['temperature'])}°C."
+    
+    def _news(self):
+        success, result = self.services.get("news_feed").get("general", count=BRIEFING_HEADLINES)
+        if not success or not result:
+            return ""
+        return "The top headlines: " + "; ".join(article["title"] for article in result) + "."
@@ -3,14 +3,32 @@ Calendar functionality for Jarvis.
 """
 
 import json
-import os
+import bisect
+import heapq
 import datetime
+import itertools
+import threading
 from pathlib import Path
+from ..utils.recurrence import RecurrenceRule
+from ..utils.concurrency import synchronized, write_json_atomic
+from ..utils.interval_tree import IntervalTree
+from ..config import CALENDAR_FILE, DEFAULT_EVENT_DURATION, WORKDAY_START, WORKDAY_END
 
 class CalendarSkill:
-    def __init__(self):
-        self.events_file = Path(__file__).parent.parent / 'data' / 'calendar_events.json'
+    def __init__(self, events_file=None):
+        self.events_file = Path(events_file or CALENDAR_FILE or Path(__file__).parent.parent / 'data' / 'calendar_events.json')
         self.events = self.load_events()
+        
+        # Guards the events and their indexes; public methods take it, so
+        # several sessions can read and change the calendar at once
+        self._lock = threading.RLock()
+        
+        # Sorted list of dates that have events, and title -> dates lookup
+        self._dates = []
+        self._title_index = {}
+        self._recurring = []  # Master records of recurring events
+        self._intervals = IntervalTree()  # Timed one-off events by [start, end)
+        self._build_index()
     
     def load_events(self):
         """Load events from the calendar_events.json file."""
@@ -25,20 +43,165 @@ class CalendarSkill:
         
         return events
     
+    @synchronized
     def save_events(self):
         """Save events to the calendar_events.json file."""
         try:
-            os.makedirs(self.events_file.parent, exist_ok=True)
-            
-            with open(self.events_file, 'w') as f:
-                json.dump(self.events, f, indent=4)
-            
+            write_json_atomic(self.events_file, self.events, indent=4)
             return True
         except Exception as e:
             print(f"Error saving calendar events: {e}")
             return False
     
-    def add_event(self, title, date_str, time_str=None, description=None):
+    def _build_index(self):
+        """Rebuild the sorted date index and the title index from the events."""
+        self._dates = sorted(date for date, events in self.events.items() if events)
+        self._title_index = {}
+        self._recurring = []
+        self._intervals = IntervalTree()
+        
+        for date in self._dates:
+            for event in self.events[date]:
+                self._title_index.setdefault(event["title"].lower(), set()).add(date)
+                if event.get("recurrence"):
+                    self._recurring.append(event)
+                elif event.get("time"):
+                    self._intervals.insert(*self._event_interval(event), event)
+    
+    def _index_event(self, event):
+        """Add a newly stored event to the date and title indexes."""
+        date = event["date"]
+        
+        position = bisect.bisect_left(self._dates, date)
+        if position == len(self._dates) or self._dates[position] != date:
+            self._dates.insert(position, date)
+        
+        self._title_index.setdefault(event["title"].lower(), set()).add(date)
+        
+        if event.get("recurrence"):
+            self._recurring.append(event)
+        elif event.get("time"):
+            self._intervals.insert(*self._event_interval(event), event)
+    
+    def _unindex(self, date, removed):
+        """Drop events removed from a date from the indexes."""
+        if not self.events.get(date):
+            self.events.pop(date, None)
+            
+            position = bisect.bisect_left(self._dates, date)
+            if position < len(self._dates) and self._dates[position] == date:
+                del self._dates[position]
+        
+        remaining = {event["title"].lower() for event in self.events.get(date, [])}
+        for title in {event["title"].lower() for event in removed}:
+            if title in remaining or title not in self._title_index:
+                continue
+            self._title_index[title].discard(date)
+            if not self._title_index[title]:
+                del self._title_index[title]
+        
+        for event in removed:
+            if event.get("recurrence"):
+                self._recurring = [series for series in self._recurring if series is not event]
+            elif event.get("time"):
+                self._intervals.remove(*self._event_interval(event), event)
+    
+    def _normalize_date(self, date_str):
+        """
+        Parse a date in YYYY-MM-DD or MM/DD/YYYY format.
+        
+        Returns:
+            datetime.date or None if the date could not be parsed
+        """
+        for date_format in ("%Y-%m-%d", "%m/%d/%Y"):
+            try:
+                return datetime.datetime.strptime(date_str, date_format).date()
+            except ValueError:
+                continue
+        return None
+    
+    def _sort_key(self, event):
+        """Sort events by date, then time, with all-day events first."""
+        return (event["date"], event.get("time") or "")
+    
+    def _event_interval(self, event):
+        """Get the [start, end) datetimes of a timed event."""
+        start = datetime.datetime.strptime(f"{event['date']} {event['time']}", "%Y-%m-%d %H:%M")
+        duration = event.get("duration") or DEFAULT_EVENT_DURATION
+        return start, start + datetime.timedelta(minutes=duration)
+    
+    def _busy_intervals(self, start, end):
+        """
+        Get the timed events overlapping [start, end), ordered by start.
+        
+        One-off events come from the interval tree in O(log n + k); recurring
+        series only expand the occurrences that fall inside the window.
+        
+        Returns:
+            list: (start, end, event) tuples
+        """
+        busy = self._intervals.overlap(start, end)
+        
+        # A recurring occurrence can start up to a day before the window and still overlap it
+        window_start = (start - datetime.timedelta(days=1)).date()
+        for series in self._recurring:
+            if not series.get("time"):
+                continue
+            for instance in self._expand_recurring(series, window_start, end.date()):
+                instance_start, instance_end = self._event_interval(instance)
+                if instance_start < end and instance_end > start:
+                    busy.append((instance_start, instance_end, instance))
+        
+        busy.sort(key=lambda interval: interval[0])
+        return busy
+    
+    def _expand_recurring(self, event, start_date, end_date=None):
+        """
+        Lazily generate the occurrences of a recurring event within a date range.
+        
+        Yields:
+            dict: A copy of the event dated on each occurrence
+        """
+        rule = RecurrenceRule.from_dict(event["recurrence"])
+        series_start = datetime.datetime.strptime(event["date"], "%Y-%m-%d")
+        after = datetime.datetime.combine(start_date, datetime.time.min)
+        before = datetime.datetime.combine(end_date, datetime.time.max) if end_date else None
+        
+        for occurrence in rule.occurrences(series_start, after=after, before=before):
+            instance = dict(event)
+            instance["date"] = occurrence.strftime("%Y-%m-%d")
+            yield instance
+    
+    def _iter_events(self, start_date, end_date=None):
+        """
+        Generate events in date and time order from start_date onwards.
+        
+        One-off events come from a slice of the sorted date index; each
+        recurring series contributes its own lazy generator, and the streams
+        are merged so callers only pay for the events they consume.
+        """
+        start_str = start_date.strftime("%Y-%m-%d")
+        first = bisect.bisect_left(self._dates, start_str)
+        if end_date is not None:
+            last = bisect.bisect_right(self._dates, end_date.strftime("%Y-%m-%d"))
+        else:
+            last = len(self._dates)
+        
+        def one_off_events():
+            for date in self._dates[first:last]:
+                for event in sorted(self.events[date], key=self._sort_key):
+                    if not event.get("recurrence"):
+                        yield event
+        
+        streams = [one_off_events()]
+        for event in self._recurring:
+            streams.append(self._expand_recurring(event, start_date, end_date))
+        
+        return heapq.merge(*streams, key=self._sort_key)
+    
+    @synchronized
+    def add_event(self, title, date_str, time_str=None, description=None, recurrence=None,
+                  duration=None, allow_conflicts=False):
         """
         Add an event to the calendar.
         
@@ -47,6 +210,11 @@ class CalendarSkill:
             date_str (str): The date of the event in format YYYY-MM-DD
             time_str (str, optional): The time of the event in format HH:MM
             description (str, optional): A description of the event
+            recurrence (RecurrenceRule, optional): Repeat the event on this schedule,
+                                                   starting on date_str
+            duration (int, optional): Length of the event in minutes
+            allow_conflicts (bool, optional): Add the event even if it overlaps another one.
+                                              For recurring events only the first occurrence is checked.
             
         Returns:
             tuple: (success, message)
@@ -85,12 +253,28 @@ class CalendarSkill:
                 "time": time_str,
                 "description": description
             }
+            if duration:
+                event["duration"] = int(duration)
+            
+            # Check for overlapping events
+            if time_str and not allow_conflicts:
+                conflicts = self._busy_intervals(*self._event_interval(event))
+                if conflicts:
+                    titles = ", ".join(conflict[2]["title"] for conflict in conflicts)
+                    return False, f"Event '{title}' conflicts with {titles}"
+            
+            # A recurring event is stored once, under its first date
+            if recurrence:
+                if isinstance(recurrence, dict):
+                    recurrence = RecurrenceRule.from_dict(recurrence)
+                event["recurrence"] = recurrence.to_dict()
             
             # Add to events
             if date_str not in self.events:
                 self.events[date_str] = []
             
             self.events[date_str].append(event)
+            self._index_event(event)
             
             # Save events
             if self.save_events():
@@ -101,6 +285,7 @@ class CalendarSkill:
         except Exception as e:
             return False, f"Error adding event: {e}"
     
+    @synchronized
     def get_events(self, date_str=None):
         """
         Get events for a specific date or today.
@@ -130,14 +315,17 @@ class CalendarSkill:
                         return False, f"Invalid date format: {date_str}. Please use YYYY-MM-DD or MM/DD/YYYY."
             
             # Check if there are events for this date
-            if date_str in self.events and self.events[date_str]:
-                return True, self.events[date_str]
+            date_obj = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+            events = list(self._iter_events(date_obj, date_obj))
+            if events:
+                return True, events
             else:
                 return False, f"No events scheduled for {date_str}"
             
         except Exception as e:
             return False, f"Error getting events: {e}"
     
+    @synchronized
     def remove_event(self, title, date_str=None):
         """
         Remove an event from the calendar.
@@ -168,10 +356,12 @@ class CalendarSkill:
                 # Check if there are events for this date
                 if date_str in self.events:
                     # Find the event by title
-                    found = False
-                    self.events[date_str] = [event for event in self.events[date_str] if event["title"].lower() != title.lower() or (found := True) is False]
+                    removed = [event for event in self.events[date_str] if event["title"].lower() == title.lower()]
+                    self.events[date_str] = [event for event in self.events[date_str] if event["title"].lower() != title.lower()]
                     
-                    if found:
+                    if removed:
+                        self._unindex(date_str, removed)
+                        
                         # Save changes
                         if self.save_events():
                             return True, f"Event '{title}' removed from calendar"
@@ -182,18 +372,17 @@ class CalendarSkill:
                 else:
                     return False, f"No events scheduled for {date_str}"
             else:
-                # Search all dates
+                # Only visit the dates the title index says hold this title
                 found = False
-                for date in list(self.events.keys()):
-                    original_length = len(self.events[date])
+                for date in list(self._title_index.get(title.lower(), ())):
+                    removed = [event for event in self.events[date] if event["title"].lower() == title.lower()]
                     self.events[date] = [event for event in self.events[date] if event["title"].lower() != title.lower()]
                     
-                    if len(self.events[date]) < original_length:
+                    if removed:
                         found = True
                     
-                    # Remove empty dates
-                    if not self.events[date]:
-                        del self.events[date]
+                    # Remove empty dates and stale index entries
+                    self._unindex(date, removed)
                 
                 if found:
                     # Save changes
@@ -206,3 +395,310 @@ class CalendarSkill:
             
         except Exception as e:
             return False, f"Error removing event: {e}"
+    
+    @synchronized
+    def get_events_range(self, start_date_str, end_date_str):
+        """
+        Get all events between two dates, inclusive.
+        
+        Args:
+            start_date_str (str): The first date of the range in format YYYY-MM-DD
+            end_date_str (str): The last date of the range in format YYYY-MM-DD
+            
+        Returns:
+            tuple: (success, events or message)
+        """
+        try:
+            start_date = self._normalize_date(start_date_str)
+            if not start_date:
+                return False, f"Invalid date format: {start_date_str}. Please use YYYY-MM-DD or MM/DD/YYYY."
+            
+            end_date = self._normalize_date(end_date_str)
+            if not end_date:
+                return False, f"Invalid date format: {end_date_str}. Please use YYYY-MM-DD or MM/DD/YYYY."
+            
+            start_str = start_date.strftime("%Y-%m-%d")
+            end_str = end_date.strftime("%Y-%m-%d")
+            
+            # Slice the sorted date index instead of scanning every date
+            events = list(self._iter_events(start_date, end_date))
+            
+            if events:
+                return True, events
+            else:
+                return False, f"No events scheduled between {start_str} and {end_str}"
+            
+        except Exception as e:
+            return False, f"Error getting events: {e}"
+    
+    @synchronized
+    def get_week_events(self, date_str=None):
+        """
+        Get events for the week (Monday to Sunday) containing a date.
+        
+        Args:
+            date_str (str, optional): Any date in the week in format YYYY-MM-DD.
+                                      If None, uses the current week.
+                                      
+        Returns:
+            tuple: (success, events or message)
+        """
+        date_obj = self._normalize_date(date_str) if date_str else datetime.date.today()
+        if not date_obj:
+            return False, f"Invalid date format: {date_str}. Please use YYYY-MM-DD or MM/DD/YYYY."
+        
+        week_start = date_obj - datetime.timedelta(days=date_obj.weekday())
+        week_end = week_start + datetime.timedelta(days=6)
+        return self.get_events_range(week_start.strftime("%Y-%m-%d"), week_end.strftime("%Y-%m-%d"))
+    
+    @synchronized
+    def get_month_events(self, date_str=None):
+        """
+        Get events for the calendar month containing a date.
+        
+        Args:
+            date_str (str, optional): Any date in the month in format YYYY-MM-DD.
+                                      If None, uses the current month.
+                                      
+        Returns:
+            tuple: (success, events or message)
+        """
+        date_obj = self._normalize_date(date_str) if date_str else datetime.date.today()
+        if not date_obj:
+            return False, f"Invalid date format: {date_str}. Please use YYYY-MM-DD or MM/DD/YYYY."
+        
+        month_start = date_obj.replace(day=1)
+        next_month = (month_start + datetime.timedelta(days=32)).replace(day=1)
+        month_end = next_month - datetime.timedelta(days=1)
+        return self.get_events_range(month_start.strftime("%Y-%m-%d"), month_end.strftime("%Y-%m-%d"))
+    
+    @synchronized
+    def get_next_events(self, count=5, from_datetime=None):
+        """
+        Get the next upcoming events.
+        
+        Args:
+            count (int, optional): The maximum number of events to return
+            from_datetime (datetime, optional): The point in time to look from.
+                                                If None, uses the current time.
+                                                
+        Returns:
+            tuple: (success, events or message)
+        """
+        try:
+            if from_datetime is None:
+                from_datetime = datetime.datetime.now()
+            
+            today_str = from_datetime.strftime("%Y-%m-%d")
+            now_time = from_datetime.strftime("%H:%M")
+            
+            # Skip timed events that already happened today
+            upcoming = (
+                event for event in self._iter_events(from_datetime.date())
+                if not (event["date"] == today_str and event.get("time") and event["time"] < now_time)
+            )
+            events = list(itertools.islice(upcoming, count))
+            
+            if events:
+                return True, events
+            else:
+                return False, "No upcoming events scheduled"
+            
+        except Exception as e:
+            return False, f"Error getting events: {e}"
+    
+    @synchronized
+    def get_period_events(self, period="today"):
+        """
+        Get events for a spoken period such as "today", "this week" or "next month".
+        
+        Args:
+            period (str, optional): today, tomorrow, this week, next week, this month or next month
+            
+        Returns:
+            tuple: (success, events or message)
+        """
+        date_range = self._period_range(period)
+        if not date_range:
+            return False, f"I don't know the period '{period}'"
+        
+        start_date, end_date = date_range
+        if start_date == end_date:
+            return self.get_events(start_date.strftime("%Y-%m-%d"))
+        return self.get_events_range(start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
+    
+    def _period_range(self, period):
+        """
+        Get the first and last date of a spoken period.
+        
+        Returns:
+            tuple: (start_date, end_date) or None for an unknown period
+        """
+        today = datetime.date.today()
+        period = (period or "today").strip().lower()
+        
+        if period == "today":
+            return today, today
+        elif period == "tomorrow":
+            tomorrow = today + datetime.timedelta(days=1)
+            return tomorrow, tomorrow
+        elif period in ("this week", "next week"):
+            week_start = today - datetime.timedelta(days=today.weekday())
+            if period == "next week":
+                week_start += datetime.timedelta(days=7)
+            return week_start, week_start + datetime.timedelta(days=6)
+        elif period in ("this month", "next month"):
+            month_start = today.replace(day=1)
+            if period == "next month":
+                month_start = (month_start + datetime.timedelta(days=32)).replace(day=1)
+            next_month = (month_start + datetime.timedelta(days=32)).replace(day=1)
+            return month_start, next_month - datetime.timedelta(days=1)
+        else:
+            return None
+    
+    @synchronized
+    def is_free(self, date_str, time_str, duration=None):
+        """
+        Check whether a time slot is free.
+        
+        Args:
+            date_str (str): The date in format YYYY-MM-DD or MM/DD/YYYY
+            time_str (str): The start time in format HH:MM or HH:MM AM/PM
+            duration (int, optional): Length of the slot in minutes
+            
+        Returns:
+            tuple: (free, message)
+        """
+        try:
+            date_obj = self._normalize_date(date_str)
+            if not date_obj:
+                return False, f"Invalid date format: {date_str}. Please use YYYY-MM-DD or MM/DD/YYYY."
+            
+            time_obj = None
+            for time_format in ("%H:%M", "%I:%M %p"):
+                try:
+                    time_obj = datetime.datetime.strptime(time_str, time_format).time()
+                    break
+                except ValueError:
+                    continue
+            if not time_obj:
+                return False, f"Invalid time format: {time_str}. Please use HH:MM or HH:MM AM/PM."
+            
+            start = datetime.datetime.combine(date_obj, time_obj)
+            end = start + datetime.timedelta(minutes=duration or DEFAULT_EVENT_DURATION)
+            conflicts = self._busy_intervals(start, end)
+            
+            when = start.strftime("%I:%M %p on %A, %B %d")
+            if not conflicts:
+                return True, f"You're free at {when}."
+            
+            busy = "; ".join(f"{event['title']} at {busy_start.strftime('%I:%M %p')}" for busy_start, _, event in conflicts)
+            return False, f"You're busy at {when}: {busy}."
+            
+        except Exception as e:
+            return False, f"Error checking availability: {e}"
+    
+    @synchronized
+    def find_free_slots(self, start_date_str, end_date_str=None, duration=None, count=3,
+                        day_start=WORKDAY_START, day_end=WORKDAY_END):
+        """
+        Find free slots of at least a given length between two dates.
+        
+        Args:
+            start_date_str (str): The first date to search in format YYYY-MM-DD
+            end_date_str (str, optional): The last date to search. Defaults to start_date_str.
+            duration (int, optional): Minimum length of a slot in minutes
+            count (int, optional): The maximum number of slots to return
+            day_start (str, optional): Earliest time of day to consider, HH:MM
+            day_end (str, optional): Latest time of day to consider, HH:MM
+            
+        Returns:
+            tuple: (success, list of (start, end) datetimes or message)
+        """
+        try:
+            start_date = self._normalize_date(start_date_str)
+            end_date = self._normalize_date(end_date_str) if end_date_str else start_date
+            if not start_date or not end_date:
+                return False, "Invalid date format. Please use YYYY-MM-DD or MM/DD/YYYY."
+            
+            length = datetime.timedelta(minutes=duration or DEFAULT_EVENT_DURATION)
+            open_time = datetime.datetime.strptime(day_start, "%H:%M").time()
+            close_time = datetime.datetime.strptime(day_end, "%H:%M").time()
+            
+            # Don't offer slots in the past; round up to the next quarter hour
+            now = datetime.datetime.now().replace(second=0, microsecond=0)
+            now += datetime.timedelta(minutes=-now.minute % 15)
+            
+            # One overlap query for the whole range, then a sweep over the k hits
+            range_start = datetime.datetime.combine(start_date, open_time)
+            range_end = datetime.datetime.combine(end_date, close_time)
+            busy = self._busy_intervals(range_start, range_end)
+            
+            slots = []
+            position = 0
+            day = start_date
+            while day <= end_date and len(slots) < count:
+                cursor = max(datetime.datetime.combine(day, open_time), now)
+                day_close = datetime.datetime.combine(day, close_time)
+                
+                # Skip events that ended before this day's window
+                while position < len(busy) and busy[position][1] <= cursor:
+                    position += 1
+                
+                index = position
+                while cursor + length <= day_close and len(slots) < count:
+                    if index < len(busy) and busy[index][0] < day_close:
+                        busy_start, busy_end, _ = busy[index]
+                        if busy_start - cursor >= length:
+                            slots.append((cursor, busy_start))
+                        cursor = max(cursor, busy_end)
+                        index += 1
+                    else:
+                        slots.append((cursor, day_close))
+                        break
+                
+                day += datetime.timedelta(days=1)
+            
+            if slots:
+                return True, slots
+            else:
+                return False, "I couldn't find a free slot in that time."
+            
+        except Exception as e:
+            return False, f"Error finding free slots: {e}"
+    
+    @synchronized
+    def find_free_slots_in_period(self, period="today", duration=None, count=3):
+        """
+        Find free slots during a spoken period such as "tomorrow" or "this week".
+        
+        Returns:
+            tuple: (success, list of (start, end) datetimes or message)
+        """
+        date_range = self._period_range(period)
+        if not date_range:
+            return False, f"I don't know the period '{period}'"
+        
+        start_date, end_date = date_range
+        return self.find_free_slots(start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"), duration, count)
+    
+    def format_slots(self, slots):
+        """Format a list of free slots into a readable response."""
+        lines = [
+            f"{start.strftime('%A')} from {start.strftime('%I:%M %p')} to {end.strftime('%I:%M %p')}"
+            for start, end in slots
+        ]
+        return "You're free " + "; ".join(lines) + "."
+    
+    def format_events(self, events):
+        """Format a list of events into a readable response."""
+        lines = []
+        for event in events:
+            date_obj = datetime.datetime.strptime(event["date"], "%Y-%m-%d")
+            line = f"{event['title']} on {date_obj.strftime('%A, %B %d')}"
+            if event.get("time"):
+                time_obj = datetime.datetime.strptime(event["time"], "%H:%M")
+                line += f" at {time_obj.strftime('%I:%M %p')}"
+            lines.append(line)
+        
+        return "You have " + "; ".join(lines) + "."
@@ -3,18 +3,26 @@ Reminder functionality for Jarvis.
 """
 
 import json
-import os
+import uuid
 import datetime
 import threading
 import time
 from pathlib import Path
+from ..utils.recurrence import RecurrenceRule
+from ..utils.concurrency import synchronized, write_json_atomic
+from ..config import REMINDERS_FILE
 
 class ReminderSkill:
-    def __init__(self, speech_callback=None):
-        self.reminders_file = Path(__file__).parent.parent / 'data' / 'reminders.json'
+    def __init__(self, speech_callback=None, reminders_file=None):
+        self.reminders_file = Path(reminders_file or REMINDERS_FILE or Path(__file__).parent.parent / 'data' / 'reminders.json')
         self.reminders = self.load_reminders()
         self.active_reminders = {}  # Dictionary to track active reminder threads
         self.speech_callback = speech_callback  # Callback function to speak reminders
+        
+        # Guards reminders and active_reminders, which commands and reminder
+        # timers change from different threads
+        self._lock = threading.RLock()
+        self.schedule_pending()
     
     def load_reminders(self):
         """Load reminders from the reminders.json file."""
@@ -29,14 +37,11 @@ class ReminderSkill:
         
         return reminders
     
+    @synchronized
     def save_reminders(self):
         """Save reminders to the reminders.json file."""
         try:
-            os.makedirs(self.reminders_file.parent, exist_ok=True)
-            
-            with open(self.reminders_file, 'w') as f:
-                json.dump(self.reminders, f, indent=4)
-            
+            write_json_atomic(self.reminders_file, self.reminders, indent=4)
             return True
         except Exception as e:
             print(f"Error saving reminders: {e}")
@@ -46,27 +51,97 @@ class ReminderSkill:
         """Set the speech callback function."""
         self.speech_callback = callback
     
-    def _reminder_alert(self, reminder_id, title):
-        """Alert when a reminder is due."""
-        # Remove from active reminders
-        if reminder_id in self.active_reminders:
-            del self.active_reminders[reminder_id]
+    def _schedule(self, reminder):
+        """Start a timer for a pending reminder."""
+        reminder_datetime = datetime.datetime.strptime(reminder['datetime'], "%Y-%m-%d %H:%M:%S")
+        seconds_until_reminder = (reminder_datetime - datetime.datetime.now()).total_seconds()
+        
+        if seconds_until_reminder > 0:
+            reminder_thread = threading.Timer(
+                seconds_until_reminder,
+                self._reminder_alert,
+                args=[reminder['id'], reminder['title']]
+            )
+            reminder_thread.daemon = True
+            reminder_thread.start()
+            
+            # Track the active reminder
+            self.active_reminders[reminder['id']] = reminder_thread
+    
+    def _next_occurrence(self, reminder, moment):
+        """
+        Get the next occurrence of a recurring reminder after a moment.
+        
+        Only the single next instance is generated; the series itself is
+        stored as one record with its rule and start.
+        """
+        rule = RecurrenceRule.from_dict(reminder['recurrence'])
+        series_start = datetime.datetime.strptime(reminder['start'], "%Y-%m-%d %H:%M:%S")
+        return rule.next_after(series_start, moment)
+    
+    @synchronized
+    def schedule_pending(self):
+        """Start timers for stored pending reminders, e.g. after a restart."""
+        now = datetime.datetime.now()
+        changed = False
         
-        # Update reminder status
         for reminder in self.reminders:
-            if reminder.get('id') == reminder_id:
-                reminder['status'] = 'completed'
-                self.save_reminders()
-                break
+            if reminder.get('status') != 'pending' or reminder.get('id') in self.active_reminders:
+                continue
+            
+            # Move recurring reminders missed while we were offline to their next instance
+            if reminder.get('recurrence'):
+                reminder_datetime = datetime.datetime.strptime(reminder['datetime'], "%Y-%m-%d %H:%M:%S")
+                if reminder_datetime < now:
+                    next_datetime = self._next_occurrence(reminder, now)
+                    if next_datetime:
+                        reminder['datetime'] = next_datetime.strftime("%Y-%m-%d %H:%M:%S")
+                    else:
+                        reminder['status'] = 'completed'
+                    changed = True
+            
+            if reminder.get('status') == 'pending':
+                self._schedule(reminder)
         
-        # Call the speech callback if available
+        if changed:
+            self.save_reminders()
+    
+    def _reminder_alert(self, reminder_id, title):
+        """Alert when a reminder is due."""
+        with self._lock:
+            # Remove from active reminders
+            if reminder_id in self.active_reminders:
+                del self.active_reminders[reminder_id]
+            
+            # Update reminder status, or move a recurring reminder to its next instance
+            for reminder in self.reminders:
+                if reminder.get('id') == reminder_id:
+                    # Cancelled while the timer was already firing
+                    if reminder.get('status') != 'pending':
+                        return
+                    
+                    next_datetime = None
+                    if reminder.get('recurrence'):
+                        fired_at = datetime.datetime.strptime(reminder['datetime'], "%Y-%m-%d %H:%M:%S")
+                        next_datetime = self._next_occurrence(reminder, max(fired_at, datetime.datetime.now()))
+                    
+                    if next_datetime:
+                        reminder['datetime'] = next_datetime.strftime("%Y-%m-%d %H:%M:%S")
+                        self._schedule(reminder)
+                    else:
+                        reminder['status'] = 'completed'
+                    self.save_reminders()
+                    break
+        
+        # Call the speech callback if available, outside the lock since speaking takes seconds
         if self.speech_callback:
             message = f"Reminder: {title}"
             self.speech_callback(message)
         else:
             print(f"REMINDER: {title}")
     
-    def add_reminder(self, title, time_str, date_str=None):
+    @synchronized
+    def add_reminder(self, title, time_str, date_str=None, recurrence=None):
         """
         Add a reminder.
         
@@ -75,6 +150,8 @@ class ReminderSkill:
             time_str (str): The time for the reminder in format HH:MM or HH:MM AM/PM
             date_str (str, optional): The date for the reminder in format YYYY-MM-DD or MM/DD/YYYY.
                                       If not provided, the reminder is for today.
+            recurrence (RecurrenceRule, optional): Repeat the reminder on this schedule,
+                                                   starting at the first instance
                                       
         Returns:
             tuple: (success, message)
@@ -116,8 +193,17 @@ class ReminderSkill:
                     date_obj = now.date() + datetime.timedelta(days=1)
                     reminder_datetime = datetime.datetime.combine(date_obj, time_obj)
             
-            # Generate a unique ID for the reminder
-            reminder_id = str(int(time.time()))
+            # A recurring reminder fires at its first instance on or after the start
+            if recurrence:
+                if isinstance(recurrence, dict):
+                    recurrence = RecurrenceRule.from_dict(recurrence)
+                series_start = reminder_datetime
+                reminder_datetime = next(recurrence.occurrences(series_start, after=now), None)
+                if reminder_datetime is None:
+                    return False, "That recurring reminder has no upcoming instances."
+            
+            # Generate a unique ID for the reminder; several can be set in the same second
+            reminder_id = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
             
             # Create the reminder object
             reminder = {
@@ -127,6 +213,10 @@ class ReminderSkill:
                 "status": "pending"
             }
             
+            if recurrence:
+                reminder["recurrence"] = recurrence.to_dict()
+                reminder["start"] = series_start.strftime("%Y-%m-%d %H:%M:%S")
+            
             # Add to reminders list
             self.reminders.append(reminder)
             
@@ -134,30 +224,20 @@ class ReminderSkill:
             if not self.save_reminders():
                 return False, "Failed to save reminder"
             
-            # Calculate seconds until the reminder
-            seconds_until_reminder = (reminder_datetime - now).total_seconds()
-            
             # Set up the reminder thread
-            if seconds_until_reminder > 0:
-                reminder_thread = threading.Timer(
-                    seconds_until_reminder,
-                    self._reminder_alert,
-                    args=[reminder_id, title]
-                )
-                reminder_thread.daemon = True
-                reminder_thread.start()
-                
-                # Track the active reminder
-                self.active_reminders[reminder_id] = reminder_thread
+            self._schedule(reminder)
             
             # Format a human-readable response
             time_str = reminder_datetime.strftime("%I:%M %p")
             date_str = reminder_datetime.strftime("%A, %B %d, %Y")
+            if recurrence:
+                return True, f"Reminder set {recurrence.describe()} at {time_str}, starting {date_str}: {title}"
             return True, f"Reminder set for {time_str} on {date_str}: {title}"
             
         except Exception as e:
             return False, f"Error setting reminder: {e}"
     
+    @synchronized
     def get_reminders(self, status="pending"):
         """
         Get all reminders with the specified status.
@@ -188,7 +268,8 @@ class ReminderSkill:
                     if reminder_time < now:
                         continue
                 
-                filtered_reminders.append(reminder)
+                # Copies, so callers never see a timer thread update one mid-read
+                filtered_reminders.append(dict(reminder))
             
             if filtered_reminders:
                 return True, filtered_reminders
@@ -201,6 +282,7 @@ class ReminderSkill:
         except Exception as e:
             return False, f"Error getting reminders: {e}"
     
+    @synchronized
     def cancel_reminder(self, reminder_id=None, title=None):
         """
         Cancel a reminder by ID or title.
@@ -250,6 +332,7 @@ class ReminderSkill:
         except Exception as e:
             return False, f"Error cancelling reminder: {e}"
     
+    @synchronized
     def clear_completed_reminders(self):
         """
         Clear all completed or cancelled reminders.
@@ -272,3 +355,15 @@ class ReminderSkill:
             
         except Exception as e:
             return False, f"Error clearing reminders: {e}"
+    
+    def format_reminders(self, reminders):
+        """Format a list of reminders into a readable response."""
+        lines = []
+        for reminder in reminders:
+            reminder_datetime = datetime.datetime.strptime(reminder['datetime'], "%Y-%m-%d %H:%M:%S")
+            line = f"{reminder['title']} at {reminder_datetime.strftime('%I:%M %p on %A, %B %d')}"
+            if reminder.get('recurrence'):
+                line += f", repeating {RecurrenceRule.from_dict(reminder['recurrence']).describe()}"
+            lines.append(line)
+        
+        return "Your reminders: " + "; ".join(lines) + "."
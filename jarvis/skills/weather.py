@@ -2,11 +2,18 @@
 Weather functionality for Jarvis.
 """
 
-from ..utils.web import WebTools
+import datetime
+from ..utils.services import get_services
+from ..utils.recurrence import WEEKDAY_NAMES
 
 class WeatherSkill:
-    def __init__(self):
-        self.web_tools = WebTools()
+    def __init__(self, services=None):
+        self.services = services or get_services()
+    
+    @property
+    def web_tools(self):
+        """The shared WebTools instance."""
+        return self.services.get("web_tools")
     
     def get_weather(self, city):
         """
@@ -57,7 +64,6 @@ class WeatherSkill:
     def get_forecast(self, city, days=5):
         """
         Get the weather forecast for a city.
-        This is a placeholder method for future implementation.
         
         Args:
             city (str): The city to get forecast for
@@ -66,6 +72,129 @@ class WeatherSkill:
         Returns:
             tuple: (success, forecast_response or error_message)
         """
-        # Currently, we don't have a forecast feature implemented
-        # This is a placeholder for future expansion
-        return False, "Weather forecast feature is not yet implemented"
+        if not city:
+            return False, "Please specify a city"
+        
+        success, forecast = self.web_tools.get_forecast(city.strip())
+        if not success:
+            return False, forecast
+        
+        daily = self._daily_summaries(forecast)[:days]
+        parts = [self._format_day(day) for day in daily]
+        return True, f"The forecast for {forecast['city']}: " + " ".join(parts)
+    
+    def get_forecast_for(self, city, when="tomorrow"):
+        """
+        Get the forecast for a city on a spoken day, e.g. "tomorrow", "this weekend" or "on friday".
+        
+        Returns:
+            tuple: (success, forecast_response or error_message)
+        """
+        if not city:
+            return False, "Please specify a city"
+        
+        success, forecast = self.web_tools.get_forecast(city.strip())
+        if not success:
+            return False, forecast
+        
+        days = self._select_days(forecast, when)
+        if not days:
+            return False, f"I only have a forecast for the next few days in {forecast['city']}."
+        
+        parts = [self._format_day(day) for day in days]
+        return True, f"In {forecast['city']}, " + " ".join(parts)
+    
+    def will_it(self, city, condition="rain", when="tomorrow"):
+        """
+        Answer "will it rain/snow" for a city on a spoken day from the cached forecast series.
+        
+        Returns:
+            tuple: (success, response or error_message)
+        """
+        if not city:
+            return False, "Please specify a city"
+        
+        success, forecast = self.web_tools.get_forecast(city.strip())
+        if not success:
+            return False, forecast
+        
+        days = self._select_days(forecast, when)
+        if not days:
+            return False, f"I only have a forecast for the next few days in {forecast['city']}."
+        
+        condition = condition.lower()
+        answers = []
+        for day in days:
+            matches = [entry for entry in day["entries"] if condition in entry["condition"].lower()
+                       or condition in entry["description"].lower()]
+            day_name = day["date"].strftime("%A")
+            if matches:
+                first = matches[0]["time"].strftime("%I %p").lstrip("0")
+                chance = max(day["rain_chance"], max(entry["rain_chance"] for entry in matches))
+                answers.append(f"Yes, {condition} is expected in {forecast['city']} on {day_name} from about {first}, "
+                               f"with a {chance}% chance of precipitation.")
+            else:
+                answers.append(f"No {condition} is expected in {forecast['city']} on {day_name}. "
+                               f"The chance of precipitation is {day['rain_chance']}%.")
+        
+        return True, " ".join(answers)
+    
+    def _daily_summaries(self, forecast):
+        """Group the 3-hour forecast entries into one summary per local day."""
+        days = {}
+        for entry in forecast["entries"]:
+            days.setdefault(entry["time"].date(), []).append(entry)
+        
+        summaries = []
+        for date in sorted(days):
+            entries = days[date]
+            descriptions = [entry["description"] for entry in entries]
+            summaries.append({
+                "date": date,
+                "entries": entries,
+                "low": round(min(entry["temperature"] for entry in entries)),
+                "high": round(max(entry["temperature"] for entry in entries)),
+                "description": max(set(descriptions), key=descriptions.count),
+                "rain_chance": max(entry["rain_chance"] for entry in entries)
+            })
+        return summaries
+    
+    def _select_days(self, forecast, when):
+        """Pick the daily summaries matching a spoken day."""
+        summaries = self._daily_summaries(forecast)
+        if not summaries:
+            return []
+        
+        # The first entry can already be tomorrow late in the city's day; "today" is the city's calendar date now
+        offset = datetime.timedelta(seconds=forecast.get("utc_offset", 0))
+        today = (datetime.datetime.now(datetime.timezone.utc) + offset).date()
+        when = (when or "today").strip().lower()
+        if when.startswith("on "):
+            when = when[3:]
+        
+        if when == "today":
+            wanted = {today}
+        elif when == "tomorrow":
+            wanted = {today + datetime.timedelta(days=1)}
+        elif when in ("this weekend", "the weekend", "weekend"):
+            saturday = today + datetime.timedelta(days=(5 - today.weekday()) % 7)
+            wanted = {saturday, saturday + datetime.timedelta(days=1)}
+            if today.weekday() == 6:
+                wanted = {today}
+        elif when in WEEKDAY_NAMES:
+            offset = (WEEKDAY_NAMES.index(when) - today.weekday()) % 7
+            wanted = {today + datetime.timedelta(days=offset)}
+        else:
+            return []
+        
+        return [summary for summary in summaries if summary["date"] in wanted]
+    
+    def _format_day(self, day):
+        """Format a daily summary into a sentence."""
+        response = (
+            f"{day['date'].strftime('%A')}: {day['description']}, "
+            f"between {day['low']}°C and {day['high']}°C"
+        )
+        if day["rain_chance"] >= 30:
+            response += f", with a {day['rain_chance']}% chance of precipitation"
+        return response + "."
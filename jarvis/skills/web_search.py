@@ -2,12 +2,34 @@
 Web search functionality for Jarvis.
 """
 
-from ..utils.web import WebTools
+from ..utils.services import get_services
+from ..utils.calculator import LocalAnswerEngine
 import random
 
 class WebSearchSkill:
-    def __init__(self):
-        self.web_tools = WebTools()
+    def __init__(self, services=None):
+        self.services = services or get_services()
+        self.local_answers = LocalAnswerEngine()
+    
+    @property
+    def web_tools(self):
+        """The shared WebTools instance."""
+        return self.services.get("web_tools")
+    
+    @property
+    def news_feed(self):
+        """The shared, background-refreshed news headlines."""
+        return self.services.get("news_feed")
+    
+    @property
+    def knowledge(self):
+        """The local store of previously fetched answers."""
+        return self.services.get("knowledge")
+    
+    @property
+    def system(self):
+        """The shared SystemOperations instance."""
+        return self.services.get("system")
     
     def search(self, query, engine=None):
         """Search the web for the given query."""
@@ -21,16 +43,43 @@ class WebSearchSkill:
         if not query:
             return False, "No query provided"
         
+        success, result = self.lookup_info(query, sentences)
+        if success:
+            return True, result
+        
+        # If Wikipedia fails, try a web search instead
+        return self.search(query)
+    
+    def lookup_info(self, query, sentences=3):
+        """
+        Look a topic up locally or on Wikipedia, without falling back to opening a search.
+        
+        Safe to call speculatively: it has no effect beyond caching the answer.
+        """
+        # "What is 12 times 7" lands here too; arithmetic never needs the network
+        success, result = self.local_answers.answer(query)
+        if success:
+            return True, result
+        
+        # Answer from the local store if we've looked this up recently
+        known = self.knowledge.lookup(query)
+        if known:
+            return True, known["answer"]
+        
         # Try to get information from Wikipedia
         success, result = self.web_tools.get_wikipedia_info(query, sentences)
         
         if success:
             # Format the response
             response = f"{result['title']}: {result['summary']}"
+            self.knowledge.store(query, response, "wikipedia", entity=result['title'])
             return True, response
-        else:
-            # If Wikipedia fails, try a web search instead
-            return self.search(query)
+        
+        # Offline or no page: an older stored answer beats none
+        known = self.knowledge.lookup(query, allow_stale=True)
+        if known:
+            return True, known["answer"]
+        return False, result
     
     def play_youtube(self, video):
         """Play a video on YouTube."""
@@ -44,9 +93,7 @@ class WebSearchSkill:
         if not url:
             return False, "No URL provided"
         
-        from ..utils.system import SystemOperations
-        system = SystemOperations()
-        return system.open_website(url)
+        return self.system.open_website(url)
     
     def get_weather(self, city):
         """Get weather information for a city."""
@@ -67,9 +114,32 @@ class WebSearchSkill:
         else:
             return False, result
     
+    def get_weather_many(self, cities):
+        """Get weather information for several cities in one summary."""
+        if not cities:
+            return False, "No city name provided"
+        if len(cities) == 1:
+            return self.get_weather(cities[0])
+        
+        parts = []
+        failed = []
+        for city, success, result in self.web_tools.get_weather_many(cities):
+            if success:
+                parts.append(
+                    f"In {result['city']} it's {result['description']} and {round(result['temperature'])}°C."
+                )
+            else:
+                failed.append(city.title())
+        
+        if not parts:
+            return False, f"I couldn't get the weather for {' or '.join(failed)}."
+        if failed:
+            parts.append(f"I couldn't get the weather for {' and '.join(failed)}.")
+        return True, " ".join(parts)
+    
     def get_news(self, category="general", country="us", count=5):
         """Get the latest news headlines."""
-        success, result = self.web_tools.get_news(category, country, count)
+        success, result = self.news_feed.get(category, country, count)
         
         if success:
             # Format the response
@@ -86,11 +156,35 @@ class WebSearchSkill:
         if not query:
             return False, "No question provided"
         
+        success, result = self.lookup_answer(query)
+        if success:
+            return True, result
+        
+        # If nothing knows the answer, try a web search instead
+        return self.search(query)
+    
+    def lookup_answer(self, query):
+        """
+        Answer a question locally, from Wolfram Alpha or from Wikipedia, without opening a search.
+        
+        Safe to call speculatively: it has no effect beyond caching the answer.
+        """
+        # Arithmetic and unit conversions are answered locally
+        success, result = self.local_answers.answer(query)
+        if success:
+            return True, result
+        
+        # Answer from the local store if we've asked this recently
+        known = self.knowledge.lookup(query)
+        if known:
+            return True, known["answer"]
+        
         # Try Wolfram Alpha first for factual questions
         success, result = self.web_tools.ask_wolfram(query)
         
         if success:
+            self.knowledge.store(query, result, "wolfram")
             return True, result
         else:
             # If Wolfram Alpha fails, try Wikipedia
-            return self.get_info(query)
+            return self.lookup_info(query)
@@ -0,0 +1,138 @@
+"""
+Stress test for Jarvis's shared state under concurrent commands.
+
+Run it with `python -m jarvis.stress`. It starts one Jarvis without voice
+whose calendar, reminders and command log are files in a temporary
+directory, so your own data is never read or written and none of your
+reminders are scheduled. It then sends thousands of mixed commands from
+many threads over many sessions, the way daemon clients do: setting and
+listing reminders, adding and listing events, and arithmetic. Afterwards it checks
+that no update was lost: every reminder and event is in memory once, with a
+unique ID, and the same ones are on disk.
+"""
+
+import os
+import sys
+import json
+import time
+import datetime
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+def run(jarvis, commands, threads, sessions):
+    """
+    Send mixed commands to Jarvis from many threads and check for lost updates.
+    
+    Args:
+        jarvis (Jarvis): The assistant, with its calendar and reminders on scratch files
+        commands (int): How many commands to send
+        threads (int): How many threads send them
+        sessions (int): How many sessions they are spread over
+    
+    Returns:
+        dict: The elapsed seconds and a list of the problems found
+    """
+    from jarvis.utils.session import Session
+    
+    session_list = [Session() for _ in range(sessions)]
+    
+    def send(i):
+        session = session_list[i % sessions]
+        kind = i % 5
+        if kind == 0:
+            return jarvis.execute_command(f"remind me to check task {i} at 5 pm", session)
+        if kind == 1:
+            # There's no spoken command for adding events, so go to the skill as the calendar UI does
+            return jarvis.calendar.add_event(f"Event {i}", f"2030-01-{i % 28 + 1:02d}",
+                                             f"{i % 24:02d}:{i % 60:02d}", allow_conflicts=True)
+        if kind == 2:
+            return jarvis.execute_command("what are my reminders", session)
+        if kind == 3:
+            return jarvis.execute_command("what's on my calendar this week", session)
+        return jarvis.execute_command(f"what is {i} times 4", session)
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(send, range(commands)))
+    elapsed = time.perf_counter() - start
+    
+    problems = []
+    failed = [i for i, result in enumerate(results) if i % 5 in (0, 1) and not _succeeded(result)]
+    if failed:
+        problems.append(f"{len(failed)} updates failed, e.g. command {failed[0]}: {results[failed[0]]}")
+    
+    expected = len(range(0, commands, 5))
+    reminders = jarvis.reminders.reminders
+    ids = [reminder["id"] for reminder in reminders]
+    if len(reminders) != expected:
+        problems.append(f"{len(reminders)} reminders in memory, expected {expected}")
+    if len(set(ids)) != len(ids):
+        problems.append(f"{len(ids) - len(set(ids))} reminder IDs were given out twice")
+    
+    with open(jarvis.reminders.reminders_file) as f:
+        on_disk = json.load(f)
+    if sorted(reminder["id"] for reminder in on_disk) != sorted(ids):
+        problems.append(f"{len(on_disk)} reminders on disk don't match the {len(ids)} in memory")
+    
+    expected = len(range(1, commands, 5))
+    events = sum(len(day) for day in jarvis.calendar.events.values())
+    if events != expected:
+        problems.append(f"{events} events in memory, expected {expected}")
+    dates = [datetime.date.fromisoformat(date) for date in jarvis.calendar._dates]
+    indexed = sum(1 for _ in jarvis.calendar._iter_events(min(dates), max(dates))) if dates else 0
+    if indexed != events:
+        problems.append(f"{indexed} events in the calendar's index, {events} stored")
+    
+    with open(jarvis.calendar.events_file) as f:
+        on_disk = sum(len(day) for day in json.load(f).values())
+    if on_disk != events:
+        problems.append(f"{on_disk} events on disk, {events} in memory")
+    
+    return {"elapsed": elapsed, "problems": problems}
+
+def _succeeded(result):
+    # execute_command returns (action, success, response); the calendar returns (success, message)
+    return result[1] if len(result) == 3 else result[0]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send many concurrent commands to Jarvis and check for lost updates")
+    parser.add_argument("--commands", type=int, default=4000, help="How many commands to send")
+    parser.add_argument("--threads", type=int, default=32, help="How many threads send them")
+    parser.add_argument("--sessions", type=int, default=32, help="How many sessions they are spread over")
+    args = parser.parse_args(argv)
+    
+    # Settings are read when jarvis.config is first imported, so set them before importing Jarvis
+    if "jarvis.config" in sys.modules:
+        print("Error: jarvis.config was imported before the stress test could point it at scratch files.")
+        return 1
+    scratch = Path(tempfile.mkdtemp(prefix="jarvis-stress-"))
+    os.environ["JARVIS_CALENDAR_FILE"] = str(scratch / "calendar_events.json")
+    os.environ["JARVIS_REMINDERS_FILE"] = str(scratch / "reminders.json")
+    os.environ["JARVIS_COMMAND_LOG"] = str(scratch / "command_log.jsonl")
+    
+    from jarvis.main import Jarvis
+    jarvis = Jarvis(voice=False)
+    
+    try:
+        result = run(jarvis, args.commands, args.threads, args.sessions)
+    finally:
+        for timer in list(jarvis.reminders.active_reminders.values()):
+            timer.cancel()
+        jarvis.briefing.close()
+        jarvis.plan_executor.shutdown(wait=False)
+        jarvis.services.shutdown()
+        shutil.rmtree(scratch, ignore_errors=True)
+    
+    print(f"{args.commands} commands from {args.threads} threads over {args.sessions} sessions "
+          f"in {result['elapsed']:.1f}s ({args.commands / result['elapsed']:.0f} per second)")
+    for problem in result["problems"]:
+        print(f"Lost update: {problem}")
+    if not result["problems"]:
+        print("No lost updates.")
+    return 1 if result["problems"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Index of launchable applications on Linux and other POSIX systems.
+"""
+
+import os
+import json
+import time
+import shlex
+import threading
+from pathlib import Path
+from .concurrency import write_json_atomic
+from ..config import APP_INDEX_RECHECK_INTERVAL
+
+# Desktop entry field codes that are replaced by files/URLs at launch time
+DESKTOP_FIELD_CODES = {"%f", "%F", "%u", "%U", "%d", "%D", "%n", "%N", "%i", "%c", "%k", "%v", "%m"}
+
+# Bumped when the stored commands change form, so directories cached in an older one are rescanned
+INDEX_VERSION = 2
+
+class AppIndex:
+    """
+    Maps spoken application names to launch commands.
+    
+    The index covers executables on PATH and XDG .desktop files. It is
+    persisted to disk together with the mtime of every scanned directory,
+    so a restart only rescans directories whose contents have changed.
+    While running, lookups re-check those mtimes at most every
+    recheck_interval seconds, so an application installed or removed after
+    startup is picked up without a restart. Resolving a name is otherwise a
+    single dictionary lookup.
+    """
+    
+    def __init__(self, cache_file=None, recheck_interval=APP_INDEX_RECHECK_INTERVAL):
+        self.cache_file = cache_file or Path(__file__).parent.parent / 'data' / 'app_index.json'
+        self.recheck_interval = recheck_interval
+        self.apps = {}
+        self._directories = {}
+        self._checked_at = 0
+        self._lock = threading.Lock()
+        self.refresh()
+    
+    def lookup(self, app_name):
+        """Get the launch command for an application name, or None."""
+        if time.monotonic() - self._checked_at >= self.recheck_interval:
+            self.refresh()
+        return self.apps.get(app_name.strip().lower())
+    
+    def refresh(self):
+        """Rescan directories whose mtime changed since the last scan and rebuild the index."""
+        with self._lock:
+            self._refresh()
+    
+    def _refresh(self):
+        cached = self._directories or self._load_cache()
+        directories = {}
+        changed = False
+        
+        for kind, directory in self._search_directories():
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                continue
+            
+            entry = cached.get(directory)
+            if entry and entry.get("mtime") == mtime and entry.get("kind") == kind \
+                    and entry.get("version") == INDEX_VERSION:
+                directories[directory] = entry
+                continue
+            
+            scan = self._scan_desktop_dir if kind == "desktop" else self._scan_bin_dir
+            directories[directory] = {"kind": kind, "mtime": mtime, "version": INDEX_VERSION, "apps": scan(directory)}
+            changed = True
+        
+        if changed or set(directories) != set(cached):
+            self._save_cache(directories)
+            self.apps = self._merge(directories)
+        elif not self._directories:
+            self.apps = self._merge(directories)
+        self._directories = directories
+        self._checked_at = time.monotonic()
+    
+    def _search_directories(self):
+        """List PATH directories followed by XDG application directories."""
+        directories = []
+        seen = set()
+        
+        for directory in os.environ.get("PATH", "").split(os.pathsep):
+            if directory and directory not in seen:
+                seen.add(directory)
+                directories.append(("bin", directory))
+        
+        data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+        data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+        for data_dir in [data_home] + data_dirs.split(":"):
+            directory = os.path.join(data_dir, "applications")
+            if data_dir and directory not in seen:
+                seen.add(directory)
+                directories.append(("desktop", directory))
+        
+        return directories
+    
+    def _scan_bin_dir(self, directory):
+        """Find the executables in a PATH directory, as commands quoted for shlex.split like desktop entries."""
+        apps = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file() and os.access(entry.path, os.X_OK):
+                            apps[entry.name.lower()] = shlex.quote(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return apps
+    
+    def _scan_desktop_dir(self, directory):
+        """Read the application names and Exec lines of the .desktop files in a directory."""
+        apps = {}
+        for desktop_file in Path(directory).glob("*.desktop"):
+            entry = self._parse_desktop_file(desktop_file)
+            if not entry:
+                continue
+            
+            name, command = entry
+            apps[name.lower()] = command
+            apps.setdefault(desktop_file.stem.lower(), command)
+        return apps
+    
+    def _parse_desktop_file(self, desktop_file):
+        """
+        Parse the [Desktop Entry] section of a .desktop file.
+        
+        Returns:
+            tuple: (name, command) or None if the entry should not be launched
+        """
+        values = {}
+        in_entry = False
+        try:
+            with open(desktop_file, 'r', encoding='utf-8', errors='ignore') as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith("["):
+                        in_entry = line == "[Desktop Entry]"
+                    elif in_entry and "=" in line:
+                        key, value = line.split("=", 1)
+                        values.setdefault(key.strip(), value.strip())
+        except OSError:
+            return None
+        
+        if values.get("Type", "Application") != "Application":
+            return None
+        if values.get("NoDisplay") == "true" or values.get("Hidden") == "true":
+            return None
+        if not values.get("Name") or not values.get("Exec"):
+            return None
+        
+        try:
+            arguments = [arg for arg in shlex.split(values["Exec"]) if arg not in DESKTOP_FIELD_CODES]
+        except ValueError:
+            return None
+        if not arguments:
+            return None
+        
+        return values["Name"], shlex.join(arguments)
+    
+    def _merge(self, directories):
+        """
+        Build the name -> command map.
+        
+        Earlier PATH directories win over later ones, desktop entries win over
+        bare executables, and short aliases ("chrome" for "google chrome" or
+        "google-chrome") are added where they don't clash with a real name.
+        """
+        apps = {}
+        for entry in directories.values():
+            if entry["kind"] == "bin":
+                for name, command in entry["apps"].items():
+                    apps.setdefault(name, command)
+                    if "-" in name:
+                        apps.setdefault(name.replace("-", " "), command)
+        
+        desktop_apps = {}
+        for entry in directories.values():
+            if entry["kind"] == "desktop":
+                for name, command in entry["apps"].items():
+                    desktop_apps.setdefault(name, command)
+        apps.update(desktop_apps)
+        
+        for name, command in desktop_apps.items():
+            words = name.replace("-", " ").split()
+            if len(words) > 1:
+                apps.setdefault(" ".join(words), command)
+                apps.setdefault(words[-1], command)
+        
+        return apps
+    
+    def _load_cache(self):
+        """Load the persisted directory scans."""
+        try:
+            if Path(self.cache_file).exists():
+                with open(self.cache_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Error loading application index: {e}")
+        return {}
+    
+    def _save_cache(self, directories):
+        """Persist the directory scans."""
+        try:
+            write_json_atomic(self.cache_file, directories)
+        except Exception as e:
+            print(f"Error saving application index: {e}")
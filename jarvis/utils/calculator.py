@@ -0,0 +1,329 @@
+"""
+Local arithmetic and unit conversion for Jarvis, answered without the network.
+"""
+
+import re
+import ast
+import math
+import operator
+
+NUMBER_WORDS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
+    "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18,
+    "nineteen": 19, "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60,
+    "seventy": 70, "eighty": 80, "ninety": 90
+}
+SCALE_WORDS = {"hundred": 100, "thousand": 1000, "million": 10 ** 6, "billion": 10 ** 9, "trillion": 10 ** 12}
+
+# Spoken operators, longest first so "divided by" wins over "by"
+OPERATOR_PHRASES = [
+    ("to the power of", "**"), ("raised to the power of", "**"), ("raised to", "**"),
+    ("multiplied by", "*"), ("divided by", "/"), ("percent of", "/100*"),
+    ("square root of", "sqrt "), ("cube root of", "cbrt "),
+    ("times", "*"), ("x", "*"), ("over", "/"), ("plus", "+"), ("minus", "-"),
+    ("add", "+"), ("mod", "%"), ("modulo", "%"), ("squared", "**2"), ("cubed", "**3"),
+    ("percent", "/100"), ("negative", "-")
+]
+
+# Unit name -> (dimension, factor to the dimension's base unit)
+UNITS = {
+    "length": ("meter", {
+        "millimeter": 0.001, "centimeter": 0.01, "meter": 1, "kilometer": 1000,
+        "inch": 0.0254, "foot": 0.3048, "yard": 0.9144, "mile": 1609.344, "nautical mile": 1852
+    }),
+    "mass": ("kilogram", {
+        "milligram": 1e-6, "gram": 0.001, "kilogram": 1, "tonne": 1000,
+        "ounce": 0.028349523125, "pound": 0.45359237, "stone": 6.35029318
+    }),
+    "volume": ("liter", {
+        "milliliter": 0.001, "liter": 1, "teaspoon": 0.00492892159375, "tablespoon": 0.01478676478125,
+        "fluid ounce": 0.0295735295625, "cup": 0.2365882365, "pint": 0.473176473,
+        "quart": 0.946352946, "gallon": 3.785411784
+    }),
+    "time": ("second", {
+        "millisecond": 0.001, "second": 1, "minute": 60, "hour": 3600, "day": 86400,
+        "week": 604800, "year": 31557600
+    }),
+    "speed": ("meter per second", {
+        "meter per second": 1, "kilometer per hour": 1 / 3.6, "mile per hour": 0.44704, "knot": 0.514444
+    }),
+    "data": ("byte", {
+        "bit": 0.125, "byte": 1, "kilobyte": 1024, "megabyte": 1024 ** 2,
+        "gigabyte": 1024 ** 3, "terabyte": 1024 ** 4
+    }),
+    "temperature": ("celsius", {"celsius": None, "fahrenheit": None, "kelvin": None})
+}
+
+# Spoken and abbreviated names for each unit
+UNIT_ALIASES = {
+    "mm": "millimeter", "millimetre": "millimeter", "cm": "centimeter", "centimetre": "centimeter",
+    "m": "meter", "metre": "meter", "km": "kilometer", "kilometre": "kilometer",
+    "in": "inch", "inches": "inch", "ft": "foot", "feet": "foot", "yd": "yard", "mi": "mile",
+    "mg": "milligram", "g": "gram", "gramme": "gram", "kg": "kilogram", "kilo": "kilogram",
+    "ton": "tonne", "metric ton": "tonne", "oz": "ounce", "lb": "pound", "lbs": "pound",
+    "ml": "milliliter", "millilitre": "milliliter", "l": "liter", "litre": "liter",
+    "tsp": "teaspoon", "tbsp": "tablespoon", "fl oz": "fluid ounce",
+    "ms": "millisecond", "sec": "second", "min": "minute", "hr": "hour",
+    "mps": "meter per second", "kph": "kilometer per hour", "kmh": "kilometer per hour",
+    "km per hour": "kilometer per hour", "kilometers an hour": "kilometer per hour",
+    "mph": "mile per hour", "miles an hour": "mile per hour", "knots": "knot",
+    "kb": "kilobyte", "mb": "megabyte", "gb": "gigabyte", "tb": "terabyte",
+    "c": "celsius", "centigrade": "celsius", "degrees celsius": "celsius", "degree celsius": "celsius",
+    "f": "fahrenheit", "degrees fahrenheit": "fahrenheit", "degree fahrenheit": "fahrenheit",
+    "k": "kelvin", "kelvins": "kelvin"
+}
+
+SAFE_OPERATORS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+    ast.Pow: operator.pow, ast.USub: operator.neg, ast.UAdd: operator.pos
+}
+SAFE_FUNCTIONS = {"sqrt": math.sqrt, "cbrt": lambda value: math.copysign(abs(value) ** (1 / 3), value)}
+
+MAX_RESULT_EXPONENT = 308  # Powers with larger results (past float range) are left to Wolfram Alpha
+MAX_EXACT_RESULT = 10 ** 15  # Larger results are spoken as "x times 10 to the power of n"
+
+class LocalAnswerEngine:
+    """
+    Answers spoken arithmetic ("what is twelve times 7") and unit conversions
+    ("how many feet in a mile") locally.
+    
+    Expressions are evaluated by walking a whitelisted Python AST, never with
+    eval(). Anything that cannot be parsed returns (False, None) so the caller
+    can fall through to Wolfram Alpha.
+    """
+    
+    def __init__(self):
+        self._units = {}
+        for dimension, (_, factors) in UNITS.items():
+            for name, factor in factors.items():
+                self._units[name] = (dimension, factor)
+                self._units[name + "s"] = (dimension, factor)
+                if " per " in name:
+                    head, tail = name.split(" per ", 1)
+                    self._units[f"{head}s per {tail}"] = (dimension, factor)
+        for alias, name in UNIT_ALIASES.items():
+            self._units[alias] = self._units[name]
+        
+        self._operators = dict(OPERATOR_PHRASES)
+        phrases = sorted(self._operators, key=len, reverse=True)
+        self._operator_pattern = re.compile(r"(?<![a-z])(?:" + "|".join(re.escape(phrase) for phrase in phrases) + r")(?![a-z])")
+        
+        unit_pattern = "|".join(re.escape(unit) for unit in sorted(self._units, key=len, reverse=True))
+        number = r"[\w\s\.\-,]+?"
+        self._conversion_patterns = [
+            re.compile(rf"^(?:convert\s+)?(?P<value>{number})\s*(?P<source>{unit_pattern})\s+(?:to|in|into|as)\s+(?P<target>{unit_pattern})$"),
+            re.compile(rf"^how many\s+(?P<target>{unit_pattern})\s+(?:are\s+)?(?:there\s+)?(?:in|per)\s+(?P<value>{number})?\s*(?P<source>{unit_pattern})$")
+        ]
+    
+    def answer(self, query):
+        """
+        Try to answer a question locally.
+        
+        Returns:
+            tuple: (success, response) where success is False if the query
+                   isn't arithmetic or a conversion this engine understands
+        """
+        text = self._clean(query)
+        if not text:
+            return False, None
+        
+        try:
+            converted = self._convert(text)
+            if converted:
+                return True, converted
+            
+            value = self._calculate(text)
+            if value is not None:
+                return True, f"{self._spoken_expression(text)} is {self._format(value)}."
+        except (ValueError, ZeroDivisionError, OverflowError, SyntaxError, TypeError):
+            return False, None
+        
+        return False, None
+    
+    def _clean(self, query):
+        text = (query or "").lower().strip().rstrip("?.! ")
+        text = re.sub(r"^(what('s| is)|how much is|calculate|compute|tell me|work out|whats)\s+", "", text)
+        text = re.sub(r"^(the value of|the result of)\s+", "", text)
+        text = text.replace(",", "") if re.search(r"\d,\d{3}", text) else text
+        return text.strip()
+    
+    def _convert(self, text):
+        for pattern in self._conversion_patterns:
+            match = pattern.match(text)
+            if not match:
+                continue
+            
+            source_name = match.group("source")
+            target_name = match.group("target")
+            source_dimension, source_factor = self._units[source_name]
+            target_dimension, target_factor = self._units[target_name]
+            if source_dimension != target_dimension:
+                raise ValueError("Incompatible units")
+            
+            raw_value = (match.group("value") or "one").strip()
+            value = self._parse_number(raw_value)
+            if value is None:
+                return None
+            
+            if source_dimension == "temperature":
+                result = self._convert_temperature(value, self._canonical(source_name), self._canonical(target_name))
+            else:
+                result = value * source_factor / target_factor
+            
+            return (f"{self._format(value)} {self._unit_label(source_name, value)} is "
+                    f"{self._format(result)} {self._unit_label(target_name, result)}.")
+        return None
+    
+    def _canonical(self, unit):
+        unit = UNIT_ALIASES.get(unit, unit)
+        return unit[:-1] if unit.endswith("s") and unit[:-1] in self._units else unit
+    
+    def _unit_label(self, unit, value):
+        name = self._canonical(unit)
+        if name in ("celsius", "fahrenheit", "kelvin"):
+            return "kelvin" if name == "kelvin" else f"degrees {name}"
+        if abs(value) == 1:
+            return name
+        if name == "foot":
+            return "feet"
+        if name == "inch":
+            return "inches"
+        if " per " in name:
+            head, tail = name.split(" per ", 1)
+            return f"{head}s per {tail}"
+        return name + "s"
+    
+    def _convert_temperature(self, value, source, target):
+        celsius = {
+            "celsius": value,
+            "fahrenheit": (value - 32) * 5 / 9,
+            "kelvin": value - 273.15
+        }[source]
+        return {
+            "celsius": celsius,
+            "fahrenheit": celsius * 9 / 5 + 32,
+            "kelvin": celsius + 273.15
+        }[target]
+    
+    def _calculate(self, text):
+        expression = self._to_expression(text)
+        if expression is None or not re.search(r"[\+\-\*/%]|sqrt|cbrt", expression):
+            return None
+        tree = ast.parse(expression, mode="eval")
+        return self._evaluate(tree.body)
+    
+    def _to_expression(self, text):
+        """Translate spoken arithmetic into a Python expression, or None."""
+        # Speech recognition writes "percent" as "%"; only the spoken "mod" is modulo
+        text = re.sub(r"%\s*of(?![a-z])", " /100* ", text)
+        text = text.replace("%", " /100 ")
+        text = self._operator_pattern.sub(lambda match: f" {self._operators[match.group(0)]} ", text)
+        
+        tokens = re.findall(r"\d+(?:\.\d+)?|\*\*|[\+\-\*/%\(\)]|[a-z]+", text)
+        output = []
+        words = []
+        
+        def flush():
+            if words:
+                value = self._parse_number(" ".join(words))
+                if value is None:
+                    raise ValueError(f"Not a number: {' '.join(words)}")
+                output.append(repr(value))
+                words.clear()
+        
+        for token in tokens:
+            if re.match(r"\d", token) and words and re.match(r"\d", words[-1]):
+                # Two numbers with no operator between them ("20 /100 3" from "20 % 3")
+                return None
+            elif token in NUMBER_WORDS or token in SCALE_WORDS or token == "point" or re.match(r"\d", token):
+                words.append(token)
+            elif token in ("and", "a") and words:
+                words.append(token)
+            elif token in ("sqrt", "cbrt"):
+                flush()
+                output.append(token)
+            elif token in ("+", "-", "*", "**", "/", "%", "(", ")"):
+                flush()
+                output.append(token)
+            elif token in ("the", "of", "is", "equal", "equals", "by", "a", "an"):
+                flush()
+            else:
+                return None
+        flush()
+        
+        # Function words become calls on the operand that follows
+        expression = " ".join(output)
+        expression = re.sub(r"(sqrt|cbrt)\s+([\d\.]+|\([^\)]*\))", r"\1(\2)", expression)
+        return expression or None
+    
+    def _parse_number(self, text):
+        """Parse digits or spoken numbers such as "one hundred and five" or "three point one four"."""
+        text = text.strip().replace(",", "")
+        try:
+            return int(text) if re.fullmatch(r"-?\d+", text) else float(text)
+        except ValueError:
+            pass
+        
+        words = [word for word in re.split(r"[\s\-]+", text) if word and word != "and"]
+        if not words:
+            return None
+        
+        total, current, fraction, in_fraction = 0, 0, "", False
+        for index, word in enumerate(words):
+            if word == "a" and index == 0:
+                current = 1
+            elif word == "point":
+                in_fraction = True
+            elif in_fraction:
+                if word in NUMBER_WORDS and NUMBER_WORDS[word] < 10:
+                    fraction += str(NUMBER_WORDS[word])
+                elif word.isdigit():
+                    fraction += word
+                else:
+                    return None
+            elif word in NUMBER_WORDS:
+                current += NUMBER_WORDS[word]
+            elif re.fullmatch(r"\d+(\.\d+)?", word):
+                current += float(word) if "." in word else int(word)
+            elif word == "hundred":
+                current = (current or 1) * 100
+            elif word in SCALE_WORDS:
+                total += (current or 1) * SCALE_WORDS[word]
+                current = 0
+            else:
+                return None
+        
+        value = total + current
+        if fraction:
+            value = float(f"{value}.{fraction}")
+        return value
+    
+    def _evaluate(self, node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.BinOp) and type(node.op) in SAFE_OPERATORS:
+            left, right = self._evaluate(node.left), self._evaluate(node.right)
+            if isinstance(node.op, ast.Pow) and left and abs(right) * math.log10(abs(left)) > MAX_RESULT_EXPONENT:
+                raise OverflowError("Result too large")
+            return SAFE_OPERATORS[type(node.op)](left, right)
+        if isinstance(node, ast.UnaryOp) and type(node.op) in SAFE_OPERATORS:
+            return SAFE_OPERATORS[type(node.op)](self._evaluate(node.operand))
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id in SAFE_FUNCTIONS and len(node.args) == 1 and not node.keywords):
+            return SAFE_FUNCTIONS[node.func.id](self._evaluate(node.args[0]))
+        raise ValueError("Unsupported expression")
+    
+    def _spoken_expression(self, text):
+        return text[0].upper() + text[1:] if text else text
+    
+    def _format(self, value):
+        if abs(value) >= MAX_EXACT_RESULT:
+            mantissa, exponent = f"{value:.5e}".split("e")
+            return f"{float(mantissa):g} times 10 to the power of {int(exponent)}"
+        if isinstance(value, float):
+            if value.is_integer() and abs(value) < 1e15:
+                return f"{int(value):,}"
+            return f"{value:,.6g}" if abs(value) >= 1e-4 else f"{value:.6g}"
+        return f"{value:,}"
@@ -0,0 +1,128 @@
+"""
+Append-only history of the commands Jarvis has run.
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+class CommandLog:
+    """
+    Records every command as one compact JSON line:
+
+        {"t":1760860812.5,"a":"get_weather","p":{"city":"london"},"ok":true}
+
+    t is the Unix time, a the action, p its parameters and ok whether it
+    succeeded. Lines are only appended, so a crash can at worst leave a
+    partial last line, which read() skips. compact() drops old lines by
+    rewriting the file, so it doesn't grow without bound.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else Path(__file__).parent.parent / 'data' / 'command_log.jsonl'
+        self._file = None
+        self._lock = threading.Lock()
+
+    def append(self, action, params, success, timestamp=None):
+        """Record a command."""
+        entry = {"t": round(timestamp or time.time(), 3), "a": action, "p": params, "ok": success}
+        line = json.dumps(entry, separators=(",", ":"), default=str) + "\n"
+
+        with self._lock:
+            try:
+                if self._file is None:
+                    os.makedirs(self.path.parent, exist_ok=True)
+                    self._file = open(self.path, 'a', encoding='utf-8')
+                self._file.write(line)
+                self._file.flush()
+            except Exception as e:
+                print(f"Error writing command log: {e}")
+
+    def read(self, since=0):
+        """
+        Read recorded commands.
+
+        Args:
+            since (float, optional): Only return commands at or after this Unix time
+
+        Returns:
+            list: Entries as dicts, oldest first
+        """
+        entries = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get("t", 0) >= since:
+                        entries.append(entry)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error reading command log: {e}")
+        return entries
+
+    def compact(self, since):
+        """
+        Drop recorded commands older than a cutoff, along with unreadable lines.
+
+        The kept lines are written to a temporary file that replaces the log,
+        so an interrupted compaction leaves the old log intact. The file is
+        only rewritten if there is something to drop.
+
+        Args:
+            since (float): Keep commands at or after this Unix time
+
+        Returns:
+            list: The kept entries as dicts, oldest first, as read(since) would return
+        """
+        with self._lock:
+            entries, lines, dropped = [], [], False
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            dropped = True
+                            continue
+                        if entry.get("t", 0) >= since:
+                            entries.append(entry)
+                            lines.append(line if line.endswith("\n") else line + "\n")
+                        else:
+                            dropped = True
+            except FileNotFoundError:
+                return entries
+            except Exception as e:
+                print(f"Error reading command log: {e}")
+                return entries
+
+            if not dropped:
+                return entries
+
+            temp_path = None
+            try:
+                if self._file:
+                    self._file.close()
+                    self._file = None
+                fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.writelines(lines)
+                os.replace(temp_path, self.path)
+            except Exception as e:
+                print(f"Error compacting command log: {e}")
+                if temp_path and os.path.exists(temp_path):
+                    os.unlink(temp_path)
+            return entries
+
+    def close(self):
+        """Close the log file; the next append reopens it."""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,49 @@
+"""
+Helpers for sharing Jarvis's skill state between threads.
+"""
+
+import os
+import json
+import tempfile
+import functools
+from pathlib import Path
+
+def synchronized(method):
+    """
+    Run a method while holding the instance's self._lock.
+    
+    The lock should be an RLock, so synchronized methods can call each other.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+def write_json_atomic(path, data, **kwargs):
+    """
+    Write JSON to a file so readers only ever see the old or the new contents.
+    
+    The data is written to a temporary file in the same directory and moved
+    over the original with os.replace(), so an interrupted save can't leave a
+    truncated file behind.
+    
+    Args:
+        path (str or Path): The file to write
+        data: JSON-serializable data
+        **kwargs: Passed to json.dump, e.g. indent
+    """
+    path = Path(path)
+    os.makedirs(path.parent, exist_ok=True)
+    
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, **kwargs)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,131 @@
+"""
+Deadlines for running Jarvis's commands.
+"""
+
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from ..config import COMMAND_TIMEOUT, COMMAND_TIMEOUTS, COMMAND_MAX_ABANDONED
+
+class CommandTimeout(Exception):
+    """Raised when a command overran its deadline, or is refused because earlier runs of it are still stuck."""
+
+    def __init__(self, action, message):
+        super().__init__(message)
+        self.action = action
+
+class DeadlineExecutor:
+    """
+    Runs commands with a deadline, giving up on those that overrun.
+
+    Each command runs on its own daemon thread while the caller waits up to
+    its deadline (COMMAND_TIMEOUTS, else COMMAND_TIMEOUT). Python threads
+    can't be killed, so an overrunning command is abandoned: the caller gets
+    CommandTimeout and moves on, and the thread finishes (or hangs) on its
+    own without holding anything up. While COMMAND_MAX_ABANDONED runs of an
+    action are still stuck, it is refused at once instead of leaking more
+    threads. Timeouts are counted per action.
+
+    Callbacks the command must make on the caller's thread (speaking with
+    pyttsx3) are relayed: the command is given a stand-in that queues the
+    call, and the waiting caller makes it. Time spent making relayed calls
+    doesn't count against the deadline.
+    """
+
+    def __init__(self, timeout=COMMAND_TIMEOUT, timeouts=None, max_abandoned=COMMAND_MAX_ABANDONED):
+        self.timeout = timeout
+        self.timeouts = dict(COMMAND_TIMEOUTS, **(timeouts or {}))
+        self.max_abandoned = max_abandoned
+        self.timed_out = {}  # action -> timeouts
+        self.refused = {}  # action -> runs refused while earlier ones were stuck
+        self._abandoned = {}  # action -> abandoned runs still going
+        self._lock = threading.Lock()
+
+    def deadline(self, action):
+        """Seconds a command may take, or None for no limit."""
+        return self.timeouts.get(action, self.timeout)
+
+    def run(self, action, fn, relay=None):
+        """
+        Run a command, waiting for it up to its deadline.
+
+        Args:
+            action (str): The command's action, which picks its deadline
+            fn (callable): Runs the command; called with a stand-in for relay (None without one)
+            relay (callable, optional): A callback fn makes that must run on this thread
+
+        Returns:
+            What fn returned
+
+        Raises:
+            CommandTimeout: fn overran its deadline, or earlier runs of the action are still stuck
+            Exception: Whatever fn raised
+        """
+        timeout = self.deadline(action)
+        if not timeout:
+            return fn(relay)
+
+        with self._lock:
+            if self._abandoned.get(action, 0) >= self.max_abandoned:
+                self.refused[action] = self.refused.get(action, 0) + 1
+                raise CommandTimeout(action, f"{action} is still stuck from before")
+
+        future = Future()
+        calls = queue.SimpleQueue()
+        done = object()
+
+        def target():
+            try:
+                future.set_result(fn((lambda *args: calls.put(args)) if relay else None))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                calls.put(done)
+                self._finished(action, future)
+
+        threading.Thread(target=target, name=f"command-{action}", daemon=True).start()
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                args = calls.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if args is done:
+                return future.result()
+
+            started = time.monotonic()
+            relay(*args)
+            deadline += time.monotonic() - started
+
+        with self._lock:
+            if future.done():
+                # Finished just as the deadline passed
+                return future.result()
+            future.abandoned = True
+            self._abandoned[action] = self._abandoned.get(action, 0) + 1
+            self.timed_out[action] = self.timed_out.get(action, 0) + 1
+        raise CommandTimeout(action, f"{action} took longer than {timeout:g} seconds")
+
+    def stats(self):
+        """
+        Get timeout counters.
+
+        Returns:
+            dict: {"timed_out", "refused", "stuck"}, each mapping actions to counts
+        """
+        with self._lock:
+            return {
+                "timed_out": dict(self.timed_out),
+                "refused": dict(self.refused),
+                "stuck": {action: count for action, count in self._abandoned.items() if count}
+            }
+
+    def _finished(self, action, future):
+        with self._lock:
+            if getattr(future, "abandoned", False):
+                self._abandoned[action] -= 1
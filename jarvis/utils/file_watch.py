@@ -0,0 +1,77 @@
+"""
+Change detection for Jarvis configuration files.
+"""
+
+import os
+import threading
+from ..config import CONFIG_RELOAD_INTERVAL
+
+class ConfigWatcher:
+    """
+    Polls a handful of files from one background thread and calls a reload
+    callback when a file's mtime or size changes.
+
+    Commands never stat the files themselves, so the cost is a couple of
+    stat() calls per interval no matter how many commands are handled.
+    """
+
+    def __init__(self, interval=CONFIG_RELOAD_INTERVAL):
+        self.interval = interval
+        self._watches = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, path, callback):
+        """
+        Call callback() whenever the file at path changes.
+
+        Args:
+            path (str or Path): The file to watch
+            callback (callable): Called with no arguments after a change
+        """
+        with self._lock:
+            self._watches[str(path)] = [self._signature(path), callback]
+
+    def start(self):
+        """Start the polling thread."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop the polling thread."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+
+    def check(self):
+        """Check every watched file once and run the callbacks of changed files."""
+        with self._lock:
+            watches = list(self._watches.items())
+
+        for path, watch in watches:
+            signature = self._signature(path)
+            if signature == watch[0]:
+                continue
+
+            watch[0] = signature
+            try:
+                watch[1]()
+            except Exception as e:
+                print(f"Error reloading {path}: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def _signature(self, path):
+        try:
+            stat = os.stat(path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
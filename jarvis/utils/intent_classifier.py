@@ -0,0 +1,178 @@
+"""
+Similarity-based fallback for commands none of the patterns recognize.
+"""
+
+import os
+import re
+import json
+import hashlib
+from pathlib import Path
+from ..config import INTENT_MIN_SIMILARITY, INTENT_NGRAM_RANGE
+from .plan import FINAL_ACTIONS
+
+try:
+    import numpy as np
+except ImportError:  # The fallback is optional; without NumPy unmatched commands stay unknown
+    np = None
+
+# Bump when the vectorization changes, so old cached models are rebuilt
+MODEL_VERSION = 2
+
+class IntentClassifier:
+    """
+    Matches an utterance to the closest example phrase of each action.
+    
+    Utterances are embedded as TF-IDF weighted character n-grams (taken per
+    word, padded with spaces), so "what's the time" and "whats the time now"
+    land close together despite different tokens. All examples live in one
+    L2-normalized NumPy matrix; classifying an utterance is a single
+    matrix-vector product followed by an argmax.
+    
+    The matrix is built from data/intent_examples.json once and cached in
+    data/intent_model.npz, keyed by a hash of the examples, so it is only
+    rebuilt when they change.
+    
+    Only actions that need no parameters belong in the examples, since
+    nothing is extracted from a fuzzy match. Actions that end the session
+    or the machine (exit, shutdown, restart) don't belong there either: they
+    need an exact pattern, and examples for them are ignored.
+    """
+    
+    def __init__(self, examples_file=None, cache_file=None, min_similarity=INTENT_MIN_SIMILARITY):
+        data_dir = Path(__file__).parent.parent / 'data'
+        self.examples_file = Path(examples_file or data_dir / 'intent_examples.json')
+        self.cache_file = Path(cache_file or data_dir / 'intent_model.npz')
+        self.min_similarity = min_similarity
+        self.available = np is not None
+        
+        self.vocabulary = {}
+        self.idf = None
+        self.matrix = None
+        self.labels = []
+        
+        if self.available:
+            self._load()
+    
+    def classify(self, text):
+        """
+        Find the action whose examples are most similar to the text.
+        
+        Returns:
+            tuple or None: (action, similarity), or None if nothing is similar enough
+        """
+        if self.matrix is None or not len(self.labels):
+            return None
+        
+        vector = self._vectorize(text)
+        if vector is None:
+            return None
+        
+        scores = self.matrix @ vector
+        best = int(np.argmax(scores))
+        similarity = float(scores[best])
+        if similarity < self.min_similarity:
+            return None
+        return self.labels[best], similarity
+    
+    def _ngrams(self, text):
+        low, high = INTENT_NGRAM_RANGE
+        grams = []
+        for word in re.findall(r"[a-z0-9']+", text.lower()):
+            word = f" {word.replace(chr(39), '')} "
+            for size in range(low, high + 1):
+                grams.extend(word[i:i + size] for i in range(max(1, len(word) - size + 1)))
+        return grams
+    
+    def _vectorize(self, text):
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for gram in self._ngrams(text):
+            index = self.vocabulary.get(gram)
+            if index is not None:
+                vector[index] += 1
+        
+        vector *= self.idf
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
+    
+    def _load(self):
+        """Load the cached model, or build and cache it if the examples changed."""
+        try:
+            with open(self.examples_file, 'r') as f:
+                raw = f.read()
+            examples = json.loads(raw)
+        except Exception as e:
+            print(f"Error loading intent examples: {e}")
+            return
+        
+        fingerprint = hashlib.sha1(f"{MODEL_VERSION}:{INTENT_NGRAM_RANGE}:{raw}".encode("utf-8")).hexdigest()
+        if self._load_cache(fingerprint):
+            return
+        
+        self._build(examples)
+        self._save_cache(fingerprint)
+    
+    def _build(self, examples):
+        phrases, labels = [], []
+        for action, action_phrases in examples.items():
+            if action in FINAL_ACTIONS:
+                continue
+            for phrase in action_phrases:
+                phrases.append(phrase)
+                labels.append(action)
+        
+        vocabulary = {}
+        rows = []
+        for phrase in phrases:
+            counts = {}
+            for gram in self._ngrams(phrase):
+                index = vocabulary.setdefault(gram, len(vocabulary))
+                counts[index] = counts.get(index, 0) + 1
+            rows.append(counts)
+        
+        matrix = np.zeros((len(phrases), len(vocabulary)), dtype=np.float32)
+        for row, counts in enumerate(rows):
+            matrix[row, list(counts)] = list(counts.values())
+        
+        # Smoothed IDF, as in scikit-learn
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        idf = (np.log((1 + len(phrases)) / (1 + document_frequency)) + 1).astype(np.float32)
+        
+        matrix *= idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.matrix = matrix / norms
+        self.labels = labels
+    
+    def _load_cache(self, fingerprint):
+        try:
+            if not self.cache_file.exists():
+                return False
+            with np.load(self.cache_file, allow_pickle=False) as cache:
+                if str(cache["fingerprint"]) != fingerprint:
+                    return False
+                grams = cache["vocabulary"].tolist()
+                self.vocabulary = {gram: index for index, gram in enumerate(grams)}
+                self.idf = cache["idf"]
+                self.matrix = cache["matrix"]
+                self.labels = cache["labels"].tolist()
+            return True
+        except Exception as e:
+            print(f"Error loading intent model: {e}")
+            return False
+    
+    def _save_cache(self, fingerprint):
+        try:
+            os.makedirs(self.cache_file.parent, exist_ok=True)
+            grams = sorted(self.vocabulary, key=self.vocabulary.get)
+            # NumPy adds .npz to names without it; write to a name that already has it
+            temp_file = self.cache_file.with_name(f".{self.cache_file.stem}.tmp.npz")
+            np.savez_compressed(temp_file, fingerprint=np.array(fingerprint), vocabulary=np.array(grams),
+                                idf=self.idf, matrix=self.matrix, labels=np.array(self.labels))
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            print(f"Error saving intent model: {e}")
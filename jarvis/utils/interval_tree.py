@@ -0,0 +1,225 @@
+"""
+Interval tree used by Jarvis to find overlapping calendar events.
+
+Run `python -m jarvis.utils.interval_tree` to compare its overlap queries
+with scanning every event, on a calendar of ten years of busy days.
+"""
+
+import sys
+import time
+import random
+import argparse
+import datetime
+
+class _Node:
+    __slots__ = ("key", "start", "end", "value", "left", "right", "height", "max_end")
+
+    def __init__(self, start, end, value):
+        self.key = (start, end, id(value))
+        self.start = start
+        self.end = end
+        self.value = value
+        self.left = None
+        self.right = None
+        self.height = 1
+        self.max_end = end
+
+class IntervalTree:
+    """
+    A self-balancing (AVL) tree of half-open [start, end) intervals.
+
+    Every node also stores the largest end point in its subtree, which lets
+    overlap queries skip whole subtrees and answer in O(log n + k) for k hits.
+    Start and end can be any comparable values, e.g. datetimes.
+    """
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def insert(self, start, end, value):
+        """Add an interval carrying an arbitrary value."""
+        self._root = self._insert(self._root, _Node(start, end, value))
+        self._size += 1
+
+    def remove(self, start, end, value):
+        """
+        Remove the interval previously inserted with this exact value.
+
+        Returns:
+            bool: True if the interval was found and removed
+        """
+        key = (start, end, id(value))
+        self._root, removed = self._remove(self._root, key)
+        if removed:
+            self._size -= 1
+        return removed
+
+    def overlap(self, start, end):
+        """
+        Get all intervals overlapping [start, end), ordered by start.
+
+        Returns:
+            list: (start, end, value) tuples
+        """
+        results = []
+        self._overlap(self._root, start, end, results)
+        return results
+
+    def _overlap(self, node, start, end, results):
+        # Nothing in this subtree ends after the query starts
+        if node is None or node.max_end <= start:
+            return
+
+        self._overlap(node.left, start, end, results)
+        if node.start < end:
+            if node.end > start:
+                results.append((node.start, node.end, node.value))
+            self._overlap(node.right, start, end, results)
+
+    # AVL maintenance
+
+    def _height(self, node):
+        return node.height if node else 0
+
+    def _update(self, node):
+        node.height = 1 + max(self._height(node.left), self._height(node.right))
+        node.max_end = node.end
+        if node.left and node.left.max_end > node.max_end:
+            node.max_end = node.left.max_end
+        if node.right and node.right.max_end > node.max_end:
+            node.max_end = node.right.max_end
+
+    def _rotate_right(self, node):
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rotate_left(self, node):
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _balance(self, node):
+        self._update(node)
+        balance = self._height(node.left) - self._height(node.right)
+
+        if balance > 1:
+            if self._height(node.left.left) < self._height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if self._height(node.right.right) < self._height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
+
+    def _insert(self, node, new):
+        if node is None:
+            return new
+        if new.key < node.key:
+            node.left = self._insert(node.left, new)
+        else:
+            node.right = self._insert(node.right, new)
+        return self._balance(node)
+
+    def _remove(self, node, key):
+        if node is None:
+            return None, False
+
+        if key < node.key:
+            node.left, removed = self._remove(node.left, key)
+        elif key > node.key:
+            node.right, removed = self._remove(node.right, key)
+        else:
+            removed = True
+            if node.left is None:
+                return node.right, True
+            if node.right is None:
+                return node.left, True
+
+            # Replace with the in-order successor
+            successor = node.right
+            while successor.left:
+                successor = successor.left
+            node.right, _ = self._remove(node.right, successor.key)
+            successor.left, successor.right = node.left, node.right
+            node = successor
+
+        if not removed:
+            return node, False
+        return self._balance(node), True
+
+def benchmark(days, per_day, queries, seed=0):
+    """
+    Time overlap queries on the tree against a scan of every interval.
+
+    Builds a calendar of per_day meetings of 30 to 90 minutes, about 45
+    minutes apart, on each of the given days, then asks both for the meetings
+    overlapping random hour-long slots and checks they agree.
+
+    Returns:
+        dict: {"intervals", "tree_us", "scan_us"}, the times being per query
+    """
+    rng = random.Random(seed)
+    first = datetime.datetime(2030, 1, 1, 8)
+    intervals = []
+    for day in range(days):
+        for meeting in range(per_day):
+            start = first + datetime.timedelta(days=day, minutes=meeting * 45 + rng.randrange(0, 30))
+            intervals.append((start, start + datetime.timedelta(minutes=rng.randrange(30, 91)), (day, meeting)))
+
+    tree = IntervalTree()
+    for start, end, value in intervals:
+        tree.insert(start, end, value)
+
+    slots = []
+    for _ in range(queries):
+        start = first + datetime.timedelta(days=rng.randrange(days), minutes=rng.randrange(0, 12 * 60))
+        slots.append((start, start + datetime.timedelta(hours=1)))
+
+    began = time.perf_counter()
+    found = [tree.overlap(start, end) for start, end in slots]
+    tree_s = time.perf_counter() - began
+
+    # The scan is slow enough that a tenth of the queries gives a steady figure
+    scanned = slots[:max(1, queries // 10)]
+    began = time.perf_counter()
+    expected = [[interval for interval in intervals if interval[0] < end and interval[1] > start]
+                for start, end in scanned]
+    scan_s = time.perf_counter() - began
+
+    for hits, want in zip(found, expected):
+        if sorted(hits) != sorted(want):
+            raise AssertionError(f"The tree found {len(hits)} overlaps where the scan found {len(want)}")
+
+    return {
+        "intervals": len(intervals),
+        "tree_us": tree_s / len(slots) * 1e6,
+        "scan_us": scan_s / len(scanned) * 1e6
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare interval tree overlap queries with a scan of every event")
+    parser.add_argument("--years", type=int, default=10, help="How many years of events")
+    parser.add_argument("--per-day", type=int, default=12, help="Meetings per day")
+    parser.add_argument("--queries", type=int, default=1000, help="How many slots to check")
+    args = parser.parse_args(argv)
+
+    result = benchmark(args.years * 365, args.per_day, args.queries)
+    print(f"{result['intervals']} events, {args.queries} conflict checks")
+    print(f"interval tree: {result['tree_us']:10.1f} us per check")
+    print(f"scan:          {result['scan_us']:10.1f} us per check ({result['scan_us'] / result['tree_us']:.0f}x slower)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
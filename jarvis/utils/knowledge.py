@@ -0,0 +1,260 @@
+"""
+Local full-text store of answers Jarvis has already fetched.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from ..config import (KNOWLEDGE_FRESH_AGE, KNOWLEDGE_MAX_AGE, KNOWLEDGE_MAX_ENTRIES,
+                      KNOWLEDGE_MIN_SIMILARITY, KNOWLEDGE_SOURCE_MAX_AGE)
+
+# Bumped when question keys are built differently; older stores are cleared
+SCHEMA_VERSION = 1
+
+# Words that don't change what a question is about
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "of", "in", "on", "at", "to", "for",
+    "whom", "tell", "me", "about", "please", "can", "could", "you", "do", "does", "did", "i",
+    "jarvis", "know", "give", "info", "information", "search", "explain", "define", "s"
+}
+
+# Words that do: "where is paris" and "what is paris" want different answers
+QUESTION_WORDS = {"what", "who", "where", "when", "which", "why", "how"}
+CONTRACTIONS = {"whats": "what", "whos": "who", "wheres": "where", "hows": "how"}
+
+class KnowledgeStore:
+    """
+    Persists answers from Wikipedia and Wolfram Alpha in SQLite.
+    
+    Questions are reduced to a normalized key (lowercase content words and
+    question words, sorted), so "who is Ada Lovelace" and "who's ada
+    lovelace" share one entry while "where is paris" and "what is paris" do
+    not. Near-duplicates are found through an FTS5 index over the keys and
+    entities and accepted above a token-overlap threshold, as long as their
+    question words don't differ. Entries are evicted once they pass
+    KNOWLEDGE_MAX_AGE or the store grows past KNOWLEDGE_MAX_ENTRIES, least
+    recently used first. Answers from sources in KNOWLEDGE_SOURCE_MAX_AGE
+    (Wolfram Alpha) are only used for that long, and never as a stale fallback.
+    """
+    
+    def __init__(self, db_file=None, fresh_age=KNOWLEDGE_FRESH_AGE, max_age=KNOWLEDGE_MAX_AGE,
+                 max_entries=KNOWLEDGE_MAX_ENTRIES, source_max_age=None):
+        self.db_file = db_file or Path(__file__).parent.parent / 'data' / 'knowledge.db'
+        self.fresh_age = fresh_age
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.source_max_age = dict(KNOWLEDGE_SOURCE_MAX_AGE, **(source_max_age or {}))
+        self._lock = threading.Lock()
+        self._connection = None
+        self.has_fts = False
+    
+    def _connect(self):
+        if self._connection is None:
+            os.makedirs(Path(self.db_file).parent, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.db_file), check_same_thread=False)
+            # Lookups touch last_used; WAL keeps those writes off the fsync path
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._create_schema()
+        return self._connection
+    
+    def _create_schema(self):
+        db = self._connection
+        
+        # Keys used to drop question words; those answers can't be told apart, so start over
+        if db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            db.executescript("""
+                DROP TRIGGER IF EXISTS answers_ai;
+                DROP TRIGGER IF EXISTS answers_ad;
+                DROP TRIGGER IF EXISTS answers_au;
+                DROP TABLE IF EXISTS answers_fts;
+                DROP TABLE IF EXISTS answers;
+            """)
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        
+        db.executescript("""
+            CREATE TABLE IF NOT EXISTS answers (
+                id INTEGER PRIMARY KEY,
+                question_key TEXT UNIQUE NOT NULL,
+                question TEXT NOT NULL,
+                entity TEXT,
+                source TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used);
+            CREATE INDEX IF NOT EXISTS answers_created ON answers (created);
+        """)
+        
+        # Fall back to exact-key lookups on SQLite builds without FTS5
+        try:
+            db.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS answers_fts USING fts5(
+                    question_key, entity, content='answers', content_rowid='id'
+                );
+                CREATE TRIGGER IF NOT EXISTS answers_ai AFTER INSERT ON answers BEGIN
+                    INSERT INTO answers_fts (rowid, question_key, entity)
+                    VALUES (new.id, new.question_key, new.entity);
+                END;
+                CREATE TRIGGER IF NOT EXISTS answers_ad AFTER DELETE ON answers BEGIN
+                    INSERT INTO answers_fts (answers_fts, rowid, question_key, entity)
+                    VALUES ('delete', old.id, old.question_key, old.entity);
+                END;
+                CREATE TRIGGER IF NOT EXISTS answers_au AFTER UPDATE ON answers BEGIN
+                    INSERT INTO answers_fts (answers_fts, rowid, question_key, entity)
+                    VALUES ('delete', old.id, old.question_key, old.entity);
+                    INSERT INTO answers_fts (rowid, question_key, entity)
+                    VALUES (new.id, new.question_key, new.entity);
+                END;
+            """)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+        db.commit()
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+    
+    def normalize(self, text):
+        """Reduce a question to its sorted content and question words."""
+        words = re.findall(r"[a-z0-9]+", (text or "").lower())
+        words = {CONTRACTIONS.get(word, word) for word in words}
+        return " ".join(sorted(word for word in words if word not in STOPWORDS))
+    
+    def lookup(self, question, allow_stale=False):
+        """
+        Find a stored answer for a question or a near-duplicate of it.
+        
+        Args:
+            question (str): The question as asked
+            allow_stale (bool, optional): Also return answers older than the
+                                          fresh age, e.g. when the network is down
+        
+        Returns:
+            dict or None: {"answer", "source", "entity", "question", "age"}
+        """
+        key = self.normalize(question)
+        if not key:
+            return None
+        
+        now = time.time()
+        oldest = now - (self.max_age if allow_stale else self.fresh_age)
+        age_filter, age_params = self._age_filter(oldest, now)
+        with self._lock:
+            db = self._connect()
+            row = db.execute(
+                "SELECT id, question, entity, source, answer, created FROM answers a "
+                f"WHERE question_key = ? AND {age_filter}", (key, *age_params)
+            ).fetchone()
+            
+            if row is None and self.has_fts:
+                row = self._fuzzy_lookup(db, key, age_filter, age_params)
+            
+            if row is None:
+                return None
+            
+            db.execute("UPDATE answers SET last_used = ? WHERE id = ?", (time.time(), row[0]))
+            db.commit()
+        
+        return {
+            "question": row[1],
+            "entity": row[2],
+            "source": row[3],
+            "answer": row[4],
+            "age": time.time() - row[5]
+        }
+    
+    def _age_filter(self, oldest, now):
+        """SQL condition (on table alias a) for entries young enough to use, and its parameters."""
+        conditions, params = ["a.created >= ?"], [oldest]
+        for source, max_age in self.source_max_age.items():
+            conditions.append("(a.source != ? OR a.created >= ?)")
+            params.extend([source, now - max_age])
+        return " AND ".join(conditions), params
+    
+    def _fuzzy_lookup(self, db, key, age_filter, age_params):
+        """Find the best FTS candidate whose words overlap the question enough."""
+        tokens = set(key.split())
+        question_words = tokens & QUESTION_WORDS
+        tokens -= QUESTION_WORDS
+        if not tokens:
+            return None
+        
+        match = " OR ".join(f'"{token}"' for token in tokens)
+        candidates = db.execute(
+            "SELECT a.id, a.question, a.entity, a.source, a.answer, a.created, a.question_key "
+            "FROM answers_fts JOIN answers a ON a.id = answers_fts.rowid "
+            f"WHERE answers_fts MATCH ? AND {age_filter} ORDER BY bm25(answers_fts) LIMIT 5",
+            (match, *age_params)
+        ).fetchall()
+        
+        best, best_score = None, 0.0
+        for candidate in candidates:
+            # "where is paris" must not reuse "what is paris"; a question without one ("tell me about paris") may
+            other_question_words = set(candidate[6].split()) & QUESTION_WORDS
+            if question_words and other_question_words and question_words != other_question_words:
+                continue
+            
+            for other in (candidate[6], self.normalize(candidate[2])):
+                other_tokens = set(other.split()) - QUESTION_WORDS
+                if not other_tokens:
+                    continue
+                score = len(tokens & other_tokens) / len(tokens | other_tokens)
+                if score > best_score:
+                    best, best_score = candidate, score
+        
+        if best_score >= KNOWLEDGE_MIN_SIMILARITY:
+            return best[:6]
+        return None
+    
+    def store(self, question, answer, source, entity=None):
+        """
+        Save an answer, replacing any previous answer to the same question.
+        
+        Returns:
+            bool: True if the answer was stored
+        """
+        key = self.normalize(question)
+        if not key or not answer:
+            return False
+        
+        now = time.time()
+        try:
+            with self._lock:
+                db = self._connect()
+                db.execute(
+                    "INSERT INTO answers (question_key, question, entity, source, answer, created, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (question_key) DO UPDATE SET question = excluded.question, "
+                    "entity = excluded.entity, source = excluded.source, answer = excluded.answer, "
+                    "created = excluded.created, last_used = excluded.last_used",
+                    (key, question, entity, source, answer, now, now)
+                )
+                self._evict(db, now)
+                db.commit()
+            return True
+        except Exception as e:
+            print(f"Error storing answer: {e}")
+            return False
+    
+    def _evict(self, db, now):
+        """Drop expired entries, then the least recently used ones beyond the size limit."""
+        db.execute("DELETE FROM answers WHERE created < ?", (now - self.max_age,))
+        for source, max_age in self.source_max_age.items():
+            db.execute("DELETE FROM answers WHERE source = ? AND created < ?", (source, now - max_age))
+        
+        count = db.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        if count > self.max_entries:
+            db.execute(
+                "DELETE FROM answers WHERE id IN "
+                "(SELECT id FROM answers ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
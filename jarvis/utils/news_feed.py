@@ -0,0 +1,166 @@
+"""
+Warm, background-refreshed news headlines for Jarvis.
+"""
+
+import re
+import time
+import threading
+from ..config import (NEWS_API_KEY, NEWS_PREFETCH_CATEGORIES, NEWS_COUNTRY, NEWS_PREFETCH_SIZE,
+                      NEWS_REFRESH_INTERVAL, NEWS_MAX_AGE)
+
+class NewsFeed:
+    """
+    Keeps headlines for the configured categories in memory.
+
+    A background thread refreshes them every refresh_interval seconds, so
+    "what's the news" is answered from memory. Data older than the refresh
+    interval is still served while a refresh runs in the background; only
+    data older than max_age (or a category never fetched) is fetched while
+    the user waits.
+    """
+
+    def __init__(self, web_tools, categories=NEWS_PREFETCH_CATEGORIES, country=NEWS_COUNTRY,
+                 refresh_interval=NEWS_REFRESH_INTERVAL, max_age=NEWS_MAX_AGE):
+        self.web_tools = web_tools
+        self.categories = list(categories)
+        self.country = country
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+
+        self._cache = {}  # (category, country) -> {"articles": [...], "fetched_at": float}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start refreshing the configured categories in the background."""
+        if not NEWS_API_KEY or not self.categories:
+            return
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="news-feed", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop the background refresher."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def get(self, category="general", country=None, count=5):
+        """
+        Get headlines, from memory when possible.
+
+        Returns:
+            tuple: (success, articles or error_message)
+        """
+        key = (category, country or self.country)
+        with self._lock:
+            entry = self._cache.get(key)
+
+        if entry:
+            age = time.time() - entry["fetched_at"]
+            if age <= self.max_age:
+                # Stale-while-revalidate: answer now, refresh behind the scenes
+                if age > self.refresh_interval:
+                    self._refresh_async(key)
+                return True, entry["articles"][:count]
+
+        success, result = self.refresh(*key)
+        if success:
+            return True, result[:count]
+
+        # Upstream failed; old headlines beat no headlines
+        if entry:
+            return True, entry["articles"][:count]
+        return False, result
+
+    def refresh(self, category, country=None):
+        """
+        Fetch headlines for a category and merge them into the warm set.
+
+        Returns:
+            tuple: (success, articles or error_message)
+        """
+        key = (category, country or self.country)
+        success, result = self.web_tools.get_news(key[0], key[1], NEWS_PREFETCH_SIZE)
+        if not success:
+            return False, result
+
+        now = time.time()
+        with self._lock:
+            previous = self._cache.get(key)
+            articles = self._merge(result, previous["articles"] if previous else [], now)
+            self._cache[key] = {"articles": articles, "fetched_at": now}
+        return True, articles
+
+    def _merge(self, latest, previous, now):
+        """
+        Combine freshly fetched articles with the previous warm set.
+
+        New articles come first; articles seen in an earlier refresh keep
+        their first-seen time, and duplicates (same URL or same headline from
+        another outlet) are dropped. Articles the API no longer returns
+        expire max_age after they were first seen; those it still returns
+        never do. If nothing is left (an empty fetch after the old articles
+        expired), the previous set is kept rather than serving no headlines.
+        """
+        first_seen = {self._article_key(article): article.get("first_seen", now) for article in previous}
+        current = {self._article_key(article) for article in latest}
+
+        merged = []
+        seen = set()
+        for article in list(latest) + list(previous):
+            key = self._article_key(article)
+            url = article.get("url")
+            if key in seen or (url and url in seen):
+                continue
+
+            article = dict(article)
+            article["first_seen"] = first_seen.get(key, now)
+            if key not in current and now - article["first_seen"] > self.max_age:
+                continue
+
+            seen.add(key)
+            if url:
+                seen.add(url)
+            merged.append(article)
+
+        return (merged or list(previous))[:NEWS_PREFETCH_SIZE]
+
+    def _article_key(self, article):
+        # Headlines are often syndicated as "Title - Outlet"; compare the title only
+        title = (article.get("title") or "").rsplit(" - ", 1)[0]
+        return re.sub(r"\W+", " ", title).strip().lower()
+
+    def _refresh_async(self, key):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def worker():
+            try:
+                self.refresh(*key)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=worker, name="news-refresh", daemon=True).start()
+
+    def _run(self):
+        while True:
+            for category in self.categories:
+                if self._stop.is_set():
+                    return
+                try:
+                    self.refresh(category)
+                except Exception as e:
+                    print(f"Error refreshing {category} news: {e}")
+
+            if self._stop.wait(self.refresh_interval):
+                return
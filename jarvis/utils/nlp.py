@@ -7,17 +7,52 @@ import json
 import os
 from pathlib import Path
 from ..config import WAKE_WORD
+from .intent_classifier import IntentClassifier
+from .plan import FINAL_ACTIONS
+
+def split_list(text):
+    """
+    Split a spoken list such as "london, paris and tokyo" into its items.
+    """
+    items = re.split(r"\s*,\s*(?:and\s+)?|\s+and\s+", text.strip())
+    return [item.strip() for item in items if item.strip()]
+
+# Where one command ends and the next begins in "do this, and then do that"
+COMMAND_SEPARATOR = re.compile(r"\s*,\s*(?:and\s+)?(?:then\s+)?|\s+and\s+then\s+|\s+and\s+|\s+then\s+")
+
+# Utterances with more separators than this are not split, to bound the search
+MAX_COMMAND_SEPARATORS = 8
+
+# Commands whose argument is free text, which may itself contain "and" ("search for rock and roll")
+FREE_TEXT_ACTIONS = {"web_search", "get_info", "ask_question", "play_youtube", "set_reminder"}
 
 class CommandProcessor:
     def __init__(self):
         # Command patterns with their corresponding actions
         self.command_patterns = {
+            # Diagnostics commands (before "start ..." opens an app and "stop" exits)
+            r"(start|enable|turn on) profiling": {"action": "profiling", "params": [], "state": "on"},
+            r"(stop|disable|turn off) profiling": {"action": "profiling", "params": [], "state": "off"},
+            r"(show |what's the |what is the )?prefetch(ing)? (stats|statistics|hit rate)": {"action": "prefetch_stats", "params": []},
+            r"(show |what are the )?speculation (stats|statistics)": {"action": "speculation_stats", "params": []},
+            
             # App control commands
             r"open\s+(?P<app_name>[\w\s]+)": {"action": "open_app", "params": ["app_name"]},
             r"launch\s+(?P<app_name>[\w\s]+)": {"action": "open_app", "params": ["app_name"]},
             r"start\s+(?P<app_name>[\w\s]+)": {"action": "open_app", "params": ["app_name"]},
             r"run\s+(?P<app_name>[\w\s]+)": {"action": "open_app", "params": ["app_name"]},
             
+            # Calendar commands
+            r"what('s| is| do i have)( on)?( my)?( calendar| schedule)?( for)? (?P<period>today|tomorrow|this week|next week|this month|next month)": {"action": "get_calendar", "params": ["period"]},
+            r"(what('s| is) )?(my )?next ((?P<count>\d+) )?(events?|appointments?)": {"action": "get_next_events", "params": ["count"]},
+            r"am i (free|available|busy) at (?P<time>\d{1,2}(:\d{2})?\s*([ap]\.?m\.?)?)( (?P<period>today|tomorrow))?$": {"action": "check_free", "params": ["time", "period"]},
+            r"(find|get)( me)? (?P<duration>an hour|half an hour|\d+ (minutes?|hours?))( free)?( (?P<period>today|tomorrow|this week|next week))?$": {"action": "find_free_slot", "params": ["duration", "period"]},
+            
+            # Reminder commands
+            r"remind me (to )?(?P<title>.+?) (?P<recurrence>every [\w\s]+?) at (?P<time>\d{1,2}(:\d{2})?\s*([ap]\.?m\.?)?)$": {"action": "set_reminder", "params": ["title", "time", "recurrence"]},
+            r"remind me (to )?(?P<title>.+?) at (?P<time>\d{1,2}(:\d{2})?\s*([ap]\.?m\.?)?)( (?P<recurrence>every .+))?$": {"action": "set_reminder", "params": ["title", "time", "recurrence"]},
+            r"(what are|list|show)( me)? my reminders": {"action": "get_reminders", "params": []},
+            
             # Web commands
             r"search\s+(for\s+)?(?P<query>.+)": {"action": "web_search", "params": ["query"]},
             r"google\s+(?P<query>.+)": {"action": "web_search", "params": ["query"]},
@@ -28,18 +63,29 @@ class CommandProcessor:
             r"youtube\s+(?P<video>.+)": {"action": "play_youtube", "params": ["video"]},
             
             # Weather commands
-            r"(what('s| is) the )?weather( like)? (in|at|for) (?P<city>[\w\s]+)": {"action": "get_weather", "params": ["city"]},
-            r"(how('s| is) the )?weather( like)? (in|at|for) (?P<city>[\w\s]+)": {"action": "get_weather", "params": ["city"]},
-            r"(what('s| is) the )?temperature (in|at|for) (?P<city>[\w\s]+)": {"action": "get_weather", "params": ["city"]},
+            r"will it (?P<condition>rain|snow)( in (?P<city>[\w\s]+?))? (?P<when>today|tomorrow|this weekend|the weekend|on \w+day)$": {"action": "weather_condition", "params": ["condition", "city", "when"]},
+            r"will it (?P<condition>rain|snow) (?P<when>today|tomorrow|this weekend|the weekend|on \w+day)( in (?P<city>[\w\s]+))?$": {"action": "weather_condition", "params": ["condition", "when", "city"]},
+            r"(what('s| is) the )?(weather|forecast)( like)? (?P<when>today|tomorrow|this weekend|the weekend|on \w+day)( (in|at|for) (?P<city>[\w\s]+))?$": {"action": "get_forecast_for", "params": ["when", "city"]},
+            r"(what('s| is) the )?(weather|forecast)( like)? (in|at|for) (?P<city>[\w\s]+?) (?P<when>today|tomorrow|this weekend|the weekend|on \w+day)$": {"action": "get_forecast_for", "params": ["city", "when"]},
+            r"(what('s| is) the )?(weather )?forecast( (in|at|for) (?P<city>[\w\s]+))?$": {"action": "get_forecast", "params": ["city"]},
+            r"(what('s| is) the )?weather( like)? (in|at|for) (?P<city>[\w\s,]+)": {"action": "get_weather", "params": ["city"]},
+            r"(how('s| is) the )?weather( like)? (in|at|for) (?P<city>[\w\s,]+)": {"action": "get_weather", "params": ["city"]},
+            r"(what('s| is) the )?temperature (in|at|for) (?P<city>[\w\s,]+)": {"action": "get_weather", "params": ["city"]},
             
             # System commands
             r"(what('s| is) the )?time": {"action": "get_time", "params": []},
+            r"what time is it( now)?": {"action": "get_time", "params": []},
             r"(what('s| is) the )?date": {"action": "get_date", "params": []},
-            r"(what('s| is) (my )?(system|computer) (info|information)": {"action": "get_system_info", "params": []},
+            r"(what day is it( today)?|what('s| is) today's date)": {"action": "get_date", "params": []},
+            r"(what('s| is) )?(my )?(system|computer) (info|information)": {"action": "get_system_info", "params": []},
             r"shutdown( computer| system)?( in (?P<delay>\d+)( seconds)?)?": {"action": "shutdown", "params": ["delay"]},
             r"restart( computer| system)?( in (?P<delay>\d+)( seconds)?)?": {"action": "restart", "params": ["delay"]},
             r"cancel shutdown": {"action": "cancel_shutdown", "params": []},
-
+            
+            # Briefing commands
+            r"((give me|read me|what's|what is) )?(my |the |a )?(daily |morning )?briefing": {"action": "briefing", "params": []},
+            r"brief me": {"action": "briefing", "params": []},
+            
             # News commands
             r"(what('s| is) the )?news": {"action": "get_news", "params": []},
             r"(what('s| is) the )?(latest|recent) news": {"action": "get_news", "params": []},
@@ -47,6 +93,8 @@ class CommandProcessor:
             
             # Control commands
             r"(goodbye|bye|exit|quit|stop)": {"action": "exit", "params": []},
+            r"(that('s| is| will be) all|i'm done)( for (now|today))?( jarvis)?$": {"action": "exit", "params": []},
+            r"(see you later|good night)( jarvis)?$": {"action": "exit", "params": []},
             r"(shut( )?down|turn off)": {"action": "exit", "params": []},
             r"(hello|hi|hey|greetings)": {"action": "greet", "params": []},
             r"(thank you|thanks)": {"action": "thanks", "params": []},
@@ -56,27 +104,39 @@ class CommandProcessor:
             r"(who is|who was) (?P<query>.+)": {"action": "ask_question", "params": ["query"]},
             r"(how (to|do I)) (?P<query>.+)": {"action": "ask_question", "params": ["query"]},
             r"(where is|locate) (?P<query>.+)": {"action": "ask_question", "params": ["query"]},
+            r"(?P<query>(convert|how many|how much is) .+)": {"action": "ask_question", "params": ["query"]},
         }
         
+        # Example phrases for commands that match none of the patterns above
+        self.intent_classifier = IntentClassifier()
+        
         # Load custom responses
-        self.responses = self.load_responses()
+        self.responses_file = Path(__file__).parent.parent / 'data' / 'responses.json'
+        self.responses = self.load_responses() or {}
     
     def load_responses(self):
         """Load custom responses from responses.json if it exists."""
         responses = {}
         try:
-            responses_file = Path(__file__).parent.parent / 'data' / 'responses.json'
-            if responses_file.exists():
-                with open(responses_file, 'r') as f:
+            if self.responses_file.exists():
+                with open(self.responses_file, 'r') as f:
                     responses = json.load(f)
         except Exception as e:
             print(f"Error loading custom responses: {e}")
+            return None
         return responses
     
+    def reload_responses(self):
+        """Re-read responses.json after it was edited, keeping the old responses if it fails to parse."""
+        responses = self.load_responses()
+        if responses is not None:
+            # Swap in the new map with one assignment
+            self.responses = responses
+    
     def save_responses(self):
         """Save custom responses to responses.json."""
         try:
-            responses_file = Path(__file__).parent.parent / 'data' / 'responses.json'
+            responses_file = self.responses_file
             with open(responses_file, 'w') as f:
                 json.dump(self.responses, f, indent=4)
             return True
@@ -89,18 +149,103 @@ class CommandProcessor:
         Process the user's command text and return the appropriate action and parameters.
         Returns a tuple of (action, params) where params is a dictionary of parameter values.
         """
-        # Remove the wake word if present
+        text = self.normalize(text)
+        intent = self.match_pattern(text)
+        if intent:
+            return intent
+        
+        # Fall back to the phrase most similar to the text
+        match = self.intent_classifier.classify(text)
+        if match:
+            action, confidence = match
+            return action, {"text": text, "confidence": round(confidence, 3)}
+        
+        # If no match, return a generic action
+        return "unknown_command", {"text": text}
+    
+    def process_compound(self, text):
+        """
+        Split an utterance that asks for several things into its commands.
+        
+        "open chrome, what's the weather in paris and search for flights"
+        becomes open_app, get_weather and web_search. The utterance is cut at
+        "and", "then" and commas, choosing the cuts that give the most pieces
+        where every piece matches a command pattern in full; a cut that leaves
+        a piece no pattern recognizes is not made, so "weather in london and
+        paris" stays one command.
+        
+        The text of a search, question or reminder is only cut where the
+        rest of the utterance splits into full commands, none of them exit,
+        shutdown or restart: "search for flights and what's the weather in
+        paris" is two commands, while "search for rock and roll" and "search
+        for how to shutdown and restart" are one search each. Because pieces
+        must match in full, exit, shutdown and restart are only split off
+        other commands when their piece is exactly that command ("restart",
+        "shutdown in 10 seconds").
+        
+        Returns:
+            list: (action, params) tuples in the order they were asked for
+        """
+        text = self.normalize(text)
+        separators = list(COMMAND_SEPARATOR.finditer(text))
+        if separators and len(separators) <= MAX_COMMAND_SEPARATORS:
+            intents = self._split_commands(text, separators)
+            if intents and len(intents) > 1:
+                return intents
+        return [self.process_command(text)]
+    
+    def _split_commands(self, text, separators):
+        starts = [0] + [separator.end() for separator in separators]
+        ends = [separator.start() for separator in separators] + [len(text)]
+        best = {}
+        
+        def split_from(first):
+            # The longest list of recognized commands covering text[starts[first]:], or None
+            if first in best:
+                return best[first]
+            
+            result = None
+            for last in range(first, len(ends)):
+                intent = self.match_pattern(text[starts[first]:ends[last]], full=True)
+                if not intent:
+                    continue
+                rest = [] if last == len(ends) - 1 else split_from(last + 1)
+                if rest is None:
+                    continue
+                # Free text never loses its end to a command that ends the session or the machine
+                if intent[0] in FREE_TEXT_ACTIONS and any(action in FINAL_ACTIONS for action, _ in rest):
+                    continue
+                if result is None or len(rest) + 1 > len(result):
+                    result = [intent] + rest
+            best[first] = result
+            return result
+        
+        return split_from(0)
+    
+    def normalize(self, text):
+        """Remove the wake word, surrounding whitespace and capitals from a command."""
         text = re.sub(rf"^{WAKE_WORD}\s+", "", text, flags=re.IGNORECASE)
-        text = text.strip().lower()
+        return text.strip().lower()
+    
+    def match_pattern(self, text, full=False):
+        """
+        Match normalized text against the command patterns.
+        
+        Args:
+            text (str): The normalized text
+            full (bool, optional): Require a pattern to match all of the text, not just its start
         
+        Returns:
+            tuple or None: (action, params) of the first pattern that matches
+        """
         # Check each command pattern
         for pattern, command_info in self.command_patterns.items():
-            match = re.match(pattern, text, re.IGNORECASE)
+            match = (re.fullmatch if full else re.match)(pattern, text, re.IGNORECASE)
             if match:
                 # Extract parameters
                 params = {}
                 for param in command_info.get("params", []):
-                    if param in match.groupdict():
+                    if match.groupdict().get(param) is not None:
                         params[param] = match.group(param).strip()
                 
                 # Add any fixed parameters from the command definition
@@ -109,9 +254,43 @@ class CommandProcessor:
                         params[key] = value
                 
                 return command_info["action"], params
+        return None
+    
+    def parse_time(self, text):
+        """
+        Normalize a spoken time such as "9 a.m." or "14:30" to HH:MM or HH:MM AM/PM.
+        Returns None if the text is not a time.
+        """
+        match = re.match(r"^(\d{1,2})(?::(\d{2}))?\s*([ap])?\.?\s*(m\.?)?$", text.strip().lower())
+        if not match:
+            return None
         
-        # If no match, return a generic action
-        return "unknown_command", {"text": text}
+        hours, minutes, meridiem = match.group(1), match.group(2) or "00", match.group(3)
+        if meridiem:
+            return f"{int(hours)}:{minutes} {meridiem.upper()}M"
+        return f"{int(hours):02d}:{minutes}"
+    
+    def parse_duration(self, text):
+        """
+        Convert a spoken duration such as "an hour" or "45 minutes" to minutes.
+        Returns None if the text is not a duration.
+        """
+        text = text.strip().lower()
+        if text in ("an hour", "a hour", "one hour"):
+            return 60
+        if text in ("half an hour", "half hour"):
+            return 30
+        
+        match = re.match(r"^(\d+)\s+(minute|hour)s?$", text)
+        if not match:
+            return None
+        return int(match.group(1)) * (60 if match.group(2) == "hour" else 1)
+    
+    def split_list(self, text):
+        """
+        Split a spoken list such as "london, paris and tokyo" into its items.
+        """
+        return split_list(text)
     
     def is_wake_word(self, text):
         """Check if the wake word is at the beginning of the text."""
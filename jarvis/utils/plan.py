@@ -0,0 +1,90 @@
+"""
+Concurrent execution of the commands in a compound utterance.
+"""
+
+from concurrent.futures import wait, FIRST_COMPLETED
+
+# Actions that drive the desktop or share a store run in the order they were asked,
+# e.g. "open chrome and search for flights" opens the browser before searching
+ORDERED_ACTIONS = [
+    {"open_app", "web_search", "open_website", "play_youtube"},
+    {"set_reminder", "get_reminders", "briefing"}
+]
+
+# Weather questions; those that name no city follow up on the previous one
+WEATHER_ACTIONS = {"get_weather", "get_forecast", "get_forecast_for", "weather_condition"}
+
+# Actions that end the session or the machine run after everything else
+FINAL_ACTIONS = {"exit", "shutdown", "restart"}
+
+class CommandPlan:
+    """
+    Orders the commands of one utterance by what they depend on.
+
+    Each step waits only for the earlier steps it depends on: desktop
+    actions wait for the previous desktop action, a weather follow-up
+    without a city ("and will it rain tomorrow") waits for the weather
+    question before it, and exit, shutdown and restart wait for everything.
+    Everything else runs at once, so an utterance takes about as long as its
+    slowest chain of dependent steps rather than the sum of all of them.
+    """
+
+    def __init__(self, intents):
+        self.steps = [{"action": action, "params": params, "after": set()} for action, params in intents]
+
+        for index, step in enumerate(self.steps):
+            action = step["action"]
+            if action in FINAL_ACTIONS:
+                step["after"].update(range(index))
+                continue
+
+            for group in ORDERED_ACTIONS:
+                if action in group:
+                    self._after_previous(index, group)
+
+            if action in WEATHER_ACTIONS and not step["params"].get("city"):
+                self._after_previous(index, WEATHER_ACTIONS)
+
+    def _after_previous(self, index, actions):
+        # Make a step depend on the closest earlier step with one of the actions
+        for earlier in range(index - 1, -1, -1):
+            if self.steps[earlier]["action"] in actions:
+                self.steps[index]["after"].add(earlier)
+                return
+
+    def __len__(self):
+        return len(self.steps)
+
+    def run(self, execute, executor):
+        """
+        Run every step, each as soon as the steps it depends on have finished.
+
+        Args:
+            execute (callable): Called as execute(action, params) for each step
+            executor (Executor): Runs the steps
+
+        Returns:
+            list: What execute returned for each step, in the order they were asked for
+        """
+        results = [None] * len(self.steps)
+        waiting = set(range(len(self.steps)))
+        finished = set()
+        running = {}
+
+        while waiting or running:
+            for index in sorted(waiting):
+                step = self.steps[index]
+                if step["after"] <= finished:
+                    running[executor.submit(execute, step["action"], step["params"])] = index
+                    waiting.discard(index)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    results[index] = (self.steps[index]["action"], False, f"Error: {e}")
+                finished.add(index)
+
+        return results
@@ -0,0 +1,274 @@
+"""
+Predictive prefetching of upstream data Jarvis is about to be asked for.
+"""
+
+import time
+import datetime
+import threading
+from .nlp import split_list
+from ..config import (PREFETCH_ENABLED, PREFETCH_HISTORY_DAYS, PREFETCH_MIN_DAYS, PREFETCH_MIN_SHARE,
+                      PREFETCH_WINDOW, PREFETCH_LEAD, PREFETCH_CHECK_INTERVAL, WEATHER_CACHE_TTL,
+                      FORECAST_CACHE_TTL, NEWS_REFRESH_INTERVAL)
+
+# Actions whose answers can be fetched ahead of time, and what they fetch
+FORECAST_ACTIONS = ("get_forecast", "get_forecast_for", "weather_condition")
+
+def lookup_targets(action, params):
+    """
+    The cacheable upstream lookups a command makes.
+
+    Returns:
+        list: (kind, key) pairs, e.g. [("weather", "london")]; kind is weather, forecast or news
+    """
+    if action == "get_weather":
+        return [("weather", city.lower()) for city in split_list(params.get("city", ""))]
+    if action in FORECAST_ACTIONS and params.get("city"):
+        return [("forecast", params["city"].strip().lower())]
+    if action == "get_news":
+        return [("news", params.get("category", "general"))]
+    if action == "briefing":
+        return ([("weather", params["city"].strip().lower())] if params.get("city") else []) + [("news", "general")]
+    return []
+
+class Prefetcher:
+    """
+    Learns habits from the command log and fetches their data just before they are due.
+
+    A habit is the same upstream lookup (current weather or forecast for a
+    city, or a news category) at about the same time of day, on at least
+    PREFETCH_MIN_DAYS days and at least PREFETCH_MIN_SHARE of the weekdays
+    (or weekend days) in the last PREFETCH_HISTORY_DAYS, e.g. "weather in
+    London on weekdays around 8:00". Habits are relearned once a day from
+    the log. Each is fetched PREFETCH_LEAD seconds before the stretch of its
+    cache lifetime that covers the most of those days' first asks, which
+    warms the WebTools caches so the question itself is answered from memory.
+    A habit already asked about while its cache is still warm isn't fetched.
+
+    A prefetch is a hit if the same lookup is asked for while the fetched
+    data is still cached, and wasted if it expires unused; stats() reports
+    both, to tune the thresholds against wasted API calls. Only successful
+    fetches count as prefetches, so prefetches = hits + wasted + pending;
+    fetches that fail are counted as failed.
+    """
+
+    def __init__(self, command_log, web_tools, news_feed=None, enabled=PREFETCH_ENABLED):
+        self.command_log = command_log
+        self.web_tools = web_tools
+        self.news_feed = news_feed
+        self.enabled = enabled
+
+        self.habits = []
+        self.prefetches = 0
+        self.failed = 0
+        self.hits = 0
+        self.wasted = 0
+
+        self._history = []  # (timestamp, target) of successful lookups, oldest first
+        self._learned_on = None
+        self._pending = {}  # target -> time the prefetched data expires
+        self._last_asked = {}  # target -> time it was last looked up
+        self._fetched = set()  # (target, date) already prefetched
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Load the history, dropping older commands from the log, and start prefetching in the background."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        # Compacted even with prefetching off, so the log stays bounded
+        since = time.time() - PREFETCH_HISTORY_DAYS * 86400
+        entries = self.command_log.compact(since)
+        if not self.enabled:
+            return
+        with self._lock:
+            self._history = [(entry["t"], target) for entry in entries if entry.get("ok")
+                             for target in self.targets(entry.get("a"), entry.get("p") or {})]
+            self._last_asked = {target: timestamp for timestamp, target in self._history}
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop prefetching."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def observe(self, action, params, success, timestamp=None):
+        """Note a command that just ran, counting hits on prefetched data."""
+        if not success:
+            return
+
+        now = timestamp or time.time()
+        with self._lock:
+            for target in self.targets(action, params):
+                self._history.append((now, target))
+                self._last_asked[target] = now
+                expires = self._pending.pop(target, None)
+                if expires is not None:
+                    if now <= expires:
+                        self.hits += 1
+                    else:
+                        self.wasted += 1
+
+    def stats(self):
+        """
+        Get prefetch counters.
+
+        Returns:
+            dict: {"habits", "prefetches", "failed", "hits", "wasted", "pending", "hit_rate"}
+        """
+        with self._lock:
+            self._expire(time.time())
+            finished = self.hits + self.wasted
+            return {
+                "habits": len(self.habits),
+                "prefetches": self.prefetches,
+                "failed": self.failed,
+                "hits": self.hits,
+                "wasted": self.wasted,
+                "pending": len(self._pending),
+                "hit_rate": round(self.hits / finished, 3) if finished else None
+            }
+
+    def targets(self, action, params):
+        """The upstream lookups a command makes, as hashable (kind, key) pairs."""
+        return lookup_targets(action, params)
+
+    def learn(self, today=None):
+        """
+        Find habits in the history before today.
+
+        Returns:
+            list: (target, weekend, minute_of_day, share) tuples, where
+                minute_of_day is when the prefetched data should be fresh
+        """
+        today = today or datetime.date.today()
+        midnight = time.mktime(today.timetuple())
+        with self._lock:
+            cutoff = midnight - PREFETCH_HISTORY_DAYS * 86400
+            self._history = [item for item in self._history if item[0] >= cutoff]
+            history = [item for item in self._history if item[0] < midnight]
+        if not history:
+            return []
+
+        # Days of each kind the log covers, so a daily habit and a weekly one aren't confused
+        first_day = datetime.date.fromtimestamp(history[0][0])
+        days = [first_day + datetime.timedelta(days=n) for n in range((today - first_day).days)]
+        covered = {False: sum(day.weekday() < 5 for day in days), True: sum(day.weekday() >= 5 for day in days)}
+
+        occurrences = {}
+        for timestamp, target in history:
+            moment = datetime.datetime.fromtimestamp(timestamp)
+            weekend = moment.weekday() >= 5
+            occurrences.setdefault((target, weekend), []).append((moment.hour * 60 + moment.minute, moment.date()))
+
+        habits = []
+        for (target, weekend), times in occurrences.items():
+            times.sort()
+            while times:
+                # The densest stretch of 2 * PREFETCH_WINDOW minutes, counted in distinct days
+                best, best_days = None, set()
+                end = 0
+                for start in range(len(times)):
+                    while end < len(times) and times[end][0] - times[start][0] <= 2 * PREFETCH_WINDOW:
+                        end += 1
+                    window_days = {day for _, day in times[start:end]}
+                    if len(window_days) > len(best_days):
+                        best, best_days = (start, end), window_days
+
+                share = len(best_days) / max(1, covered[weekend])
+                if len(best_days) < PREFETCH_MIN_DAYS or share < PREFETCH_MIN_SHARE:
+                    break
+
+                first_asks = {}
+                for minute, day in times[best[0]:best[1]]:
+                    first_asks.setdefault(day, minute)
+
+                # Start where the fetched data stays cached through the most first asks
+                span = (self._ttl(target[0]) - PREFETCH_LEAD) / 60
+                minutes = list(first_asks.values())
+                start_minute = max(minutes, key=lambda m: sum(m <= other <= m + span for other in minutes))
+                habits.append((target, weekend, start_minute, round(share, 2)))
+                del times[best[0]:best[1]]
+
+        return habits
+
+    def check(self, now=None):
+        """Prefetch every habit due now; called periodically by the background thread."""
+        now = now or time.time()
+        today = datetime.date.fromtimestamp(now)
+        if self._learned_on != today:
+            self.habits = self.learn(today)
+            self._learned_on = today
+            self._fetched = {item for item in self._fetched if item[1] == today}
+
+        midnight = time.mktime(today.timetuple())
+        weekend = today.weekday() >= 5
+        for target, habit_weekend, minute, share in self.habits:
+            due = midnight + minute * 60 - PREFETCH_LEAD
+            # Due from PREFETCH_LEAD before the start, with a check's slack so a late check still fetches
+            if habit_weekend != weekend or not due <= now < due + PREFETCH_LEAD + PREFETCH_CHECK_INTERVAL:
+                continue
+            if (target, today) in self._fetched:
+                continue
+
+            # Asked about recently enough that it is still cached
+            if now - self._last_asked.get(target, 0) < self._ttl(target[0]):
+                continue
+
+            self._fetched.add((target, today))
+            # Pending before fetching, so an ask that joins the fetch still counts as a hit
+            with self._lock:
+                self._pending[target] = now + self._ttl(target[0])
+            if not self.prefetch(target):
+                with self._lock:
+                    self._pending.pop(target, None)
+
+        with self._lock:
+            self._expire(now)
+
+    def prefetch(self, target):
+        """Fetch one lookup so the next ask for it is answered from cache."""
+        kind, key = target
+        try:
+            if kind == "weather":
+                success, _ = self.web_tools.get_weather(key)
+            elif kind == "forecast":
+                success, _ = self.web_tools.get_forecast(key)
+            elif kind == "news" and self.news_feed and key not in self.news_feed.categories:
+                # The feed keeps its own categories warm already
+                success, _ = self.news_feed.refresh(key)
+            else:
+                return False
+        except Exception as e:
+            print(f"Error prefetching {kind} for {key}: {e}")
+            success = False
+
+        with self._lock:
+            if success:
+                self.prefetches += 1
+            else:
+                self.failed += 1
+        return success
+
+    def _ttl(self, kind):
+        return {"weather": WEATHER_CACHE_TTL, "forecast": FORECAST_CACHE_TTL}.get(kind, NEWS_REFRESH_INTERVAL)
+
+    def _expire(self, now):
+        for target, expires in list(self._pending.items()):
+            if now > expires:
+                del self._pending[target]
+                self.wasted += 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Error prefetching: {e}")
+            self._stop.wait(PREFETCH_CHECK_INTERVAL)
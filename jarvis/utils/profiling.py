@@ -0,0 +1,194 @@
+"""
+Opt-in per-command profiling for Jarvis.
+"""
+
+import os
+import re
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from pathlib import Path
+from ..config import PROFILE_COMMANDS, PROFILE_THRESHOLD_MS, PROFILE_DIR, PROFILE_MEMORY, PROFILE_MEMORY_FRAMES
+
+class CommandProfiler:
+    """
+    Profiles commands and keeps the profiles of slow ones.
+    
+    While enabled, each command runs under cProfile and, if memory profiling
+    is on, with tracemalloc tracing (started and stopped around the command,
+    so nothing is traced between commands). Commands that finish within
+    threshold_ms are discarded without writing anything; slower ones are
+    written to output_dir from a background thread, off the response path:
+    
+        <time>-<action>-<ms>ms.prof        pstats data (snakeviz, gprof2dot)
+        <time>-<action>-<ms>ms.cpu.folded  CPU time as folded stacks
+        <time>-<action>-<ms>ms.mem.folded  Memory still allocated when the
+                                           command returned, as folded stacks
+    
+    Folded stacks ("outer;inner;leaf weight" per line) load directly into
+    flamegraph.pl, speedscope and inferno. cProfile only records
+    caller/callee pairs, so CPU stacks deeper than two frames are
+    reconstructed by splitting each function's time across its callers.
+    
+    Only one command is profiled at a time. cProfile only follows the
+    thread it was enabled on, so without memory profiling, commands that
+    run concurrently with a profiled one run unprofiled. tracemalloc traces
+    the whole process, though, so with memory profiling on commands take
+    turns instead: otherwise one command's memory profile would include
+    everything the others allocated. Allocations by background threads
+    (news refreshes, prefetching, reminder timers) during a command still
+    show up in its memory profile.
+    """
+    
+    def __init__(self, enabled=PROFILE_COMMANDS, threshold_ms=PROFILE_THRESHOLD_MS, output_dir=None,
+                 memory=PROFILE_MEMORY):
+        self.threshold_ms = threshold_ms
+        self.output_dir = Path(output_dir or PROFILE_DIR or Path(__file__).parent.parent / 'data' / 'profiles')
+        self.memory = memory
+        self.profiled = 0
+        self.slow = 0
+        self.written = 0
+        self.enabled = enabled
+        self._busy = threading.Lock()
+    
+    def enable(self):
+        """Start profiling commands."""
+        self.enabled = True
+    
+    def disable(self):
+        """Stop profiling commands."""
+        self.enabled = False
+    
+    def run(self, fn, *args, label=None, **kwargs):
+        """
+        Call fn(*args, **kwargs), profiling it if enabled.
+        
+        Args:
+            fn (callable): The command to run
+            label (callable, optional): Gets a name for the profile from fn's result
+        
+        Returns:
+            The result of fn
+        """
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        
+        # Wait for a turn when tracing memory, which would also record other commands' allocations
+        if not self._busy.acquire(blocking=self.memory):
+            return fn(*args, **kwargs)
+        
+        # Leave tracing alone if something else in the process started it
+        trace_memory = self.memory and not tracemalloc.is_tracing()
+        try:
+            profile = cProfile.Profile()
+            if trace_memory:
+                tracemalloc.start(PROFILE_MEMORY_FRAMES)
+            
+            start = time.perf_counter()
+            profile.enable()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                profile.disable()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.profiled += 1
+            
+            if elapsed_ms >= self.threshold_ms:
+                self.slow += 1
+                snapshot = tracemalloc.take_snapshot() if trace_memory else None
+                name = label(result) if callable(label) else (label or getattr(fn, "__name__", "command"))
+                threading.Thread(target=self._write, args=(name, elapsed_ms, profile, snapshot),
+                                 name="profile-writer").start()
+            return result
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+            self._busy.release()
+    
+    def _write(self, name, elapsed_ms, profile, snapshot):
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            slug = re.sub(r"[^\w]+", "_", str(name)).strip("_") or "command"
+            base = self.output_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{int(elapsed_ms)}ms"
+            
+            profile.dump_stats(f"{base}.prof")
+            with open(f"{base}.cpu.folded", "w") as f:
+                f.writelines(f"{stack} {weight}\n" for stack, weight in self._cpu_stacks(profile))
+            if snapshot is not None:
+                with open(f"{base}.mem.folded", "w") as f:
+                    f.writelines(f"{stack} {weight}\n" for stack, weight in self._memory_stacks(snapshot))
+            
+            self.written += 1
+            print(f"Profiled {name} ({elapsed_ms:.0f}ms): {base}.*")
+        except Exception as e:
+            print(f"Error writing profile for {name}: {e}")
+    
+    def _cpu_stacks(self, profile, max_depth=64):
+        """
+        Turn cProfile's caller/callee table into folded stacks weighted in microseconds.
+        
+        Each function's inclusive time on a path is split between its own
+        time and its callees in proportion to their totals across the run.
+        Paths worth less than 0.01% of the run are dropped, which keeps large
+        call graphs from blowing up into millions of paths.
+        """
+        stats = pstats.Stats(profile).stats
+        children = {}
+        for func, (_, _, _, _, callers) in stats.items():
+            for caller, edge in callers.items():
+                children.setdefault(caller, []).append((func, edge[3]))
+        
+        roots = [func for func, entry in stats.items() if not any(caller in stats for caller in entry[4])]
+        min_time = max(1e-6, sum(stats[root][3] for root in roots) * 1e-4)
+        folded = {}
+        
+        def walk(func, path, inclusive):
+            total_time, cumulative = stats[func][2], stats[func][3]
+            if cumulative <= 0 or inclusive < min_time:
+                return
+            scale = inclusive / cumulative
+            path = path + [self._frame_name(func)]
+            stack = ";".join(path)
+            folded[stack] = folded.get(stack, 0) + total_time * scale
+            
+            if len(path) >= max_depth:
+                return
+            for child, edge_time in children.get(func, []):
+                # Recursion is folded into the outermost call
+                if self._frame_name(child) in path:
+                    continue
+                walk(child, path, edge_time * scale)
+        
+        for root in roots:
+            walk(root, [], stats[root][3])
+        
+        for stack, seconds in folded.items():
+            weight = int(seconds * 1_000_000)
+            if weight > 0:
+                yield stack, weight
+    
+    def _memory_stacks(self, snapshot):
+        """Turn a tracemalloc snapshot into folded stacks weighted in bytes."""
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+        for statistic in snapshot.statistics("traceback"):
+            frames = list(statistic.traceback)
+            
+            # Start stacks at the command, not at the code that called the profiler
+            for index in range(len(frames) - 1, -1, -1):
+                if frames[index].filename == __file__:
+                    frames = frames[index + 1:]
+                    break
+            
+            if frames:
+                yield ";".join(f"{Path(frame.filename).name}:{frame.lineno}" for frame in frames), statistic.size
+    
+    def _frame_name(self, func):
+        filename, line, name = func
+        if filename == "~":
+            return name.strip("<>")
+        return f"{name} ({Path(filename).name}:{line})"
@@ -0,0 +1,189 @@
+"""
+Recurrence rules for Jarvis calendar events and reminders.
+"""
+
+import re
+import calendar
+import datetime
+
+WEEKDAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+class RecurrenceRule:
+    """
+    A repeating schedule stored as a single record.
+
+    Occurrences are never materialized up front; they are generated lazily
+    from the start of the series when a caller asks for them.
+    """
+
+    FREQUENCIES = ("daily", "weekly", "monthly")
+
+    def __init__(self, frequency, interval=1, weekdays=None, until=None, count=None):
+        """
+        Create a recurrence rule.
+
+        Args:
+            frequency (str): daily, weekly or monthly
+            interval (int, optional): Repeat every N days, weeks or months
+            weekdays (list, optional): Weekday numbers (0 = Monday) for weekly rules
+            until (str or date, optional): Last date of the series in format YYYY-MM-DD
+            count (int, optional): Total number of occurrences in the series
+        """
+        if frequency not in self.FREQUENCIES:
+            raise ValueError(f"Unknown frequency: {frequency}")
+        if int(interval) < 1:
+            raise ValueError("Interval must be at least 1")
+
+        self.frequency = frequency
+        self.interval = int(interval)
+        self.weekdays = sorted(set(int(day) for day in weekdays)) if weekdays else None
+        if isinstance(until, str):
+            until = datetime.datetime.strptime(until, "%Y-%m-%d").date()
+        self.until = until
+        self.count = int(count) if count else None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create a rule from its stored dictionary form."""
+        return cls(
+            data["frequency"],
+            interval=data.get("interval", 1),
+            weekdays=data.get("weekdays"),
+            until=data.get("until"),
+            count=data.get("count")
+        )
+
+    def to_dict(self):
+        """Return the dictionary form stored in the JSON files."""
+        return {
+            "frequency": self.frequency,
+            "interval": self.interval,
+            "weekdays": self.weekdays,
+            "until": self.until.strftime("%Y-%m-%d") if self.until else None,
+            "count": self.count
+        }
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Parse a spoken recurrence such as "every weekday", "every 2 weeks"
+        or "every monday and friday".
+
+        Returns:
+            RecurrenceRule or None if the text is not a recurrence
+        """
+        text = text.strip().lower()
+        if not text.startswith("every"):
+            return None
+
+        if re.match(r"every\s+(day|night|morning|evening)\b", text):
+            return cls("daily")
+        if re.match(r"every\s+weekday\b", text):
+            return cls("weekly", weekdays=[0, 1, 2, 3, 4])
+        if re.match(r"every\s+weekend\b", text):
+            return cls("weekly", weekdays=[5, 6])
+
+        match = re.match(r"every\s+(?:(\d+)\s+|other\s+)?(day|week|month)s?\b", text)
+        if match:
+            interval = int(match.group(1)) if match.group(1) else (2 if "other" in text else 1)
+            frequency = {"day": "daily", "week": "weekly", "month": "monthly"}[match.group(2)]
+            return cls(frequency, interval=interval)
+
+        weekdays = [day for day, name in enumerate(WEEKDAY_NAMES) if re.search(rf"\b{name}s?\b", text)]
+        if weekdays:
+            return cls("weekly", weekdays=weekdays)
+
+        return None
+
+    def occurrences(self, start, after=None, before=None):
+        """
+        Generate occurrences of the series in chronological order.
+
+        Args:
+            start (datetime): The first occurrence of the series
+            after (datetime, optional): Skip occurrences earlier than this
+            before (datetime, optional): Stop at occurrences later than this
+
+        Yields:
+            datetime: Each occurrence, carrying the time of day of start
+        """
+        if self.frequency == "daily":
+            generator = self._daily(start, after)
+        elif self.frequency == "weekly":
+            generator = self._weekly(start, after)
+        else:
+            generator = self._monthly(start, after)
+
+        for index, occurrence in generator:
+            if self.count is not None and index >= self.count:
+                return
+            if self.until is not None and occurrence.date() > self.until:
+                return
+            if before is not None and occurrence > before:
+                return
+            if after is not None and occurrence < after:
+                continue
+            yield occurrence
+
+    def next_after(self, start, moment):
+        """Return the first occurrence strictly after moment, or None."""
+        for occurrence in self.occurrences(start, after=moment):
+            if occurrence > moment:
+                return occurrence
+        return None
+
+    def describe(self):
+        """Return a short spoken description of the rule."""
+        if self.frequency == "weekly" and self.weekdays:
+            if self.weekdays == [0, 1, 2, 3, 4] and self.interval == 1:
+                return "every weekday"
+            days = " and ".join(WEEKDAY_NAMES[day].capitalize() for day in self.weekdays)
+            return f"every {days}" if self.interval == 1 else f"every {self.interval} weeks on {days}"
+
+        unit = {"daily": "day", "weekly": "week", "monthly": "month"}[self.frequency]
+        return f"every {unit}" if self.interval == 1 else f"every {self.interval} {unit}s"
+
+    # The generators below jump straight to the period containing `after`
+    # and compute the occurrence index arithmetically, so a query for next
+    # week costs the same whether the series started yesterday or in 2015.
+
+    def _daily(self, start, after):
+        step = 0
+        if after is not None and after > start:
+            step = (after.date() - start.date()).days // self.interval
+
+        while True:
+            yield step, start + datetime.timedelta(days=step * self.interval)
+            step += 1
+
+    def _weekly(self, start, after):
+        weekdays = self.weekdays or [start.weekday()]
+        week_anchor = start - datetime.timedelta(days=start.weekday())
+        first_week = [day for day in weekdays if day >= start.weekday()]
+
+        period = 0
+        if after is not None and after > start:
+            period = (after.date() - week_anchor.date()).days // 7 // self.interval
+        index = len(first_week) + (period - 1) * len(weekdays) if period else 0
+
+        while True:
+            week_start = week_anchor + datetime.timedelta(weeks=period * self.interval)
+            for day in (first_week if period == 0 else weekdays):
+                yield index, week_start + datetime.timedelta(days=day)
+                index += 1
+            period += 1
+
+    def _monthly(self, start, after):
+        period = 0
+        if after is not None and after > start:
+            months = (after.year - start.year) * 12 + after.month - start.month
+            period = max(0, months // self.interval)
+
+        while True:
+            month_index = start.month - 1 + period * self.interval
+            year = start.year + month_index // 12
+            month = month_index % 12 + 1
+            # Clamp the 29th-31st to the last day of shorter months
+            day = min(start.day, calendar.monthrange(year, month)[1])
+            yield period, start.replace(year=year, month=month, day=day)
+            period += 1
@@ -0,0 +1,132 @@
+"""
+Circuit breakers and adaptive timeouts for Jarvis's upstream APIs.
+"""
+
+import time
+import threading
+from collections import deque
+from ..config import (CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT, UPSTREAM_TIMEOUT_MIN,
+                      UPSTREAM_TIMEOUT_MAX, UPSTREAM_TIMEOUT_PERCENTILE, UPSTREAM_TIMEOUT_MULTIPLIER)
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+class LatencyTracker:
+    """Keeps the most recent successful response times of one upstream."""
+    
+    def __init__(self, size=50):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+    
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+    
+    def __len__(self):
+        return len(self._samples)
+    
+    def percentile(self, percent):
+        """Get a latency percentile in seconds, or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(percent / 100 * (len(samples) - 1))))
+        return samples[index]
+
+class CircuitBreaker:
+    """
+    Tracks the health of one upstream service.
+    
+    After failure_threshold consecutive failures the circuit opens and
+    allow() returns False, so callers fail immediately instead of waiting on
+    a service that is down. After reset_timeout seconds a single probe call
+    is let through (half-open); its success closes the circuit and its
+    failure opens it for another reset_timeout.
+    
+    The timeout for each call adapts to recent latency: a multiple of the
+    configured percentile of successful calls, clamped between min_timeout
+    and max_timeout. Probes get max_timeout so a service that has merely
+    become slower can recover.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+    
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT,
+                 min_timeout=UPSTREAM_TIMEOUT_MIN, max_timeout=UPSTREAM_TIMEOUT_MAX):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.latency = LatencyTracker()
+        
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self.rejected = 0
+        self._probing = False
+        self._lock = threading.Lock()
+    
+    def allow(self):
+        """
+        Check whether a call may be made now.
+        
+        Returns:
+            bool: False while the circuit is open or another probe is running
+        """
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            
+            self.rejected += 1
+            return False
+    
+    def timeout(self):
+        """Get the timeout in seconds for the next call."""
+        if self.state == self.HALF_OPEN or len(self.latency) < 5:
+            return self.max_timeout
+        
+        recent = self.latency.percentile(UPSTREAM_TIMEOUT_PERCENTILE)
+        return min(self.max_timeout, max(self.min_timeout, recent * UPSTREAM_TIMEOUT_MULTIPLIER))
+    
+    def record_success(self, seconds):
+        """Record a call that got a usable response after the given time."""
+        self.latency.add(seconds)
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+    
+    def record_failure(self):
+        """Record a call that timed out, couldn't connect or got a server error."""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probing = False
+    
+    def stats(self):
+        """
+        Get the breaker's state for diagnostics.
+        
+        Returns:
+            dict: {"state", "failures", "rejected", "timeout", "p50", "p95"}
+        """
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "timeout": self.timeout(),
+            "p50": self.latency.percentile(50),
+            "p95": self.latency.percentile(95)
+        }
@@ -0,0 +1,152 @@
+"""
+Shared service container for Jarvis.
+"""
+
+import threading
+
+class ServiceContainer:
+    """
+    Builds shared services lazily, once, and manages their lifecycle.
+
+    Services are registered as factories and only constructed the first time
+    they are requested. Each service is built under its own lock, so slow
+    factories for different services run at once while concurrent requests
+    for the same one wait for a single build. Services with a start() method
+    are started when the container starts (or when they are first built
+    after that), and services with a close() method are closed in reverse
+    build order on shutdown.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._eager = set()
+        self._instances = {}
+        self._build_order = []
+        self._build_locks = {}  # name -> lock held while that service is built
+        self._lock = threading.RLock()
+        self.started = False
+
+    def register(self, name, factory, eager=False):
+        """
+        Register a factory for a named service.
+
+        Args:
+            name (str): The service name
+            factory (callable): Called with the container to build the service
+            eager (bool, optional): Build the service on start() instead of on first use
+        """
+        with self._lock:
+            self._factories[name] = factory
+            if eager:
+                self._eager.add(name)
+
+    def __contains__(self, name):
+        return name in self._factories
+
+    def get(self, name):
+        """Get a service, building it on first use."""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if name not in self._factories:
+                raise KeyError(f"Unknown service: {name}")
+            build_lock = self._build_locks.setdefault(name, threading.RLock())
+
+        with build_lock:
+            # Another thread may have built it while we waited
+            instance = self._instances.get(name)
+            if instance is not None:
+                return instance
+
+            instance = self._factories[name](self)
+            with self._lock:
+                self._instances[name] = instance
+                self._build_order.append(name)
+                started = self.started
+
+            # Built before start() took its list of services, or after it; started once either way
+            if started and hasattr(instance, "start"):
+                instance.start()
+            return instance
+
+    def start(self):
+        """Build eager services and start every built service that can be started."""
+        with self._lock:
+            if self.started:
+                return
+            self.started = True
+            built = [self._instances[name] for name in self._build_order]
+            eager = [name for name in self._factories if name in self._eager]
+
+        for instance in built:
+            if hasattr(instance, "start"):
+                instance.start()
+
+        for name in eager:
+            self.get(name)
+
+    def shutdown(self):
+        """Close built services in reverse build order and forget them."""
+        with self._lock:
+            for name in reversed(self._build_order):
+                instance = self._instances[name]
+                if hasattr(instance, "close"):
+                    try:
+                        instance.close()
+                    except Exception as e:
+                        print(f"Error shutting down {name}: {e}")
+
+            self._instances = {}
+            self._build_order = []
+            self.started = False
+
+def _build_system(services):
+    from .system import SystemOperations
+    return SystemOperations()
+
+def _build_web_tools(services):
+    from .web import WebTools
+    return WebTools()
+
+def _build_news_feed(services):
+    from .news_feed import NewsFeed
+    return NewsFeed(services.get("web_tools"))
+
+def _build_knowledge(services):
+    from .knowledge import KnowledgeStore
+    return KnowledgeStore()
+
+def _build_command_log(services):
+    from .command_log import CommandLog
+    from ..config import COMMAND_LOG_FILE
+    return CommandLog(COMMAND_LOG_FILE or None)
+
+def _build_prefetcher(services):
+    from .prefetch import Prefetcher
+    return Prefetcher(services.get("command_log"), services.get("web_tools"), services.get("news_feed"))
+
+def _build_config_watcher(services):
+    from .file_watch import ConfigWatcher
+    return ConfigWatcher()
+
+_default_container = None
+_default_lock = threading.Lock()
+
+def get_services():
+    """Get the process-wide container with the default Jarvis services registered."""
+    global _default_container
+
+    with _default_lock:
+        if _default_container is None:
+            container = ServiceContainer()
+            container.register("system", _build_system)
+            container.register("web_tools", _build_web_tools)
+            container.register("config_watcher", _build_config_watcher)
+            container.register("news_feed", _build_news_feed, eager=True)
+            container.register("knowledge", _build_knowledge)
+            container.register("command_log", _build_command_log)
+            container.register("prefetcher", _build_prefetcher, eager=True)
+            _default_container = container
+        return _default_container
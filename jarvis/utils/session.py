@@ -0,0 +1,32 @@
+"""
+Per-client conversation state for Jarvis.
+"""
+
+import time
+import uuid
+import threading
+from ..config import HOME_CITY
+
+class Session:
+    """
+    State that belongs to one conversation rather than to Jarvis as a whole.
+    
+    The voice loop has one session; in daemon mode every socket connection
+    (or HTTP session ID) gets its own, so "will it rain tomorrow" follows up
+    on that client's last city and "goodbye" only ends that client's session.
+    Commands within a session run one at a time, in order, under its lock.
+    """
+    
+    def __init__(self, session_id=None, last_city=HOME_CITY):
+        self.id = session_id or uuid.uuid4().hex[:12]
+        self.last_city = last_city
+        self.running = True
+        self.commands = 0
+        self.created = time.time()
+        self.last_active = self.created
+        self.lock = threading.Lock()
+    
+    def touch(self):
+        """Record activity, for expiring idle sessions."""
+        self.last_active = time.time()
+        self.commands += 1
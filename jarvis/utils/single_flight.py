@@ -0,0 +1,87 @@
+"""
+Coalescing of identical concurrent calls for Jarvis.
+"""
+
+import threading
+
+class _Call:
+    """One in-flight call and the result its waiters will share."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time.
+    
+    The first caller for a key (the leader) runs the function; callers that
+    arrive with the same key while it is running wait for it and get the same
+    result, or the same exception. Nothing is cached: once the call returns,
+    the next caller starts a fresh one.
+    
+    Keys are tuples whose first item names the kind of request, e.g.
+    ("weather", "london"); counters are kept per kind.
+    """
+    
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+    
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Call fn(*args, **kwargs), or share the result of an identical call in flight.
+        
+        Args:
+            key (tuple): Identifies the call; equal keys are coalesced
+            fn (callable): The function to run if no identical call is in flight
+        
+        Returns:
+            The result of fn
+        """
+        with self._lock:
+            stats = self._stats.setdefault(key[0], {"calls": 0, "coalesced": 0})
+            call = self._calls.get(key)
+            if call is not None:
+                stats["coalesced"] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                stats["calls"] += 1
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+    
+    def stats(self):
+        """
+        Get call counters.
+        
+        Returns:
+            dict: {kind: {"calls": upstream calls made, "coalesced": calls that
+                  shared another call's result}}
+        """
+        with self._lock:
+            return {kind: dict(counts) for kind, counts in self._stats.items()}
+    
+    def in_flight(self):
+        """Get the number of calls currently running."""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,166 @@
+"""
+Speculative lookups started from interim speech recognition results.
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .prefetch import lookup_targets
+from ..config import SPECULATION_ENABLED, SPECULATION_MIN_STABLE, SPECULATION_MAX_WORKERS
+
+class Speculator:
+    """
+    Starts a command's lookups while the user is still speaking.
+
+    A streaming recognizer reports interim hypotheses ("what's the weather
+    in lon", "what's the weather in london", ...) before the final
+    transcript. Each one is parsed like a command. A lookup it needs
+    (weather, forecast, news, or a Wikipedia or Wolfram Alpha answer) is
+    started once the same lookup has appeared in SPECULATION_MIN_STABLE
+    hypotheses in a row, so "lon" is never fetched. Only lookups with no
+    effect beyond warming a cache are started, never actions.
+
+    When the final transcript arrives, resolve() commits the lookups it
+    needs and discards the rest. The command then finds a committed result
+    already cached, or joins the lookup still in flight. stats() reports
+    the latency saved and the work wasted.
+    """
+
+    def __init__(self, nlp, web_search, enabled=SPECULATION_ENABLED, min_stable=SPECULATION_MIN_STABLE,
+                 require_wake_word=True):
+        self.nlp = nlp
+        self.web_search = web_search
+        self.enabled = enabled
+        self.min_stable = min_stable
+        self.require_wake_word = require_wake_word
+
+        self.started = 0
+        self.committed = 0
+        self.discarded = 0
+        self.saved_ms = 0.0
+        self.wasted_ms = 0.0
+
+        self._running = {}  # target -> {"started", "finished", "discarded"} of this utterance's lookups
+        self._streak = {}  # target -> consecutive hypotheses it appeared in
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def begin(self):
+        """Start a new utterance, dropping anything left from the last one."""
+        self.resolve("")
+
+    def partial(self, text):
+        """Handle an interim hypothesis from the recognizer."""
+        if not self.enabled or not text:
+            return
+        if self.require_wake_word and not self.nlp.is_wake_word(text):
+            return
+
+        targets = set()
+        for action, params in self.nlp.process_compound(text):
+            targets.update(self.targets(action, params))
+
+        with self._lock:
+            self._streak = {target: self._streak.get(target, 0) + 1 for target in targets}
+            due = []
+            for target, streak in self._streak.items():
+                if streak >= self.min_stable and target not in self._running:
+                    entry = {"started": time.perf_counter(), "finished": None, "discarded": False}
+                    self._running[target] = entry
+                    self.started += 1
+                    due.append((target, entry))
+
+        for target, entry in due:
+            self._get_executor().submit(self._fetch, target, entry)
+
+    def resolve(self, text):
+        """
+        Commit the speculative lookups the final transcript needs and discard the rest.
+
+        Returns:
+            set: The targets that were committed
+        """
+        needed = set()
+        if text:
+            for action, params in self.nlp.process_compound(text):
+                needed.update(self.targets(action, params))
+
+        now = time.perf_counter()
+        with self._lock:
+            running, self._running, self._streak = self._running, {}, {}
+            for target, entry in running.items():
+                if target in needed:
+                    # Everything fetched before the final transcript is time the command doesn't wait
+                    self.committed += 1
+                    self.saved_ms += ((entry["finished"] or now) - entry["started"]) * 1000
+                elif entry["finished"] is not None:
+                    self.discarded += 1
+                    self.wasted_ms += (entry["finished"] - entry["started"]) * 1000
+                else:
+                    # Still running; it is counted as wasted when it finishes
+                    self.discarded += 1
+                    entry["discarded"] = True
+
+        return needed & set(running)
+
+    def stats(self):
+        """
+        Get speculation counters.
+
+        Returns:
+            dict: {"started", "committed", "discarded", "saved_ms", "wasted_ms", "commit_rate"}
+        """
+        with self._lock:
+            resolved = self.committed + self.discarded
+            return {
+                "started": self.started,
+                "committed": self.committed,
+                "discarded": self.discarded,
+                "saved_ms": round(self.saved_ms, 1),
+                "wasted_ms": round(self.wasted_ms, 1),
+                "commit_rate": round(self.committed / resolved, 3) if resolved else None
+            }
+
+    def targets(self, action, params):
+        """The lookups a command makes that are safe to start early."""
+        targets = lookup_targets(action, params)
+        if action == "get_info" and params.get("query"):
+            targets.append(("info", params["query"]))
+        elif action == "ask_question" and params.get("query"):
+            targets.append(("answer", params["query"]))
+        return targets
+
+    def close(self):
+        """Stop the speculation workers."""
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=SPECULATION_MAX_WORKERS,
+                                                    thread_name_prefix="speculate")
+            return self._executor
+
+    def _fetch(self, target, entry):
+        kind, key = target
+        web_tools = self.web_search.web_tools
+        try:
+            if kind == "weather":
+                web_tools.get_weather(key)
+            elif kind == "forecast":
+                web_tools.get_forecast(key)
+            elif kind == "news":
+                self.web_search.news_feed.get(key)
+            elif kind == "info":
+                self.web_search.lookup_info(key)
+            elif kind == "answer":
+                self.web_search.lookup_answer(key)
+        except Exception as e:
+            print(f"Error speculating on {kind} for {key}: {e}")
+
+        with self._lock:
+            entry["finished"] = time.perf_counter()
+            if entry["discarded"]:
+                self.wasted_ms += (entry["finished"] - entry["started"]) * 1000
@@ -6,7 +6,14 @@ import speech_recognition as sr
 import pyttsx3
 import random
 import time
-from ..config import VOICE_RATE, VOICE_MALE, GREETING_RESPONSES, FAREWELL_RESPONSES
+import json
+from ..config import (VOICE_RATE, VOICE_MALE, GREETING_RESPONSES, FAREWELL_RESPONSES, STREAMING_MODEL_PATH,
+                      VAD_ENABLED, VAD_BUFFER_SECONDS)
+
+try:
+    import vosk
+except ImportError:  # Streaming recognition is optional; Google's recognizer only returns final results
+    vosk = None
 
 class Speech:
     def __init__(self):
@@ -26,14 +33,44 @@ class Speech:
         # Adjust for ambient noise
         with self.microphone as source:
             self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        
+        # Capture into one preallocated buffer and cut utterances at the silence around them
+        from .vad import NUMPY_AVAILABLE, RingBuffer, VoiceActivityDetector
+        self.ring = None
+        self.vad = None
+        if VAD_ENABLED and NUMPY_AVAILABLE and self.microphone.SAMPLE_WIDTH == 2:
+            self.ring = RingBuffer(self.microphone.SAMPLE_RATE * VAD_BUFFER_SECONDS)
+            self.vad = VoiceActivityDetector(self.microphone.SAMPLE_RATE)
+        
+        # A local streaming recognizer, if configured, reports words as they are heard
+        self.streaming_model = None
+        if STREAMING_MODEL_PATH:
+            if vosk is None:
+                print("Streaming recognition needs the vosk package; using Google speech recognition.")
+            else:
+                vosk.SetLogLevel(-1)
+                self.streaming_model = vosk.Model(STREAMING_MODEL_PATH)
     
-    def listen(self, timeout=5, phrase_time_limit=5):
-        """Listen for voice input and convert to text."""
+    def listen(self, timeout=5, phrase_time_limit=5, on_partial=None):
+        """
+        Listen for voice input and convert to text.
+        
+        Args:
+            timeout (int, optional): Seconds to wait for speech to start
+            phrase_time_limit (int, optional): Seconds of speech to listen to at most
+            on_partial (callable, optional): Called with each interim transcript, with a streaming recognizer
+        """
+        if self.streaming_model:
+            return self._listen_streaming(timeout, phrase_time_limit, on_partial)
+        
         text = ""
         try:
             with self.microphone as source:
                 print("Listening...")
-                audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+                if self.vad:
+                    audio = self._capture(source, timeout, phrase_time_limit)
+                else:
+                    audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
                 print("Processing speech...")
                 text = self.recognizer.recognize_google(audio)
                 print(f"You said: {text}")
@@ -48,6 +85,67 @@ class Speech:
         
         return text.lower() if text else ""
     
+    def _capture(self, source, timeout, phrase_time_limit):
+        """
+        Record one utterance, ending it as soon as the speaker stops.
+        
+        Only the speech and a little padding are sent for recognition, not
+        the silence before and after it.
+        """
+        self.ring.reset()
+        self.vad.reset(threshold=self.recognizer.energy_threshold)
+        timeout_samples = (timeout or float("inf")) * source.SAMPLE_RATE
+        limit_samples = (phrase_time_limit or float("inf")) * source.SAMPLE_RATE
+        
+        while not self.vad.update(self.ring):
+            self.ring.write(source.stream.read(source.CHUNK))
+            
+            if not self.vad.speaking:
+                if self.ring.written > timeout_samples:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            elif self.ring.written - self.vad.speech_start > limit_samples:
+                break
+        
+        begin, end = self.vad.segment(self.ring)
+        return sr.AudioData(self.ring.view(begin, end).tobytes(), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+    
+    def _listen_streaming(self, timeout, phrase_time_limit, on_partial):
+        text = ""
+        try:
+            recognizer = vosk.KaldiRecognizer(self.streaming_model, self.microphone.SAMPLE_RATE)
+            with self.microphone as source:
+                print("Listening...")
+                start = time.time()
+                heard = ""
+                while True:
+                    data = source.stream.read(source.CHUNK)
+                    if recognizer.AcceptWaveform(data):
+                        # A pause ended the utterance
+                        text = json.loads(recognizer.Result()).get("text", "")
+                        if text:
+                            break
+                    else:
+                        partial = json.loads(recognizer.PartialResult()).get("partial", "")
+                        if partial and partial != heard:
+                            heard = partial
+                            if on_partial:
+                                on_partial(partial)
+                    
+                    elapsed = time.time() - start
+                    if not heard and elapsed > timeout:
+                        print("No speech detected within timeout period.")
+                        break
+                    if elapsed > timeout + phrase_time_limit:
+                        text = json.loads(recognizer.FinalResult()).get("text", "")
+                        break
+            
+            if text:
+                print(f"You said: {text}")
+        except Exception as e:
+            print(f"Error in speech recognition: {e}")
+        
+        return text.lower() if text else ""
+    
     def speak(self, text):
         """Convert text to speech."""
         if not text:
@@ -0,0 +1,126 @@
+"""
+Concurrent, timed construction of Jarvis's components.
+"""
+
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from ..config import STARTUP_MAX_WORKERS
+
+class Startup:
+    """
+    Builds components concurrently, each once the components it needs exist.
+
+    Components are added with the names of the components they are built
+    from, which are passed to their factory in that order:
+
+        startup.add("services", start_services)
+        startup.add("web_search", WebSearchSkill, after=["services"])
+
+    run() builds everything on a small thread pool, except the components
+    named in on_main_thread, which it builds itself first, in order (for
+    libraries such as pyttsx3 that must stay on the thread that created
+    them). Startup then takes about as long as the slowest chain of
+    dependent components. Components added with background=True (cache and
+    connection warm-up) are not waited for.
+
+    timings holds how long each factory took, not counting time spent
+    waiting for its dependencies.
+    """
+
+    def __init__(self, max_workers=STARTUP_MAX_WORKERS):
+        self.max_workers = max_workers
+        self.timings = {}
+        self.elapsed = None
+        self._tasks = {}  # name -> (factory, after, background), in the order added
+        self._lock = threading.Lock()
+
+    def add(self, name, factory, after=(), background=False):
+        """
+        Add a component.
+
+        Args:
+            name (str): The component's name
+            factory (callable): Builds it, given the components named in after
+            after (list, optional): Components that must be built first; they must already be added
+            background (bool, optional): Build it without making run() wait for it
+        """
+        for dependency in after:
+            if dependency not in self._tasks:
+                raise ValueError(f"{name} depends on {dependency}, which hasn't been added")
+        self._tasks[name] = (factory, list(after), background)
+
+    def run(self, on_main_thread=()):
+        """
+        Build every component.
+
+        Returns:
+            dict: Component name -> what its factory returned, for all but background components
+
+        Raises:
+            Exception: The first error a component raised, once the others have finished
+        """
+        start = time.perf_counter()
+        futures = {}
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="startup")
+        try:
+            # Tasks are submitted in the order added, so every task's dependencies
+            # are running or done by the time a worker picks it up
+            for name in self._tasks:
+                if name in on_main_thread:
+                    futures[name] = Future()
+                else:
+                    futures[name] = pool.submit(self._build, name, futures)
+
+            for name in on_main_thread:
+                future = futures[name]
+                try:
+                    future.set_result(self._build(name, futures))
+                except Exception as e:
+                    future.set_exception(e)
+
+            # Let the rest finish before raising, so no component is still being built
+            # (or holding a device) after run() has failed
+            foreground = [name for name, task in self._tasks.items() if not task[2]]
+            wait([futures[name] for name in foreground])
+            results = {name: futures[name].result() for name in foreground}
+        finally:
+            pool.shutdown(wait=False)
+
+        self.elapsed = time.perf_counter() - start
+        return results
+
+    def report(self):
+        """One line of startup timings, slowest component first."""
+        with self._lock:
+            timings = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)
+        parts = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in timings)
+        return f"{self.elapsed * 1000:.0f}ms ({parts})"
+
+    def timings_ms(self):
+        """
+        Get startup timings.
+
+        Returns:
+            dict: {"total", and each component's name}, in milliseconds
+        """
+        with self._lock:
+            timings = {name: round(seconds * 1000, 1) for name, seconds in self.timings.items()}
+        timings["total"] = round(self.elapsed * 1000, 1) if self.elapsed is not None else None
+        return timings
+
+    def _build(self, name, futures):
+        factory, after, background = self._tasks[name]
+        dependencies = [futures[dependency].result() for dependency in after]
+
+        start = time.perf_counter()
+        try:
+            return factory(*dependencies)
+        except Exception as e:
+            if background:
+                # Nobody waits for background work; say why it failed
+                print(f"Error warming up {name}: {e}")
+            raise
+        finally:
+            with self._lock:
+                self.timings[name] = time.perf_counter() - start
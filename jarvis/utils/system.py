@@ -3,33 +3,74 @@ System operations for Jarvis, including application launching and file operation
 """
 
 import os
+import shlex
 import subprocess
 import json
 import time
+import threading
 from pathlib import Path
 import sys
 from ..config import DEFAULT_APPLICATIONS
 
 class SystemOperations:
     def __init__(self):
+        self.app_paths_file = Path(__file__).parent.parent / 'data' / 'app_paths.json'
         self.app_paths = DEFAULT_APPLICATIONS.copy()
+        self.custom_app_paths = {}  # Only the entries from app_paths.json, which come first on every platform
         self.load_custom_app_paths()
+        self._app_index = None
+        self._app_index_lock = threading.Lock()
+    
+    @property
+    def app_index(self):
+        """Index of applications on PATH and in .desktop files, loaded on first use and kept current."""
+        if self._app_index is None:
+            with self._app_index_lock:
+                # Build it once even if several commands ask at the same moment
+                if self._app_index is None:
+                    from .app_index import AppIndex
+                    self._app_index = AppIndex()
+        return self._app_index
     
     def load_custom_app_paths(self):
         """Load custom application paths from app_paths.json if it exists."""
+        custom_paths = self._read_custom_app_paths()
+        if custom_paths:
+            self.custom_app_paths = custom_paths
+            self.app_paths.update(custom_paths)
+    
+    def reload_custom_app_paths(self):
+        """
+        Re-read app_paths.json after it was edited.
+        
+        The new map is built off to the side and swapped in with a single
+        assignment, so a concurrent lookup sees either the old or the new
+        paths. A file that fails to parse (e.g. mid-save) keeps the old ones.
+        """
+        custom_paths = self._read_custom_app_paths()
+        if custom_paths is None:
+            return
+        
+        app_paths = DEFAULT_APPLICATIONS.copy()
+        app_paths.update(custom_paths)
+        self.custom_app_paths = custom_paths
+        self.app_paths = app_paths
+    
+    def _read_custom_app_paths(self):
+        """Read app_paths.json. Returns None if it could not be read."""
         try:
-            app_paths_file = Path(__file__).parent.parent / 'data' / 'app_paths.json'
-            if app_paths_file.exists():
-                with open(app_paths_file, 'r') as f:
-                    custom_paths = json.load(f)
-                    self.app_paths.update(custom_paths)
+            if self.app_paths_file.exists():
+                with open(self.app_paths_file, 'r') as f:
+                    return json.load(f)
+            return {}
         except Exception as e:
             print(f"Error loading custom app paths: {e}")
+            return None
     
     def save_custom_app_path(self, app_name, app_path):
         """Save a custom application path to app_paths.json."""
         try:
-            app_paths_file = Path(__file__).parent.parent / 'data' / 'app_paths.json'
+            app_paths_file = self.app_paths_file
             
             # If file exists, load existing data
             custom_paths = {}
@@ -44,6 +85,7 @@ class SystemOperations:
                 json.dump(custom_paths, f, indent=4)
             
             # Update current paths
+            self.custom_app_paths = custom_paths
             self.app_paths[app_name.lower()] = app_path
             return True
         except Exception as e:
@@ -54,10 +96,24 @@ class SystemOperations:
         """Open an application by name."""
         app_name = app_name.lower()
         
+        # Paths set in app_paths.json come first. The default paths are
+        # Windows-only, so elsewhere the application index is the fallback
+        if os.name == 'nt':
+            app_path = self.app_paths.get(app_name)
+        else:
+            app_path = self.custom_app_paths.get(app_name)
+            command = None if app_path else self.app_index.lookup(app_name)
+            if command:
+                try:
+                    subprocess.Popen(shlex.split(command), start_new_session=True)
+                    return True, f"Opening {app_name}"
+                except Exception as e:
+                    return False, f"Error opening {app_name}: {e}"
+        
         # Check if app is in our known applications
-        if app_name in self.app_paths:
+        if app_path:
             try:
-                subprocess.Popen(self.app_paths[app_name])
+                subprocess.Popen(app_path)
                 return True, f"Opening {app_name}"
             except Exception as e:
                 return False, f"Error opening {app_name}: {e}"
@@ -0,0 +1,181 @@
+"""
+HTTP transports for Jarvis's upstream API calls: live, recording and replay.
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+import urllib.parse
+from pathlib import Path
+import requests
+from ..config import (HTTP_TRANSPORT, HTTP_FIXTURES_DIR, REPLAY_LATENCY, REPLAY_JITTER,
+                      REPLAY_FAILURE_RATE, REPLAY_SEED)
+
+# Query parameters that carry credentials; left out of fixture keys and files
+SECRET_PARAMS = {"appid", "apikey", "api_key", "key", "token"}
+
+class LiveTransport:
+    """Sends requests over a pooled requests.Session."""
+    
+    def __init__(self):
+        self.session = requests.Session()
+    
+    def get(self, url, params=None, timeout=None):
+        return self.session.get(url, params=params, timeout=timeout)
+    
+    def close(self):
+        self.session.close()
+
+class RecordingTransport(LiveTransport):
+    """
+    Sends requests live and saves every response as a fixture file.
+    
+    Recording the same request again overwrites its fixture.
+    """
+    
+    def __init__(self, fixtures_dir=None):
+        super().__init__()
+        self.fixtures_dir = Path(fixtures_dir or default_fixtures_dir())
+    
+    def get(self, url, params=None, timeout=None):
+        start = time.perf_counter()
+        response = super().get(url, params=params, timeout=timeout)
+        elapsed = time.perf_counter() - start
+        
+        fixture = {
+            "request": {"url": url, "params": public_params(params)},
+            "status_code": response.status_code,
+            "content_type": response.headers.get("Content-Type", ""),
+            "body": response.text,
+            "elapsed": elapsed,
+            "recorded_at": time.time()
+        }
+        try:
+            os.makedirs(self.fixtures_dir, exist_ok=True)
+            path = self.fixtures_dir / fixture_name(url, params)
+            temp_path = path.with_suffix(".tmp")
+            with open(temp_path, "w") as f:
+                json.dump(fixture, f, indent=2)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"Error recording fixture for {url}: {e}")
+        return response
+
+class ReplayTransport:
+    """
+    Serves recorded fixtures instead of touching the network.
+    
+    Latency can be injected per call (a fixed number of milliseconds plus
+    random jitter, or each fixture's recorded latency), and a fraction of
+    calls can be made to fail with a connection error. Both draw from a
+    seeded random generator, so a run is repeatable. Injected latency longer
+    than the caller's timeout raises requests.Timeout after the timeout, the
+    way a slow live service would.
+    """
+    
+    def __init__(self, fixtures_dir=None, latency=REPLAY_LATENCY, jitter=REPLAY_JITTER,
+                 failure_rate=REPLAY_FAILURE_RATE, seed=REPLAY_SEED):
+        self.fixtures_dir = Path(fixtures_dir or default_fixtures_dir())
+        self.use_recorded_latency = str(latency).strip().lower() == "recorded"
+        self.latency = 0.0 if self.use_recorded_latency else float(latency) / 1000
+        self.jitter = jitter / 1000
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._fixtures = {}
+        self._lock = threading.Lock()
+    
+    def get(self, url, params=None, timeout=None):
+        fixture = self._load(fixture_name(url, params))
+        if fixture is None:
+            raise requests.ConnectionError(f"No recorded response for {url} {public_params(params)}")
+        
+        with self._lock:
+            self.calls += 1
+            delay = fixture.get("elapsed", 0) if self.use_recorded_latency else self.latency
+            delay += self._random.uniform(0, self.jitter) if self.jitter else 0
+            fail = self._random.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+        
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise requests.Timeout(f"Replayed call to {url} timed out after {timeout:.2f}s")
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise requests.ConnectionError(f"Injected failure for {url}")
+        
+        response = requests.Response()
+        response.status_code = fixture["status_code"]
+        response._content = fixture["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.headers["Content-Type"] = fixture.get("content_type", "")
+        response.url = url
+        return response
+    
+    def close(self):
+        pass
+    
+    def _load(self, name):
+        with self._lock:
+            if name in self._fixtures:
+                return self._fixtures[name]
+        
+        try:
+            with open(self.fixtures_dir / name, "r") as f:
+                fixture = json.load(f)
+        except FileNotFoundError:
+            fixture = None
+        except Exception as e:
+            print(f"Error loading fixture {name}: {e}")
+            fixture = None
+        
+        with self._lock:
+            self._fixtures[name] = fixture
+        return fixture
+
+def default_fixtures_dir():
+    return HTTP_FIXTURES_DIR or Path(__file__).parent.parent / 'data' / 'fixtures'
+
+def public_params(params):
+    """Get the query parameters without credentials, in a stable order."""
+    return {key: str(value) for key, value in sorted((params or {}).items())
+            if key.lower() not in SECRET_PARAMS}
+
+def fixture_name(url, params):
+    """
+    Get the fixture file name for a request.
+    
+    The name is readable (host and path) plus a hash of the URL and the
+    non-secret parameters, so recordings made with one API key replay
+    with any other.
+    """
+    parsed = urllib.parse.urlparse(url)
+    readable = f"{parsed.netloc}{parsed.path}".replace("/", "_").replace(":", "_").strip("_")
+    digest = hashlib.sha1(json.dumps([url, public_params(params)]).encode("utf-8")).hexdigest()[:12]
+    return f"{readable}-{digest}.json"
+
+def create_transport(mode=None, fixtures_dir=None):
+    """
+    Create the transport selected by mode, or by JARVIS_TRANSPORT.
+    
+    Args:
+        mode (str, optional): "live", "record" or "replay"
+        fixtures_dir (str, optional): Where fixtures are saved and read
+    
+    Returns:
+        LiveTransport, RecordingTransport or ReplayTransport
+    """
+    mode = (mode or HTTP_TRANSPORT).strip().lower()
+    if mode == "record":
+        return RecordingTransport(fixtures_dir)
+    if mode == "replay":
+        return ReplayTransport(fixtures_dir)
+    if mode != "live":
+        print(f"Unknown HTTP transport '{mode}', using live")
+    return LiveTransport()
@@ -0,0 +1,325 @@
+"""
+Voice activity detection and silence trimming for captured audio.
+
+Measure it against speech_recognition's own phrase detection on WAV files:
+
+    python -m jarvis.utils.vad recordings/*.wav
+"""
+
+import sys
+import math
+import wave
+import argparse
+from pathlib import Path
+from ..config import (VAD_FRAME_MS, VAD_END_SILENCE_MS, VAD_PADDING_MS, VAD_MIN_SPEECH_MS, VAD_NOISE_RATIO,
+                      VAD_MIN_RMS)
+
+try:
+    import numpy as np
+except ImportError:  # Without NumPy, Speech falls back to speech_recognition's own phrase detection
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+
+class RingBuffer:
+    """
+    A fixed-size circular buffer of 16-bit samples, allocated once.
+
+    Chunks read from the microphone are copied in once; reading a stretch
+    back is a view into the buffer unless it wraps around the end. Positions
+    are absolute sample counts since the last reset(), so callers never deal
+    with the wrap-around themselves.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self.data = np.zeros(self.capacity, dtype=np.int16)
+        self.written = 0
+
+    def reset(self):
+        """Forget the contents, keeping the allocation."""
+        self.written = 0
+
+    @property
+    def oldest(self):
+        """Absolute position of the oldest sample still held."""
+        return max(0, self.written - self.capacity)
+
+    def write(self, chunk):
+        """Append raw little-endian 16-bit PCM bytes (or an int16 array)."""
+        samples = np.frombuffer(chunk, dtype=np.int16) if isinstance(chunk, (bytes, bytearray, memoryview)) else chunk
+        if len(samples) > self.capacity:
+            self.written += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+
+        start = self.written % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        self.data[:len(samples) - first] = samples[first:]
+        self.written += len(samples)
+
+    def view(self, start, end):
+        """
+        Get the samples between two absolute positions.
+
+        Returns:
+            ndarray: A view into the buffer, or a copy if the stretch wraps around
+        """
+        start = max(start, self.oldest)
+        end = min(end, self.written)
+        if end <= start:
+            return self.data[:0]
+
+        offset = start % self.capacity
+        if offset + (end - start) <= self.capacity:
+            return self.data[offset:offset + (end - start)]
+        return np.concatenate((self.data[offset:], self.data[:(end % self.capacity)]))
+
+class VoiceActivityDetector:
+    """
+    Frame-energy voice activity detection over 16-bit PCM.
+
+    Audio is cut into VAD_FRAME_MS frames, and a frame is speech if its RMS
+    energy is above the threshold; the energies of all new frames are
+    computed in one NumPy operation. Fed incrementally with update(), it
+    reports the end of an utterance once VAD_END_SILENCE_MS of silence
+    follows at least VAD_MIN_SPEECH_MS of speech; shorter bursts (clicks,
+    bumps) are forgotten. segment() then gives the speech with
+    VAD_PADDING_MS either side, so the recognizer isn't sent the silence
+    around it.
+    """
+
+    def __init__(self, sample_rate, threshold=None, frame_ms=VAD_FRAME_MS, end_silence_ms=VAD_END_SILENCE_MS,
+                 padding_ms=VAD_PADDING_MS, min_speech_ms=VAD_MIN_SPEECH_MS):
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.frame_size = max(1, int(sample_rate * frame_ms / 1000))
+        self.end_silence_frames = math.ceil(end_silence_ms / frame_ms)
+        self.min_speech_frames = math.ceil(min_speech_ms / frame_ms)
+        self.padding = int(sample_rate * padding_ms / 1000)
+        self.reset()
+
+    def reset(self, threshold=None):
+        """Start a new utterance, optionally with a new energy threshold."""
+        if threshold is not None:
+            self.threshold = threshold
+        self.frames_seen = 0
+        self.first_speech = None
+        self.last_speech = None
+        self.speech_frames = 0
+        self.ended = False
+
+    def frame_rms(self, samples):
+        """RMS energy of each complete frame, in sample units like speech_recognition's energy_threshold."""
+        count = len(samples) // self.frame_size
+        frames = samples[:count * self.frame_size].reshape(count, self.frame_size).astype(np.float32)
+        return np.sqrt(np.einsum("ij,ij->i", frames, frames) / self.frame_size)
+
+    def estimate_threshold(self, samples):
+        """Pick a threshold for a recording: VAD_NOISE_RATIO times its quietest decile."""
+        rms = self.frame_rms(samples)
+        if not len(rms):
+            return VAD_MIN_RMS
+        return max(VAD_MIN_RMS, float(np.percentile(rms, 10)) * VAD_NOISE_RATIO)
+
+    @property
+    def speaking(self):
+        """Whether an utterance has started."""
+        return self.first_speech is not None
+
+    @property
+    def speech_start(self):
+        """Sample position where the utterance started, or None."""
+        return None if self.first_speech is None else self.first_speech * self.frame_size
+
+    def update(self, ring):
+        """
+        Classify the frames completed since the last call.
+
+        Returns:
+            bool: True once the utterance has ended
+        """
+        if self.ended:
+            return True
+
+        base = self.frames_seen
+        count = (ring.written - base * self.frame_size) // self.frame_size
+        if count <= 0:
+            return False
+
+        start = base * self.frame_size
+        rms = self.frame_rms(ring.view(start, start + count * self.frame_size))
+        self.frames_seen += len(rms)
+
+        speech = np.flatnonzero(rms > self.threshold)
+        if len(speech):
+            if self.first_speech is None:
+                self.first_speech = base + int(speech[0])
+            self.last_speech = base + int(speech[-1])
+            self.speech_frames += len(speech)
+
+        if self.first_speech is not None and self.frames_seen - 1 - self.last_speech >= self.end_silence_frames:
+            if self.speech_frames >= self.min_speech_frames:
+                self.ended = True
+            else:
+                # Too short to be speech; keep waiting for the real thing
+                self.first_speech = self.last_speech = None
+                self.speech_frames = 0
+        return self.ended
+
+    def segment(self, ring=None):
+        """
+        The speech heard so far as absolute sample positions, padded either side.
+
+        Returns:
+            tuple or None: (start, end), or None if nothing was heard
+        """
+        if self.first_speech is None:
+            return None
+        start = self.first_speech * self.frame_size - self.padding
+        end = (self.last_speech + 1) * self.frame_size + self.padding
+        if ring is not None:
+            return max(start, ring.oldest), min(end, ring.written)
+        return max(0, start), end
+
+    def trim(self, samples):
+        """
+        Find the speech in a complete recording.
+
+        Returns:
+            tuple or None: (start, end) sample offsets of the padded speech, or None if there is none
+        """
+        self.reset(self.threshold if self.threshold is not None else self.estimate_threshold(samples))
+        speech = np.flatnonzero(self.frame_rms(samples) > self.threshold)
+        self.frames_seen = len(samples) // self.frame_size
+        if not len(speech):
+            return None
+
+        self.first_speech, self.last_speech = int(speech[0]), int(speech[-1])
+        self.speech_frames = len(speech)
+        start, end = self.segment()
+        return start, min(end, len(samples))
+
+def read_wav(path):
+    """
+    Read a 16-bit PCM WAV file, mixing it down to mono.
+
+    Returns:
+        tuple: (samples as int16 array, sample rate)
+    """
+    with wave.open(str(path), "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path} is not 16-bit PCM")
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+        channels = f.getnchannels()
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        return samples, f.getframerate()
+
+def measure(path, chunk=1024):
+    """
+    Compare the VAD with speech_recognition's phrase detection on one WAV file.
+
+    Both read the file chunk by chunk as if from a microphone, with the same
+    energy threshold. For each, returns how many seconds of audio were sent
+    to recognition and how long after the end of speech (as found by the
+    VAD over the whole file) the utterance was considered over.
+    """
+    import speech_recognition as sr
+
+    samples, rate = read_wav(path)
+    vad = VoiceActivityDetector(rate)
+    threshold = vad.estimate_threshold(samples)
+    speech_end = (vad.last_speech + 1) * vad.frame_size / rate if vad.trim(samples) else None
+
+    # The VAD, streaming
+    ring = RingBuffer(len(samples) + chunk)
+    vad.reset(threshold)
+    for offset in range(0, len(samples), chunk):
+        ring.write(samples[offset:offset + chunk])
+        if vad.update(ring):
+            break
+    segment = vad.segment(ring)
+    vad_result = {
+        "payload_s": (segment[1] - segment[0]) / rate if segment else 0.0,
+        "ended_at_s": ring.written / rate
+    }
+
+    # speech_recognition's listen(), counting how much audio it read before returning
+    recognizer = sr.Recognizer()
+    recognizer.energy_threshold = threshold
+    recognizer.dynamic_energy_threshold = False
+    with sr.AudioFile(str(path)) as source:
+        source.CHUNK = chunk
+        stream = source.stream = _CountingStream(source.stream)
+        try:
+            audio = recognizer.listen(source)
+            payload = len(audio.frame_data) / (audio.sample_width * rate)
+        except sr.WaitTimeoutError:
+            payload = 0.0
+        finally:
+            source.stream = stream.stream
+    baseline = {"payload_s": payload, "ended_at_s": stream.bytes_read / (source.SAMPLE_WIDTH * rate)}
+
+    for result in (vad_result, baseline):
+        result["end_delay_ms"] = (result["ended_at_s"] - speech_end) * 1000 if speech_end is not None else None
+    return {"file": str(path), "duration_s": len(samples) / rate, "speech_end_s": speech_end,
+            "vad": vad_result, "baseline": baseline}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure voice activity detection on WAV files")
+    parser.add_argument("paths", nargs="+", help="WAV files, or directories of them")
+    args = parser.parse_args(argv)
+
+    if not NUMPY_AVAILABLE:
+        print("Voice activity detection needs numpy.")
+        return 1
+
+    files = []
+    for path in map(Path, args.paths):
+        files.extend(sorted(path.glob("*.wav")) if path.is_dir() else [path])
+
+    print(f"{'file':<28} {'length':>7} {'sent (listen)':>14} {'sent (vad)':>11} "
+          f"{'end delay (listen)':>19} {'end delay (vad)':>16}")
+    totals = {"duration": 0.0, "baseline": 0.0, "vad": 0.0, "baseline_delay": [], "vad_delay": []}
+    for path in files:
+        try:
+            result = measure(path)
+        except Exception as e:
+            print(f"Error measuring {path}: {e}")
+            continue
+
+        vad, baseline = result["vad"], result["baseline"]
+        print(f"{Path(result['file']).name:<28} {result['duration_s']:>6.2f}s {baseline['payload_s']:>13.2f}s "
+              f"{vad['payload_s']:>10.2f}s {_ms(baseline['end_delay_ms']):>19} {_ms(vad['end_delay_ms']):>16}")
+
+        totals["duration"] += result["duration_s"]
+        totals["baseline"] += baseline["payload_s"]
+        totals["vad"] += vad["payload_s"]
+        if result["speech_end_s"] is not None:
+            totals["baseline_delay"].append(baseline["end_delay_ms"])
+            totals["vad_delay"].append(vad["end_delay_ms"])
+
+    if totals["baseline_delay"]:
+        print(f"\nAudio sent: {totals['baseline']:.2f}s with listen(), {totals['vad']:.2f}s with the VAD "
+              f"({totals['duration']:.2f}s recorded)")
+        print(f"Mean end-of-speech delay: {np.mean(totals['baseline_delay']):.0f}ms with listen(), "
+              f"{np.mean(totals['vad_delay']):.0f}ms with the VAD")
+    return 0
+
+class _CountingStream:
+    # Counts how much of a file speech_recognition reads before it decides a phrase is over
+    def __init__(self, stream):
+        self.stream = stream
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.bytes_read += len(data)
+        return data
+
+def _ms(value):
+    return "-" if value is None else f"{value:.0f}ms"
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+A local stand-in for the OpenWeatherMap API, and a check of forecast caching against it.
+
+Run `python -m jarvis.utils.weather_stub` to ask five forecast questions
+about one city through WeatherSkill and confirm they cost a single upstream
+request; the stub counts every request it serves. No API key or network
+access is needed.
+"""
+
+import sys
+import json
+import time
+import argparse
+import datetime
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class WeatherStub:
+    """
+    Serves /weather and /forecast in OpenWeatherMap's format on localhost.
+
+    Every city gets the same overcast weather and a 5-day / 3-hour series
+    with rain from one to two days out. The city "nowhere" is not found.
+    Requests are recorded as (path, city) in requests.
+    """
+
+    def __init__(self, port=0, delay=0.0):
+        self.delay = delay
+        self.requests = []
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL to use as WEATHER_API_URL."""
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="weather-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        """Stop serving."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def count(self, path):
+        """How many requests were made to an endpoint, e.g. "/forecast"."""
+        with self._lock:
+            return sum(1 for requested, _ in self.requests if requested == path)
+
+    def _handle(self, request):
+        url = urlparse(request.path)
+        path = "/" + url.path.rstrip("/").rsplit("/", 1)[-1]
+        city = parse_qs(url.query).get("q", [""])[0]
+        with self._lock:
+            self.requests.append((path, city))
+        if self.delay:
+            time.sleep(self.delay)
+
+        if city.lower() == "nowhere":
+            status, body = 404, {"cod": "404", "message": "city not found"}
+        elif path == "/forecast":
+            status, body = 200, self._forecast(city)
+        elif path == "/weather":
+            status, body = 200, self._weather(city)
+        else:
+            status, body = 404, {"cod": "404", "message": "unknown endpoint"}
+
+        data = json.dumps(body).encode()
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def _weather(self, city):
+        return {
+            "name": city.title(),
+            "sys": {"country": "GB"},
+            "main": {"temp": 12.3, "feels_like": 11.0, "humidity": 80},
+            "weather": [{"main": "Clouds", "description": "overcast clouds"}],
+            "wind": {"speed": 4.2}
+        }
+
+    def _forecast(self, city):
+        now = int(time.time()) // 10800 * 10800
+        entries = []
+        for i in range(40):
+            rain = 8 <= i < 16
+            entries.append({
+                "dt": now + i * 10800,
+                "main": {"temp": 10 + i % 8, "humidity": 70},
+                "weather": [{"main": "Rain" if rain else "Clouds",
+                             "description": "light rain" if rain else "scattered clouds"}],
+                "wind": {"speed": 3.1},
+                "pop": 0.8 if rain else 0.1
+            })
+        return {"city": {"name": city.title(), "country": "GB", "timezone": 0}, "list": entries}
+
+def check_forecast_cache(city="London"):
+    """
+    Ask several forecast questions about one city and count upstream requests.
+
+    Returns:
+        tuple: (answers, forecast requests the stub served)
+    """
+    from .web import WebTools
+    from .services import ServiceContainer
+    from .transport import create_transport
+    from ..skills.weather import WeatherSkill
+
+    stub = WeatherStub().start()
+    services = ServiceContainer()
+    services.register("web_tools", lambda services: WebTools(
+        transport=create_transport("live"), weather_api_url=stub.url, weather_api_key="stub"))
+    weather = WeatherSkill(services=services)
+
+    day_after = (datetime.date.today() + datetime.timedelta(days=2)).strftime("%A").lower()
+    questions = [
+        ("forecast", lambda: weather.get_forecast(city)),
+        ("weather tomorrow", lambda: weather.get_forecast_for(city, "tomorrow")),
+        ("will it rain tomorrow", lambda: weather.will_it(city, "rain", "tomorrow")),
+        ("will it snow tomorrow", lambda: weather.will_it(city, "snow", "tomorrow")),
+        (f"weather on {day_after}", lambda: weather.get_forecast_for(city, f"on {day_after}"))
+    ]
+    try:
+        answers = [(question, *ask()) for question, ask in questions]
+        return answers, stub.count("/forecast")
+    finally:
+        services.shutdown()
+        stub.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that forecast questions about one city share one upstream request")
+    parser.add_argument("--city", default="London", help="The city to ask about")
+    args = parser.parse_args(argv)
+
+    answers, requests = check_forecast_cache(args.city)
+    for question, success, answer in answers:
+        print(f"{question}: {answer if success else 'Error: ' + answer}")
+    print(f"{len(answers)} questions, {requests} upstream forecast request{'s' if requests != 1 else ''}")
+    failed = [question for question, success, _ in answers if not success]
+    return 0 if requests == 1 and not failed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
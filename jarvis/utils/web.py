@@ -6,15 +6,72 @@ import requests
 import webbrowser
 import urllib.parse
 import json
+import time
+import datetime
+import threading
 import wikipedia
+from concurrent.futures import ThreadPoolExecutor
 import pywhatkit
 from bs4 import BeautifulSoup
-from ..config import SEARCH_ENGINES, DEFAULT_SEARCH_ENGINE, WEATHER_API_KEY, WOLFRAM_API_KEY, NEWS_API_KEY
+from .single_flight import SingleFlight
+from .resilience import CircuitBreaker, UpstreamUnavailable
+from .transport import create_transport
+from ..config import (SEARCH_ENGINES, DEFAULT_SEARCH_ENGINE, WEATHER_API_KEY, WOLFRAM_API_KEY, NEWS_API_KEY,
+                      WEATHER_API_URL, WEATHER_CACHE_TTL, FORECAST_CACHE_TTL, WEATHER_MAX_WORKERS)
 
 class WebTools:
-    def __init__(self):
+    def __init__(self, transport=None, weather_api_url=None, weather_api_key=None):
         self.search_engines = SEARCH_ENGINES
+        
+        # OpenWeatherMap endpoint and key; a local stub can stand in for it
+        self.weather_api_url = weather_api_url or WEATHER_API_URL
+        self.weather_api_key = weather_api_key or WEATHER_API_KEY
         self.default_engine = DEFAULT_SEARCH_ENGINE
+        
+        # Upstream API calls go through a pooled live session, or record or
+        # replay fixtures (see JARVIS_TRANSPORT)
+        self.transport = transport or create_transport()
+        
+        # Current conditions and forecast series by city: {city: (fetched_at, data)}
+        self._weather = {}
+        self._forecasts = {}
+        self._weather_lock = threading.Lock()
+        
+        # Identical concurrent upstream requests share one HTTP call
+        self.flights = SingleFlight()
+        
+        # One circuit breaker per upstream, so an outage costs one fast failure per command
+        self.breakers = {
+            "weather": CircuitBreaker("OpenWeatherMap"),
+            "news": CircuitBreaker("NewsAPI"),
+            "wolfram": CircuitBreaker("Wolfram Alpha"),
+            "wikipedia": CircuitBreaker("Wikipedia")
+        }
+        
+        # Bounded worker pool for fanning out requests, created on first use
+        self._pool = None
+        self._pool_lock = threading.Lock()
+    
+    def warm_up(self, city=None):
+        """
+        Open a pooled connection to the weather API and cache a city's weather ahead of the first command.
+        """
+        if city and self.weather_api_key:
+            self.get_weather(city)
+            self.get_forecast(city)
+    
+    def close(self):
+        """Close pooled HTTP connections and worker threads."""
+        if self._pool:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        self.transport.close()
+    
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=WEATHER_MAX_WORKERS, thread_name_prefix="web")
+            return self._pool
     
     def search(self, query, engine=None):
         """Search the web using the specified search engine and open in browser."""
@@ -31,8 +88,69 @@ class WebTools:
         except Exception as e:
             return False, f"Error searching the web: {e}"
     
+    def flight_stats(self):
+        """Get per-request-kind counts of upstream calls made and calls coalesced."""
+        return self.flights.stats()
+    
+    def upstream_stats(self):
+        """Get circuit state and recent latency for each upstream."""
+        return {name: breaker.stats() for name, breaker in self.breakers.items()}
+    
+    def _request(self, upstream, url, params, ok_statuses=()):
+        """
+        GET from an upstream API through its circuit breaker.
+        
+        Args:
+            upstream (str): Key into self.breakers
+            url (str): The endpoint
+            params (dict): Query parameters
+            ok_statuses (tuple, optional): 5xx statuses that are answers, not outages
+        
+        Returns:
+            requests.Response: The response
+        
+        Raises:
+            UpstreamUnavailable: If the circuit is open
+            requests.RequestException: If the call failed or timed out
+        """
+        breaker = self.breakers[upstream]
+        if not breaker.allow():
+            raise UpstreamUnavailable(f"{breaker.name} is unavailable right now")
+        
+        start = time.perf_counter()
+        try:
+            response = self.transport.get(url, params=params, timeout=breaker.timeout())
+        except Exception:
+            breaker.record_failure()
+            raise
+        
+        if (response.status_code >= 500 and response.status_code not in ok_statuses) or response.status_code == 429:
+            breaker.record_failure()
+        else:
+            breaker.record_success(time.perf_counter() - start)
+        return response
+    
     def get_wikipedia_info(self, query, sentences=2):
         """Get a summary from Wikipedia."""
+        key = ("wikipedia", query.strip().lower(), sentences)
+        return self.flights.do(key, self._fetch_wikipedia_info, query, sentences)
+    
+    def _fetch_wikipedia_info(self, query, sentences):
+        # The wikipedia package doesn't take a timeout, but an outage can still be skipped
+        breaker = self.breakers["wikipedia"]
+        if not breaker.allow():
+            return False, f"{breaker.name} is unavailable right now"
+        
+        start = time.perf_counter()
+        try:
+            result = self._wikipedia_lookup(query, sentences)
+        except Exception as e:
+            breaker.record_failure()
+            return False, f"Error retrieving Wikipedia information: {e}"
+        breaker.record_success(time.perf_counter() - start)
+        return result
+    
+    def _wikipedia_lookup(self, query, sentences):
         try:
             # Set language to English
             wikipedia.set_lang("en")
@@ -69,8 +187,6 @@ class WebTools:
                 return False, f"Disambiguation error for '{query}'"
         except wikipedia.exceptions.PageError:
             return False, f"No Wikipedia page found for '{query}'"
-        except Exception as e:
-            return False, f"Error retrieving Wikipedia information: {e}"
     
     def play_youtube(self, query):
         """Play a YouTube video based on the query."""
@@ -81,19 +197,33 @@ class WebTools:
             return False, f"Error playing YouTube video: {e}"
     
     def get_weather(self, city):
-        """Get weather information for a city."""
-        if not WEATHER_API_KEY:
+        """
+        Get weather information for a city.
+        
+        Current conditions are cached for WEATHER_CACHE_TTL seconds, which
+        also lets the prefetcher warm them ahead of habitual questions.
+        """
+        if not self.weather_api_key:
             return False, "Weather API key not configured"
         
+        key = city.strip().lower()
+        with self._weather_lock:
+            cached = self._weather.get(key)
+        if cached and time.time() - cached[0] < WEATHER_CACHE_TTL:
+            return True, cached[1]
+        
+        return self.flights.do(("weather", key), self._fetch_weather, city, key)
+    
+    def _fetch_weather(self, city, key):
         try:
-            base_url = "http://api.openweathermap.org/data/2.5/weather"
+            base_url = f"{self.weather_api_url}/weather"
             params = {
                 "q": city,
-                "appid": WEATHER_API_KEY,
+                "appid": self.weather_api_key,
                 "units": "metric"  # For Celsius
             }
             
-            response = requests.get(base_url, params=params)
+            response = self._request("weather", base_url, params)
             data = response.json()
             
             if response.status_code == 200:
@@ -107,17 +237,106 @@ class WebTools:
                     "wind_speed": data["wind"]["speed"],
                     "condition": data["weather"][0]["main"]
                 }
+                with self._weather_lock:
+                    self._weather[key] = (time.time(), weather)
                 return True, weather
             else:
                 return False, f"Error: {data['message']}"
+        except UpstreamUnavailable as e:
+            return False, str(e)
         except Exception as e:
             return False, f"Error retrieving weather information: {e}"
     
+    def get_weather_many(self, cities):
+        """
+        Get weather information for several cities concurrently.
+        
+        OpenWeatherMap's bulk endpoint only takes numeric city IDs, so the
+        names are resolved in parallel over a bounded worker pool instead;
+        total latency is roughly one round trip for up to WEATHER_MAX_WORKERS cities.
+        
+        Returns:
+            list: (city, success, weather or error_message) in the order given
+        """
+        if len(cities) == 1:
+            return [(cities[0], *self.get_weather(cities[0]))]
+        
+        pool = self._get_pool()
+        futures = [(city, pool.submit(self.get_weather, city)) for city in cities]
+        return [(city, *future.result()) for city, future in futures]
+    
+    def get_forecast(self, city):
+        """
+        Get the multi-day forecast series for a city.
+        
+        The whole 5-day / 3-hour series is fetched with one call and cached
+        for FORECAST_CACHE_TTL seconds, so follow-up questions about the same
+        city are answered without touching the network.
+        """
+        if not self.weather_api_key:
+            return False, "Weather API key not configured"
+        
+        key = city.strip().lower()
+        with self._weather_lock:
+            cached = self._forecasts.get(key)
+        if cached and time.time() - cached[0] < FORECAST_CACHE_TTL:
+            return True, cached[1]
+        
+        return self.flights.do(("forecast", key), self._fetch_forecast, city, key)
+    
+    def _fetch_forecast(self, city, key):
+        try:
+            base_url = f"{self.weather_api_url}/forecast"
+            params = {
+                "q": city,
+                "appid": self.weather_api_key,
+                "units": "metric"  # For Celsius
+            }
+            
+            response = self._request("weather", base_url, params)
+            data = response.json()
+            
+            if response.status_code == 200:
+                # Timestamps are UTC; shift them to the city's local time
+                offset = datetime.timedelta(seconds=data["city"].get("timezone", 0))
+                entries = []
+                for item in data["list"]:
+                    local_time = datetime.datetime.fromtimestamp(item["dt"], datetime.timezone.utc) + offset
+                    entries.append({
+                        "time": local_time.replace(tzinfo=None),
+                        "temperature": item["main"]["temp"],
+                        "description": item["weather"][0]["description"],
+                        "condition": item["weather"][0]["main"],
+                        "humidity": item["main"]["humidity"],
+                        "wind_speed": item["wind"]["speed"],
+                        "rain_chance": round(item.get("pop", 0) * 100)
+                    })
+                
+                forecast = {
+                    "city": data["city"]["name"],
+                    "country": data["city"]["country"],
+                    "utc_offset": offset.total_seconds(),
+                    "entries": entries
+                }
+                with self._weather_lock:
+                    self._forecasts[key] = (time.time(), forecast)
+                return True, forecast
+            else:
+                return False, f"Error: {data['message']}"
+        except UpstreamUnavailable as e:
+            return False, str(e)
+        except Exception as e:
+            return False, f"Error retrieving weather forecast: {e}"
+    
     def get_news(self, category="general", country="us", count=5):
         """Get latest news headlines."""
         if not NEWS_API_KEY:
             return False, "News API key not configured"
         
+        key = ("news", category, country, count)
+        return self.flights.do(key, self._fetch_news, category, country, count)
+    
+    def _fetch_news(self, category, country, count):
         try:
             base_url = "https://newsapi.org/v2/top-headlines"
             params = {
@@ -127,7 +346,7 @@ class WebTools:
                 "pageSize": count
             }
             
-            response = requests.get(base_url, params=params)
+            response = self._request("news", base_url, params)
             data = response.json()
             
             if response.status_code == 200 and data["status"] == "ok":
@@ -142,6 +361,8 @@ class WebTools:
                 return True, articles
             else:
                 return False, f"Error: {data.get('message', 'Unknown error')}"
+        except UpstreamUnavailable as e:
+            return False, str(e)
         except Exception as e:
             return False, f"Error retrieving news: {e}"
     
@@ -150,6 +371,9 @@ class WebTools:
         if not WOLFRAM_API_KEY:
             return False, "Wolfram Alpha API key not configured"
         
+        return self.flights.do(("wolfram", query.strip().lower()), self._fetch_wolfram, query)
+    
+    def _fetch_wolfram(self, query):
         try:
             base_url = "http://api.wolframalpha.com/v1/result"
             params = {
@@ -158,11 +382,14 @@ class WebTools:
                 "units": "metric"
             }
             
-            response = requests.get(base_url, params=params)
+            # 501 means Wolfram couldn't interpret the question, not that it's down
+            response = self._request("wolfram", base_url, params, ok_statuses=(501,))
             
             if response.status_code == 200:
                 return True, response.text
             else:
                 return False, "I don't know how to answer that"
+        except UpstreamUnavailable as e:
+            return False, str(e)
         except Exception as e:
             return False, f"Error asking Wolfram Alpha: {e}"